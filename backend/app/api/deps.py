@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import secrets
 import uuid
 
 from fastapi import Depends, HTTPException, status
@@ -9,6 +10,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.database import get_db
 from app.core.security import decode_token
 from app.models.user import User
@@ -17,6 +19,8 @@ logger = logging.getLogger(__name__)
 
 # Bearer token scheme (reads Authorization: Bearer <token>)
 _bearer_scheme = HTTPBearer()
+# Same header, but a missing one is reported by the dependency itself
+_optional_bearer_scheme = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
@@ -81,3 +85,23 @@ async def get_current_user(
         )
 
     return user
+
+
+async def require_metrics_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_optional_bearer_scheme),
+) -> None:
+    """Admit only internal scrapers that present ``METRICS_TOKEN``.
+
+    Raises:
+        HTTPException 404: If no metrics token is configured (the endpoint is off).
+        HTTPException 401: If the token is missing or wrong.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if credentials is None or not secrets.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
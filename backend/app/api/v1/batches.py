@@ -0,0 +1,118 @@
+from typing import Any, Literal
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.scan import ScanProfile
+from app.models.scan_batch import ScanBatch
+from app.models.scan_result import ScanModule
+from app.schemas.scan import DNSBulkCreate, ScanBatchCreate, ScanBatchProgress, selected_profile
+from app.services import batch_service
+from app.workers.tasks import dispatch_pending
+
+router = APIRouter()
+
+
+async def _get_own_batch(db: AsyncSession, batch_id: UUID, user: User) -> ScanBatch:
+    batch = await db.get(ScanBatch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if batch.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return batch
+
+
+async def _created(db: AsyncSession, batch: ScanBatch) -> dict[str, Any]:
+    # Start as many scans as there are free worker slots; the dispatcher starts the rest
+    await dispatch_pending()
+    progress = await batch_service.get_progress(db, batch)
+    return {**ScanBatchProgress.model_validate(batch).model_dump(), **progress}
+
+
+@router.post("", response_model=ScanBatchProgress, status_code=status.HTTP_201_CREATED)
+async def create_batch(
+    batch_in: ScanBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Submit many URLs at once. Duplicates (after normalisation) and invalid URLs are skipped.
+    """
+    batch = await batch_service.create_batch(db, current_user.id, batch_in.urls, batch_in.profile, batch_in.modules)
+    return await _created(db, batch)
+
+@router.post("/upload", response_model=ScanBatchProgress, status_code=status.HTTP_201_CREATED)
+async def upload_batch(
+    file: UploadFile = File(...),
+    profile: ScanProfile = Query(ScanProfile.standard),
+    modules: list[ScanModule] | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Submit a batch from an NDJSON or plain-text file (one URL or ``{"url": ...}`` per line).
+    """
+    try:
+        profile = selected_profile(profile, modules)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    urls = batch_service.parse_upload(await file.read())
+    batch = await batch_service.create_batch(db, current_user.id, urls, profile, modules)
+    return await _created(db, batch)
+
+@router.post("/dns")
+async def bulk_dns(
+    bulk_in: DNSBulkCreate,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    DNS-only scan of many hostnames, or of a wordlist under a domain.
+    One compact row per host is streamed as soon as it resolves.
+    Every host is charged to the user's bulk DNS quota up front.
+    """
+    hostnames, domain = batch_service.dns_bulk_hostnames(bulk_in.hostnames, bulk_in.domain, bulk_in.words)
+    await batch_service.admit_dns_bulk(current_user.id, hostnames)
+    if format == "csv":
+        body, media_type = batch_service.dns_bulk_csv(hostnames, domain, current_user.id), "text/csv"
+    else:
+        body, media_type = batch_service.dns_bulk_ndjson(hostnames, domain, current_user.id), "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type)
+
+@router.get("/{batch_id}", response_model=ScanBatchProgress)
+async def get_batch(
+    batch_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Get aggregate progress of a batch: scan counts per status and the average score so far.
+    """
+    batch = await _get_own_batch(db, batch_id, current_user)
+    progress = await batch_service.get_progress(db, batch)
+    return {**ScanBatchProgress.model_validate(batch).model_dump(), **progress}
+
+@router.get("/{batch_id}/export")
+async def export_batch(
+    batch_id: UUID,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Stream one row per scan of the batch with its overall and per-module scores.
+    """
+    batch = await _get_own_batch(db, batch_id, current_user)
+    if format == "csv":
+        body, media_type = batch_service.export_csv(batch.id), "text/csv"
+    else:
+        body, media_type = batch_service.export_ndjson(batch.id), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="batch-{batch.id}.{format}"'},
+    )
@@ -3,6 +3,8 @@ from fastapi import APIRouter
 from app.api.v1.auth import router as auth_router
 from app.api.v1.users import router as users_router
 from app.api.v1.scans import router as scans_router
+from app.api.v1.batches import router as batches_router
+from app.api.v1.schedules import router as schedules_router
 from app.api.v1.reports import router as reports_router
 
 api_router = APIRouter()
@@ -10,4 +12,6 @@ api_router = APIRouter()
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
 api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(scans_router, prefix="/scans", tags=["scans"])
+api_router.include_router(batches_router, prefix="/batches", tags=["batches"])
+api_router.include_router(schedules_router, prefix="/schedules", tags=["schedules"])
 api_router.include_router(reports_router, prefix="/reports", tags=["reports"])
@@ -1,19 +1,63 @@
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sse_starlette.sse import EventSourceResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 
 from app.core.database import get_db
+from app.core.redis import get_scan_phases
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.models.scan import Scan
+from app.models.scan import Scan, ScanStatus
 from app.models.scan_result import ScanResult
-from app.schemas.scan import ScanCreate, ScanSchema
-from app.workers.tasks import run_scan_task
+from app.schemas.scan import ScanCreate, ScanSchema, ScanQueueStatus
+from app.services import scan_scheduler
+from app.services.scan_coalescer import claim_or_attach, copy_results, release_claim
+from app.services.scan_profiles import resolve_modules
+from app.utils.url import normalize_url
+from app.websocket.sse import HEARTBEAT_SECONDS, scan_event_stream
+from app.workers.tasks import dispatch_pending, generate_report_task
 
 router = APIRouter()
 
+# Scans one multiplexed event stream may follow
+MAX_MULTIPLEXED_SCANS = 50
+
+
+def _live_phase(scan: ScanSchema, phase: str | None, states: dict[str, str]) -> str | None:
+    """The phase to show: a terminal scan phase, else the first unfinished module in run order."""
+    if phase in ("completed", "failed") or not states:
+        return phase
+    # Modules may run in parallel; everything before the first unfinished one is done
+    unfinished = (module for module in scan.modules if states.get(module, "running") == "running")
+    return next(unfinished, scan.modules[-1] if scan.modules else phase)
+
+
+async def _with_live_phase(scans: list[Scan]) -> list[ScanSchema]:
+    """Serialize scans, overlaying the live phase and module states that running scans keep in Redis."""
+    schemas = [ScanSchema.model_validate(scan) for scan in scans]
+    # Attached scans follow the phase of the run they were coalesced into
+    running = {
+        str(s.id): str(s.coalesced_into_id or s.id)
+        for s in schemas if s.status in (ScanStatus.pending, ScanStatus.running)
+    }
+    if not running:
+        return schemas
+    try:
+        phases = await get_scan_phases(list(set(running.values())))
+    except Exception:
+        return schemas
+    overlaid = []
+    for s in schemas:
+        phase, states = phases.get(running.get(str(s.id)), (None, {}))
+        current = _live_phase(s, phase, states)
+        if current or states:
+            s = s.model_copy(update={"current_phase": current or s.current_phase, "module_phases": states or None})
+        overlaid.append(s)
+    return overlaid
+
+
 @router.post("", response_model=ScanSchema, status_code=status.HTTP_201_CREATED)
 async def create_scan(
     scan_in: ScanCreate,
@@ -23,18 +67,56 @@ async def create_scan(
     """
     Start a new scan for the given URL.
     Returns immediately with the Scan ID, the analysis runs in the background.
+
+    If an identical scan (same normalised URL and modules) is in flight or
+    finished a few minutes ago, the new scan is attached to it instead of
+    starting another run, unless ``force_fresh`` is set.
     """
+    modules = resolve_modules(scan_in.profile, scan_in.modules)
     scan = Scan(
         user_id=current_user.id,
-        url=str(scan_in.url)
+        url=str(scan_in.url),
+        normalized_url=normalize_url(str(scan_in.url)),
+        profile=scan_in.profile,
+        modules=modules,
     )
     db.add(scan)
+    await db.flush()
+
+    primary = await claim_or_attach(db, scan, force_fresh=scan_in.force_fresh)
+    if primary is not None:
+        scan.coalesced_into_id = primary.id
+        if primary.status == ScanStatus.completed:
+            await copy_results(db, primary, scan)
+    else:
+        # Only scans that actually run are charged against the user's quota
+        try:
+            await scan_scheduler.admit(current_user.id, modules)
+        except scan_scheduler.QuotaExceeded as exc:
+            await release_claim(scan)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(exc),
+                headers={"Retry-After": str(int(exc.retry_after) + 1)},
+            )
     await db.commit()
+
+    if primary is None:
+        # Queue only once committed, so the dispatcher never starts a scan the workers can't see.
+        # Start it right away if a worker slot is free; otherwise the dispatcher will.
+        await scan_scheduler.enqueue(current_user.id, scan.id, modules)
+        await dispatch_pending()
+    else:
+        # The primary may have finished between the claim lookup and our commit
+        await db.refresh(primary)
+        if scan.status == ScanStatus.pending and primary.status in (ScanStatus.completed, ScanStatus.failed):
+            await copy_results(db, primary, scan)
+            await db.commit()
+        if scan.status == ScanStatus.completed:
+            generate_report_task.delay(str(scan.id))
+
     await db.refresh(scan)
     
-    # Trigger Celery Task
-    run_scan_task.delay(str(scan.id))
-    
     return scan
 
 @router.get("", response_model=list[ScanSchema])
@@ -50,7 +132,39 @@ async def list_scans(
     statement = select(Scan).where(Scan.user_id == current_user.id).offset(skip).limit(limit).order_by(Scan.created_at.desc())
     result = await db.execute(statement)
     scans = result.scalars().all()
-    return scans
+    return await _with_live_phase(scans)
+
+async def _event_streams(db: AsyncSession, scan_ids: list[UUID], user: User) -> dict[str, str]:
+    """Map each requested scan to the run whose live events it follows, checking ownership."""
+    result = await db.execute(select(Scan).where(Scan.id.in_(scan_ids)))
+    scans = {scan.id: scan for scan in result.scalars().all()}
+    for scan_id in scan_ids:
+        if scan_id not in scans:
+            raise HTTPException(status_code=404, detail="Scan not found")
+        if scans[scan_id].user_id != user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+    return {str(scan_id): str(scans[scan_id].coalesced_into_id or scan_id) for scan_id in scan_ids}
+
+@router.get("/events")
+async def stream_many_scan_events(
+    ids: str = Query(..., description="Comma-separated scan IDs"),
+    last_event_id: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> EventSourceResponse:
+    """
+    Server-Sent Events for several scans over one stream. Each event carries its
+    ``scan_id``; the event ID is a cursor over all scans, so ``Last-Event-ID``
+    resumes every one of them.
+    """
+    try:
+        scan_ids = list(dict.fromkeys(UUID(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated scan IDs")
+    if not scan_ids or len(scan_ids) > MAX_MULTIPLEXED_SCANS:
+        raise HTTPException(status_code=422, detail=f"Between 1 and {MAX_MULTIPLEXED_SCANS} scan IDs are allowed")
+    streams = await _event_streams(db, scan_ids, current_user)
+    return EventSourceResponse(scan_event_stream(streams, last_event_id), ping=HEARTBEAT_SECONDS)
 
 @router.get("/{scan_id}", response_model=ScanSchema)
 async def get_scan(
@@ -66,7 +180,39 @@ async def get_scan(
         raise HTTPException(status_code=404, detail="Scan not found")
     if scan.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return scan
+    return (await _with_live_phase([scan]))[0]
+
+@router.get("/{scan_id}/events")
+async def stream_scan_events(
+    scan_id: UUID,
+    last_event_id: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> EventSourceResponse:
+    """
+    Server-Sent Events for a scan: the events missed so far (after ``Last-Event-ID``
+    when resuming), then live events, with a heartbeat comment every 15 s.
+    """
+    streams = await _event_streams(db, [scan_id], current_user)
+    return EventSourceResponse(scan_event_stream(streams, last_event_id), ping=HEARTBEAT_SECONDS)
+
+@router.get("/{scan_id}/queue", response_model=ScanQueueStatus)
+async def get_scan_queue_status(
+    scan_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Get the position of a pending scan in the fair-share queue and an estimate of when it starts.
+    """
+    scan = await db.get(Scan, scan_id)
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    if scan.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if scan.status != ScanStatus.pending:
+        return {"state": scan.status.value, "position": None, "eta_seconds": None}
+    return await scan_scheduler.queue_status(scan.coalesced_into_id or scan.id)
 
 @router.delete("/{scan_id}", response_model=dict)
 async def delete_scan(
@@ -109,4 +255,4 @@ async def get_scan_results(
     results = result.scalars().all()
     
     # We return raw dicts for simplicity in this endpoint as schemas could be complex
-    return [{"module": r.module, "score": r.score, "grade": r.grade, "data": r.data, "issues": {"critical": r.issues_critical, "high": r.issues_high, "medium": r.issues_medium, "low": r.issues_low}} for r in results]
+    return [{"module": r.module, "score": r.score, "grade": r.grade, "data": r.data, "issues": {"critical": r.issues_critical, "high": r.issues_high, "medium": r.issues_medium, "low": r.issues_low}, "carried_over": r.is_carried_over} for r in results]
@@ -0,0 +1,134 @@
+from datetime import timedelta, datetime, timezone
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from uuid import UUID, uuid4
+
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.scan_schedule import ScanChange, ScanSchedule
+from app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleSchema, ScanChangeSchema
+from app.services.scan_profiles import resolve_modules
+from app.services.schedule_service import default_jitter_seconds, first_run_at
+from app.utils.url import normalize_url
+
+router = APIRouter()
+
+
+async def _get_own_schedule(db: AsyncSession, schedule_id: UUID, user: User) -> ScanSchedule:
+    schedule = await db.get(ScanSchedule, schedule_id)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    if schedule.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return schedule
+
+
+def _jitter_seconds(interval_seconds: int, jitter_minutes: int | None) -> int:
+    if jitter_minutes is None:
+        return default_jitter_seconds(interval_seconds)
+    # A window longer than the interval would let consecutive runs swap order
+    return min(jitter_minutes * 60, interval_seconds)
+
+
+@router.post("", response_model=ScheduleSchema, status_code=status.HTTP_201_CREATED)
+async def create_schedule(
+    schedule_in: ScheduleCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Scan a URL periodically. Each run is diffed against the previous one.
+    """
+    interval_seconds = schedule_in.interval_minutes * 60
+    schedule = ScanSchedule(
+        id=uuid4(),
+        user_id=current_user.id,
+        url=schedule_in.url,
+        normalized_url=normalize_url(schedule_in.url),
+        profile=schedule_in.profile,
+        modules=resolve_modules(schedule_in.profile, schedule_in.modules),
+        interval_seconds=interval_seconds,
+        jitter_seconds=_jitter_seconds(interval_seconds, schedule_in.jitter_minutes),
+        enabled=True,
+    )
+    schedule.next_run_at = first_run_at(schedule, schedule_in.start_at)
+    db.add(schedule)
+    await db.commit()
+    await db.refresh(schedule)
+    return schedule
+
+@router.get("", response_model=list[ScheduleSchema])
+async def list_schedules(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Retrieve all schedules of the current user.
+    """
+    statement = select(ScanSchedule).where(ScanSchedule.user_id == current_user.id).order_by(ScanSchedule.created_at.desc())
+    result = await db.execute(statement)
+    return result.scalars().all()
+
+@router.patch("/{schedule_id}", response_model=ScheduleSchema)
+async def update_schedule(
+    schedule_id: UUID,
+    schedule_in: ScheduleUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Pause, resume or re-time a schedule. Re-timing restarts it from now.
+    """
+    schedule = await _get_own_schedule(db, schedule_id, current_user)
+    if schedule_in.enabled is not None:
+        schedule.enabled = schedule_in.enabled
+    if schedule_in.interval_minutes is not None or schedule_in.jitter_minutes is not None:
+        if schedule_in.interval_minutes is not None:
+            schedule.interval_seconds = schedule_in.interval_minutes * 60
+        schedule.jitter_seconds = _jitter_seconds(schedule.interval_seconds, schedule_in.jitter_minutes)
+        schedule.next_run_at = first_run_at(
+            schedule, datetime.now(timezone.utc) + timedelta(seconds=schedule.interval_seconds)
+        )
+        schedule.retry_at = None
+    await db.commit()
+    await db.refresh(schedule)
+    return schedule
+
+@router.delete("/{schedule_id}", response_model=dict)
+async def delete_schedule(
+    schedule_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """
+    Delete a schedule and its change history. Scans it started are kept.
+    """
+    schedule = await _get_own_schedule(db, schedule_id, current_user)
+    await db.delete(schedule)
+    await db.commit()
+    return {"message": "Schedule deleted successfully"}
+
+@router.get("/{schedule_id}/changes", response_model=list[ScanChangeSchema])
+async def list_schedule_changes(
+    schedule_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Runs of this schedule whose scores or issue counts moved, newest first.
+    """
+    await _get_own_schedule(db, schedule_id, current_user)
+    statement = (
+        select(ScanChange)
+        .where(ScanChange.schedule_id == schedule_id)
+        .order_by(ScanChange.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(statement)
+    return result.scalars().all()
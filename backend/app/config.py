@@ -20,6 +20,78 @@ class Settings(BaseSettings):
     # --- Redis ---
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # --- Celery worker pools (used when -c / --prefetch-multiplier are not given) ---
+    CELERY_LIGHT_CONCURRENCY: int = 16
+    CELERY_LIGHT_PREFETCH: int = 4
+    CELERY_HEAVY_CONCURRENCY: int = 2
+    CELERY_HEAVY_PREFETCH: int = 1
+
+    # --- Scan execution: "celery" tasks, or "streams" for app.workers.stream_runner ---
+    SCAN_EXECUTOR: str = "celery"
+    STREAM_RUNNER_CONCURRENCY: int = 50
+    STREAM_RUNNER_CLAIM_IDLE_SECONDS: int = 300
+    STREAM_RUNNER_MAX_DELIVERIES: int = 3
+
+    # --- Scan admission scheduler ---
+    SCHED_MAX_INFLIGHT_SCANS: int = 20
+    SCHED_SCAN_BURST: int = 20
+    SCHED_SCANS_PER_HOUR: int = 60
+    # One full 5-tier load test costs ~174k user-seconds
+    SCHED_LOAD_USER_SECONDS_BURST: int = 400_000
+    SCHED_LOAD_USER_SECONDS_PER_HOUR: int = 200_000
+    SCHED_BULK_MAX_URLS: int = 5000
+    SCHED_BULK_URLS_PER_HOUR: int = 10_000
+
+    # --- Live scan events ---
+    # Log lines published within this window go out as one frame
+    EVENT_LOG_FRAME_MS: int = 250
+    # A WebSocket client has this long to send its subscribe frame
+    WS_SUBSCRIBE_TIMEOUT_SECONDS: int = 10
+    WS_PING_INTERVAL_SECONDS: int = 20
+    # Clients that send nothing (not even a pong) for this long are closed
+    WS_IDLE_TIMEOUT_SECONDS: int = 60
+
+    # --- Metrics (GET /metrics, for internal scrapers) ---
+    # Scrapers send it as a bearer token; the endpoint answers 404 while it is empty
+    METRICS_TOKEN: str = ""
+
+    # --- DNS answer cache (app.core.dns_cache) ---
+    DNS_CACHE_MAX_TTL_SECONDS: int = 3600
+    # Used for negative answers without an SOA record
+    DNS_CACHE_NEGATIVE_TTL_SECONDS: int = 60
+    DNS_CACHE_NEGATIVE_MAX_TTL_SECONDS: int = 300
+    DNS_CACHE_LOCAL_ENTRIES: int = 10_000
+
+    # --- DNS scanner port probe (sets in app.scanners.tcp_probe.PORT_SETS) ---
+    PORT_SCAN_SET: str = "web"
+    # Connections in flight to one host at once
+    PORT_SCAN_CONCURRENCY: int = 20
+    PORT_SCAN_TIMEOUT_SECONDS: float = 3.0
+    # Connects per open port, for its connect-time distribution
+    PORT_SCAN_SAMPLES: int = 3
+    # Latency: connects per address to 443 (or 80), one started every LATENCY_SAMPLE_SPACING_MS
+    LATENCY_SAMPLES: int = 10
+    LATENCY_SAMPLE_SPACING_MS: int = 100
+
+    # --- DNS propagation check ---
+    # Resolver name -> "address" or "address#port"; empty uses dns_scanner.PROPAGATION_SERVERS
+    PROPAGATION_RESOLVERS: dict[str, str] = {}
+    PROPAGATION_CONCURRENCY: int = 32
+    # Per resolver; a slow resolver only costs its own answer
+    PROPAGATION_TIMEOUT_SECONDS: float = 3.0
+
+    # --- Bulk DNS mode (DNSScanner.bulk_scan) ---
+    BULK_DNS_MAX_HOSTS: int = 10_000
+    # Hosts resolved at once per bulk run
+    BULK_DNS_CONCURRENCY: int = 100
+    # Queries started per second, across every bulk run of the process
+    BULK_DNS_QUERIES_PER_SECOND: int = 500
+    # Queries started per second for all bulk runs of one user together
+    BULK_DNS_USER_QUERIES_PER_SECOND: int = 200
+    # Per-user hostname bucket (scan_scheduler.admit_bulk_dns); the burst must cover BULK_DNS_MAX_HOSTS
+    BULK_DNS_HOSTS_BURST: int = 20_000
+    BULK_DNS_HOSTS_PER_HOUR: int = 50_000
+
     # --- JWT ---
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
@@ -39,6 +39,14 @@ def init_db(database_url: str, echo: bool = False):
         expire_on_commit=False,
     )
 
+async def close_db():
+    """Dispose of the engine and its connection pool."""
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _session_factory = None
+
 def _ensure_initialized():
     global _session_factory
     if _session_factory is None:
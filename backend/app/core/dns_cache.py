@@ -0,0 +1,370 @@
+"""Shared DNS answer cache for scanners and their HTTP clients.
+
+Answers are cached per (resolver, name, record type) for as long as their
+TTL allows, first in a bounded in-process LRU and then in Redis, so every
+scan of a domain within the TTL (by any worker) reuses the first lookup.
+NXDOMAIN and empty answers are cached as well, for the SOA minimum of the
+zone (RFC 2308).  Cached entries keep the full response, so a hit is
+indistinguishable from a fresh ``dns.resolver.Answer``: record TTLs, the AD
+flag and the usual NXDOMAIN / NoAnswer exceptions all come through.
+
+``CachingResolver`` wraps a dnspython resolver; ``http_client()`` builds an
+``httpx.AsyncClient`` whose connections resolve through the same cache (and,
+in a worker process, share the runtime's connection pools).
+Cache failures (Redis down) only ever cost a fresh lookup.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import ipaddress
+import json
+import logging
+import ssl
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Iterable
+
+import dns.asyncresolver
+import dns.message
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.ttl
+import httpcore
+import httpx
+
+from app.config import settings
+from app.core.metrics import incr_counter
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "dns:"
+# httpx's own default pool limits
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+# The shared pools serve every concurrent client of a worker, so they are not capped at one client's limit
+SHARED_LIMITS = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+# Hit/miss counts are batched in-process and flushed to the shared counters at this interval
+STATS_FLUSH_SECONDS = 10
+
+POSITIVE = "answer"
+NXDOMAIN = "nxdomain"
+NO_ANSWER = "noanswer"
+
+# key -> (expires at, monotonic clock; kind; response)
+_local: OrderedDict[str, tuple[float, str, dns.message.Message]] = OrderedDict()
+_inflight: dict[str, asyncio.Future] = {}
+_stats: Counter = Counter()
+_stats_flushed_at = time.monotonic()
+# Running stats flushes, referenced so they are not garbage-collected mid-flight
+_flush_tasks: set[asyncio.Task] = set()
+# SSL contexts by verify flag; building one loads the whole CA bundle
+_ssl_contexts: dict[bool, ssl.SSLContext] = {}
+# Process-wide transports by verify flag, while open_http_pools() is in effect
+_shared_transports: dict[bool, "CachedDNSTransport"] = {}
+
+
+def _record(event: str) -> None:
+    global _stats_flushed_at
+    _stats[event] += 1
+    now = time.monotonic()
+    if now - _stats_flushed_at >= STATS_FLUSH_SECONDS:
+        _stats_flushed_at = now
+        pending = dict(_stats)
+        _stats.clear()
+        task = asyncio.get_running_loop().create_task(_flush_stats(pending))
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_tasks.discard)
+
+
+async def _flush_stats(pending: dict[str, int]) -> None:
+    for event, count in pending.items():
+        await incr_counter(f"dns_cache.{event}", count)
+
+
+def _ttl(kind: str, response: dns.message.Message) -> int:
+    """How long an answer may be reused: its minimum TTL, or the SOA minimum for negative answers."""
+    try:
+        ttl = response.resolve_chaining().minimum_ttl
+    except Exception:
+        return 0
+    if kind == POSITIVE:
+        return min(ttl, settings.DNS_CACHE_MAX_TTL_SECONDS)
+    if ttl >= dns.ttl.MAX_TTL:  # no SOA in the authority section
+        ttl = settings.DNS_CACHE_NEGATIVE_TTL_SECONDS
+    return min(ttl, settings.DNS_CACHE_NEGATIVE_MAX_TTL_SECONDS)
+
+
+class CachingResolver:
+    """A ``dns.asyncresolver.Resolver`` front that answers from the cache while the TTL allows."""
+
+    def __init__(self, resolver: dns.asyncresolver.Resolver | None = None) -> None:
+        self.resolver = resolver or dns.asyncresolver.Resolver()
+        # Different upstreams may legitimately disagree, so they never share entries
+        self._scope = f"{','.join(str(ns) for ns in self.resolver.nameservers)}:{self.resolver.port}"
+
+    def _key(self, qname: dns.name.Name, rdtype: dns.rdatatype.RdataType) -> str:
+        return f"{CACHE_PREFIX}{self._scope}:{qname.to_text().lower()}:{dns.rdatatype.to_text(rdtype)}"
+
+    async def resolve(self, qname: str, rdtype: str = "A") -> dns.resolver.Answer:
+        """Resolve like ``dns.asyncresolver.Resolver.resolve``, from the cache when possible."""
+        answer, _ = await self.resolve_with_source(qname, rdtype)
+        return answer
+
+    async def resolve_with_source(self, qname: str, rdtype: str = "A") -> tuple[dns.resolver.Answer, str]:
+        """Resolve and say where the answer came from.
+
+        The source is ``"local"`` or ``"redis"`` for cache hits, ``"shared"``
+        when another caller's identical lookup was in flight, and
+        ``"network"`` otherwise.
+
+        Raises:
+            dns.resolver.NXDOMAIN, dns.resolver.NoAnswer: Also when served from the cache.
+        """
+        name = dns.name.from_text(qname)
+        rdtype_value = dns.rdatatype.from_text(rdtype)
+        key = self._key(name, rdtype_value)
+
+        entry = self._get_local(key)
+        source = "local"
+        while entry is None:
+            pending = _inflight.get(key)
+            if pending is not None:
+                # Someone is already asking; share their answer
+                try:
+                    entry, _ = await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    if not pending.cancelled() or asyncio.current_task().cancelling():
+                        raise
+                    # Only the caller that owned the lookup was cancelled: ask again
+                    continue
+                source = "shared"
+            else:
+                future = asyncio.get_running_loop().create_future()
+                _inflight[key] = future
+                try:
+                    entry, source = await self._fetch(key, name, rdtype)
+                    future.set_result((entry, source))
+                except asyncio.CancelledError:
+                    # Our cancellation is not the waiters' answer; they retry on their own
+                    future.cancel()
+                    raise
+                except Exception as exc:
+                    future.set_exception(exc)
+                    # Nobody may be waiting on it; don't warn about an unretrieved exception
+                    future.exception()
+                    raise
+                finally:
+                    del _inflight[key]
+
+        _record(f"hit.{source}" if source != "network" else "miss")
+        kind, response = entry
+        if kind == NXDOMAIN:
+            _record("negative")
+            raise dns.resolver.NXDOMAIN(qnames=[name], responses={name: response})
+        if kind == NO_ANSWER:
+            _record("negative")
+            raise dns.resolver.NoAnswer(response=response)
+        return dns.resolver.Answer(name, rdtype_value, dns.rdataclass.IN, response), source
+
+    def _get_local(self, key: str) -> tuple[str, dns.message.Message] | None:
+        cached = _local.get(key)
+        if cached is None:
+            return None
+        expires_at, kind, response = cached
+        if expires_at <= time.monotonic():
+            del _local[key]
+            return None
+        _local.move_to_end(key)
+        return kind, response
+
+    def _put_local(self, key: str, ttl: int, kind: str, response: dns.message.Message) -> None:
+        _local[key] = (time.monotonic() + ttl, kind, response)
+        _local.move_to_end(key)
+        while len(_local) > settings.DNS_CACHE_LOCAL_ENTRIES:
+            _local.popitem(last=False)
+
+    async def _fetch(self, key: str, name: dns.name.Name, rdtype: str) -> tuple[tuple[str, dns.message.Message], str]:
+        """Fill a local miss from Redis, or from the network (and then populate both)."""
+        try:
+            client = await get_redis()
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.ttl(key)
+                raw, ttl = await pipe.execute()
+        except Exception as exc:
+            logger.debug("DNS cache read failed for %s: %s", key, exc)
+            raw, ttl = None, 0
+        if raw and ttl > 0:
+            stored = json.loads(raw)
+            response = dns.message.from_wire(base64.b64decode(stored["wire"]))
+            self._put_local(key, ttl, stored["kind"], response)
+            return (stored["kind"], response), "redis"
+
+        try:
+            answer = await self.resolver.resolve(name, rdtype)
+            kind, response = POSITIVE, answer.response
+        except dns.resolver.NXDOMAIN as exc:
+            kind, response = NXDOMAIN, next(iter((exc.kwargs.get("responses") or {}).values()), None)
+            if response is None:
+                raise
+        except dns.resolver.NoAnswer as exc:
+            kind, response = NO_ANSWER, exc.kwargs.get("response")
+            if response is None:
+                raise
+
+        ttl = _ttl(kind, response)
+        if ttl > 0:
+            self._put_local(key, ttl, kind, response)
+            try:
+                client = await get_redis()
+                value = json.dumps({"kind": kind, "wire": base64.b64encode(response.to_wire()).decode()})
+                await client.set(key, value, ex=ttl)
+            except Exception as exc:
+                logger.debug("DNS cache write failed for %s: %s", key, exc)
+        return (kind, response), "network"
+
+    async def addresses(self, host: str) -> list[str]:
+        """IPv4 then IPv6 addresses of *host* (an IP literal is returned as is)."""
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        async def _family(rdtype: str) -> list[str]:
+            try:
+                return [str(rdata) for rdata in await self.resolve(host, rdtype)]
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                return []
+
+        v4, v6 = await asyncio.gather(_family("A"), _family("AAAA"))
+        return v4 + v6
+
+
+# Cache in front of the system resolver, for everything that just needs an address
+dns_resolver = CachingResolver()
+
+
+class CachedDNSBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that resolves hostnames through the DNS cache.
+
+    Only the TCP connect goes to the resolved address; TLS still uses the
+    hostname for SNI and certificate checks.
+    """
+
+    def __init__(self, resolver: CachingResolver | None = None) -> None:
+        self._resolver = resolver or dns_resolver
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self._resolver.addresses(host)
+        except Exception as exc:
+            raise httpcore.ConnectError(f"Could not resolve {host}: {exc}") from exc
+        if not addresses:
+            raise httpcore.ConnectError(f"Could not resolve {host}")
+        error: Exception | None = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                error = exc
+        raise error
+
+    async def connect_unix_socket(
+        self, path: str, timeout: float | None = None, socket_options: Iterable[Any] | None = None
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def _ssl_context(verify: Any) -> ssl.SSLContext:
+    """The SSL context for *verify*, built once per flag (custom CA paths and contexts are built as given)."""
+    if isinstance(verify, ssl.SSLContext):
+        return verify
+    if not isinstance(verify, bool):
+        return httpx.create_ssl_context(verify=verify)
+    if verify not in _ssl_contexts:
+        _ssl_contexts[verify] = httpx.create_ssl_context(verify=verify)
+    return _ssl_contexts[verify]
+
+
+class CachedDNSTransport(httpx.AsyncHTTPTransport):
+    """``httpx.AsyncHTTPTransport`` whose connection pool uses ``CachedDNSBackend``.
+
+    The parent is built with the cached SSL context, so it loads no CA bundle.
+    httpx has no public way to choose the network backend, so the pool it
+    builds is then replaced by an identical one on ``CachedDNSBackend``.
+    ``_pool`` is the only httpx internal used; requirements.txt pins httpx
+    and httpcore, and the DNS cache tests catch a change to it.
+    """
+
+    def __init__(self, verify: Any = True, http2: bool = False, limits: httpx.Limits = DEFAULT_LIMITS, retries: int = 0) -> None:
+        ssl_context = _ssl_context(verify)
+        super().__init__(verify=ssl_context, http2=http2, limits=limits, retries=retries)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context,
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            retries=retries,
+            network_backend=CachedDNSBackend(),
+        )
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Hands requests to a process-wide transport; closing the client leaves its pool open."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def open_http_pools() -> None:
+    """Share one connection pool per verify flag between ``http_client()`` calls until ``close_http_pools()``.
+
+    Only for a process that keeps one event loop for its lifetime (the worker
+    runtime): pooled connections are bound to the loop that opened them.
+    """
+    for verify in (True, False):
+        if verify not in _shared_transports:
+            _shared_transports[verify] = CachedDNSTransport(verify=verify, limits=SHARED_LIMITS)
+
+
+async def close_http_pools() -> None:
+    """Close the shared pools; later ``http_client()`` calls get a pool of their own again."""
+    transports = list(_shared_transports.values())
+    _shared_transports.clear()
+    for transport in transports:
+        await transport.aclose()
+
+
+def http_client(verify: Any = True, limits: httpx.Limits = DEFAULT_LIMITS, **kwargs: Any) -> httpx.AsyncClient:
+    """An ``httpx.AsyncClient`` (same keyword arguments) that resolves through the DNS cache.
+
+    With the shared pools open, clients with the default limits and a plain
+    verify flag reuse their keep-alive connections; custom limits (or CA
+    bundles) still get a pool of their own.
+    """
+    if limits is DEFAULT_LIMITS and isinstance(verify, bool) and verify in _shared_transports:
+        return httpx.AsyncClient(transport=_SharedTransport(_shared_transports[verify]), **kwargs)
+    return httpx.AsyncClient(transport=CachedDNSTransport(verify=verify, limits=limits), **kwargs)
@@ -0,0 +1,181 @@
+"""Distributed lease locks backed by Redis."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Renew only if we still own the lease
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Delete only if we still own the lease
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+WaitCallback = Callable[[int], Awaitable[None]]
+
+
+class LeaseLost(Exception):
+    """The lease expired or was taken over while the holder was still working."""
+
+
+class HostLease:
+    """FIFO lease lock on a target host.
+
+    The lease is a Redis key with a short TTL that a background heartbeat keeps
+    renewing, so a crashed holder releases it automatically once the TTL runs
+    out.  Waiters register in a sorted set ordered by arrival; waiters that stop
+    polling (crashed) are pruned after the same TTL, so the queue cannot jam.
+
+    If a renewal finds the lease gone, the task that acquired it is cancelled:
+    another holder may already be working on the host.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        holder: str | None = None,
+        ttl_seconds: float = 30.0,
+        heartbeat_seconds: float = 10.0,
+        poll_seconds: float = 2.0,
+    ) -> None:
+        self.host = host.lower()
+        self.holder = holder or uuid.uuid4().hex
+        self.token = f"{self.holder}:{uuid.uuid4().hex}"
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.lost = False
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._owner: Optional[asyncio.Task] = None
+
+    @property
+    def _key(self) -> str:
+        return f"host_lease:{self.host}"
+
+    @property
+    def _queue_key(self) -> str:
+        return f"host_lease_queue:{self.host}"
+
+    @property
+    def _seen_key(self) -> str:
+        return f"host_lease_seen:{self.host}"
+
+    async def position(self) -> int | None:
+        """Return this waiter's 1-based queue position, or None if not queued."""
+        client = await get_redis()
+        rank = await client.zrank(self._queue_key, self.holder)
+        return None if rank is None else rank + 1
+
+    async def _touch(self) -> None:
+        """Register or refresh this waiter and prune waiters that stopped polling."""
+        client = await get_redis()
+        now = time.time()
+        stale_before = now - self.ttl_ms / 1000
+        stale = await client.zrangebyscore(self._seen_key, "-inf", stale_before)
+        pipe = client.pipeline()
+        if stale:
+            pipe.zrem(self._queue_key, *stale)
+            pipe.zrem(self._seen_key, *stale)
+        pipe.zadd(self._queue_key, {self.holder: now}, nx=True)
+        pipe.zadd(self._seen_key, {self.holder: now})
+        pipe.expire(self._queue_key, int(self.ttl_ms / 1000) * 4)
+        pipe.expire(self._seen_key, int(self.ttl_ms / 1000) * 4)
+        await pipe.execute()
+
+    async def _leave_queue(self) -> None:
+        client = await get_redis()
+        pipe = client.pipeline()
+        pipe.zrem(self._queue_key, self.holder)
+        pipe.zrem(self._seen_key, self.holder)
+        await pipe.execute()
+
+    async def acquire(self, on_wait: WaitCallback | None = None) -> None:
+        """Wait in line until the lease is ours.
+
+        *on_wait* is awaited with the current queue position whenever it changes.
+        """
+        client = await get_redis()
+        last_position: int | None = None
+        try:
+            while True:
+                await self._touch()
+                position = await self.position()
+                if position == 1 and await client.set(self._key, self.token, px=self.ttl_ms, nx=True):
+                    break
+                if on_wait is not None and position != last_position:
+                    # Position 1 means "next", still behind the current holder
+                    await on_wait(position or 1)
+                last_position = position
+                await asyncio.sleep(self.poll_seconds)
+        finally:
+            await self._leave_queue()
+
+        self.lost = False
+        self._owner = asyncio.current_task()
+        self._heartbeat = asyncio.create_task(self._renew_forever())
+        logger.info("Acquired host lease on %s for %s", self.host, self.holder)
+
+    async def _renew_forever(self) -> None:
+        client = await get_redis()
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                renewed = await client.eval(_RENEW_SCRIPT, 1, self._key, self.token, self.ttl_ms)
+            except Exception as exc:
+                logger.warning("Host lease heartbeat failed on %s: %s", self.host, exc)
+                continue
+            if not renewed:
+                self.lost = True
+                logger.warning("Host lease on %s was lost by %s", self.host, self.holder)
+                if self._owner is not None:
+                    self._owner.cancel()
+                return
+
+    async def release(self) -> None:
+        """Stop the heartbeat and delete the lease if we still own it."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        try:
+            client = await get_redis()
+            await client.eval(_RELEASE_SCRIPT, 1, self._key, self.token)
+        except Exception as exc:
+            logger.warning("Failed to release host lease on %s: %s", self.host, exc)
+
+
+@asynccontextmanager
+async def host_lease(host: str, holder: str, on_wait: WaitCallback | None = None) -> AsyncIterator[HostLease]:
+    """Hold the lease on *host* for the duration of the block.
+
+    Raises:
+        LeaseLost: the lease could not be renewed; the block was cancelled.
+    """
+    lease = HostLease(host, holder)
+    await lease.acquire(on_wait)
+    try:
+        yield lease
+    except asyncio.CancelledError:
+        # Only the heartbeat's cancel is ours to turn into an error; anything else stays a cancellation
+        if lease.lost and asyncio.current_task().uncancel() == 0:
+            raise LeaseLost(f"Host lease on {lease.host} was lost") from None
+        raise
+    finally:
+        await lease.release()
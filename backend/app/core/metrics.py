@@ -0,0 +1,31 @@
+"""Lightweight counters shared by the API and the workers.
+
+Counters live in a single Redis hash so that increments from Celery workers
+are visible to the API's ``/metrics`` endpoint.  Failures never propagate:
+metrics must not break a scan.
+"""
+from __future__ import annotations
+
+import logging
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_KEY = "metrics:counters"
+
+
+async def incr_counter(name: str, amount: int = 1) -> None:
+    """Increment a named counter (e.g. ``module_cache.hit.dns``)."""
+    try:
+        client = await get_redis()
+        await client.hincrby(COUNTERS_KEY, name, amount)
+    except Exception as exc:
+        logger.debug("Failed to increment counter %s: %s", name, exc)
+
+
+async def get_counters(prefix: str = "") -> dict[str, int]:
+    """Return all counters, optionally restricted to names starting with *prefix*."""
+    client = await get_redis()
+    raw = await client.hgetall(COUNTERS_KEY)
+    return {name: int(value) for name, value in sorted(raw.items()) if name.startswith(prefix)}
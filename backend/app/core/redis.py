@@ -72,3 +72,50 @@ async def check_rate_limit(
     pipe.expire(full_key, window_seconds)
     await pipe.execute()
     return True
+
+
+# ── Live scan phase ──
+# The phase changes several times per scan; keeping it in Redis avoids a
+# Postgres commit per transition. The DB column only holds terminal phases.
+# Scan-wide phases (starting, completed, failed) live in scan_phase:<id>,
+# module states in the scan_modules:<id> hash.
+
+SCAN_PHASE_TTL_SECONDS = 6 * 60 * 60
+
+
+async def set_scan_phase(scan_id: str, phase: str) -> None:
+    """Record the scan-wide phase of a running scan (starting, completed, failed)."""
+    client = await get_redis()
+    await client.set(f"scan_phase:{scan_id}", phase, ex=SCAN_PHASE_TTL_SECONDS)
+
+
+async def get_scan_phase(scan_id: str) -> Optional[str]:
+    """Return the scan-wide live phase of a scan, or None if it is not tracked."""
+    client = await get_redis()
+    return await client.get(f"scan_phase:{scan_id}")
+
+
+async def set_module_state(scan_id: str, module: str, state: str) -> None:
+    """Record the state of one module of a running scan (running, done or failed).
+
+    Modules can run as parallel tasks, so each one writes its own hash field
+    instead of the scan-wide phase key.
+    """
+    client = await get_redis()
+    pipe = client.pipeline()
+    pipe.hset(f"scan_modules:{scan_id}", module, state)
+    pipe.expire(f"scan_modules:{scan_id}", SCAN_PHASE_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def get_scan_phases(scan_ids: list[str]) -> dict[str, tuple[Optional[str], dict[str, str]]]:
+    """Return the live phase and module states of several scans with a single round trip."""
+    if not scan_ids:
+        return {}
+    client = await get_redis()
+    pipe = client.pipeline()
+    pipe.mget([f"scan_phase:{scan_id}" for scan_id in scan_ids])
+    for scan_id in scan_ids:
+        pipe.hgetall(f"scan_modules:{scan_id}")
+    phases, *modules = await pipe.execute()
+    return {scan_id: (phase, states) for scan_id, phase, states in zip(scan_ids, phases, modules)}
@@ -1,12 +1,17 @@
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
+from app.api.deps import require_metrics_token
 from app.api.v1.router import api_router
+from app.core.metrics import get_counters
+from app.core.redis import init_redis, close_redis
+from app.websocket.event_bus import event_bus
 from app.websocket.manager import ws_manager
+from app.websocket.session import serve_scan_socket
 
 # Note: We rely on Alembic for DB migrations, 
 # but we could optionally create tables here if desired.
@@ -20,9 +25,14 @@ async def lifespan(app: FastAPI):
     import os
     os.makedirs("static/reports", exist_ok=True)
     logger.info("Starting up Synapsbranch backend...")
+    await init_redis()
+    await event_bus.start()
     yield
     # Shutdown
     logger.info("Shutting down Synapsbranch backend...")
+    await event_bus.stop()
+    await ws_manager.close_all()
+    await close_redis()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -54,8 +64,22 @@ app.include_router(api_router, prefix="/api/v1")
 
 # WebSocket Route
 @app.websocket("/ws/scan/{scan_id}")
-async def websocket_endpoint(websocket, scan_id: str):
-    await ws_manager.connect(scan_id, websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    scan_id: str,
+    last_event_id: str | None = None,
+    encoding: str | None = None,
+    token: str | None = None,
+):
+    """
+    Live events of a scan. The client authenticates with a subscribe frame
+    (see app.websocket.session); events it missed (all of them on a first
+    connect, or those after ``last_event_id`` on a reconnect) are replayed first.
+
+    Frames are JSON text unless the client offers the ``webpulse.msgpack.v1``
+    subprotocol or passes ``encoding=msgpack`` (see app.websocket.codec).
+    """
+    await serve_scan_socket(websocket, scan_id, last_event_id=last_event_id, encoding=encoding, token=token)
 
 # Healthcheck
 @app.get("/", tags=["Health"])
@@ -68,4 +92,10 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", tags=["Health"], dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    # Internal only (see require_metrics_token). Counters are shared by every process;
+    # the WebSocket gauges are this replica's own
+    return {"counters": await get_counters(), "websocket": ws_manager.stats()}
@@ -1,7 +1,10 @@
 # Models package — export all models so Alembic can detect them
 from app.models.user import User, AuthProvider
-from app.models.scan import Scan, ScanStatus
+from app.models.scan import Scan, ScanStatus, ScanProfile
+from app.models.scan_batch import ScanBatch
+from app.models.scan_schedule import ScanSchedule, ScanChange
 from app.models.scan_result import ScanResult, ScanModule
+from app.models.scan_event_log import ScanEventLog
 from app.models.report import Report
 from app.models.refresh_tokens import RefreshToken
 
@@ -10,8 +13,13 @@ __all__ = [
     "AuthProvider",
     "Scan",
     "ScanStatus",
+    "ScanProfile",
+    "ScanBatch",
+    "ScanSchedule",
+    "ScanChange",
     "ScanResult",
     "ScanModule",
+    "ScanEventLog",
     "Report",
     "RefreshToken",
 ]
@@ -3,7 +3,7 @@ import enum
 from datetime import datetime
 
 from sqlalchemy import String, Text, Integer, Enum as SAEnum, DateTime, ForeignKey, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -16,6 +16,13 @@ class ScanStatus(str, enum.Enum):
     failed = "failed"
 
 
+class ScanProfile(str, enum.Enum):
+    quick = "quick"
+    standard = "standard"
+    full = "full"
+    custom = "custom"
+
+
 class Scan(Base):
     __tablename__ = "scans"
 
@@ -26,9 +33,25 @@ class Scan(Base):
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     url: Mapped[str] = mapped_column(Text, nullable=False)
+    normalized_url: Mapped[str | None] = mapped_column(Text, nullable=True, index=True)
+    # Set when this scan was attached to an identical in-flight or recent run
+    coalesced_into_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scans.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     status: Mapped[ScanStatus] = mapped_column(
         SAEnum(ScanStatus, name="scan_status_enum"), default=ScanStatus.pending, nullable=False
     )
+    batch_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scan_batches.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    schedule_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scan_schedules.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    profile: Mapped[ScanProfile] = mapped_column(
+        SAEnum(ScanProfile, name="scan_profile_enum"), default=ScanProfile.full, nullable=False
+    )
+    # Module names (ScanModule values) selected for this scan, in execution order
+    modules: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
     current_phase: Mapped[str | None] = mapped_column(String(50), nullable=True)
     overall_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -38,6 +61,7 @@ class Scan(Base):
 
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="scans")
+    batch: Mapped["ScanBatch | None"] = relationship("ScanBatch", back_populates="scans")
     results: Mapped[list["ScanResult"]] = relationship(
         "ScanResult", back_populates="scan", cascade="all, delete-orphan"
     )
@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Integer, Enum as SAEnum, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+from app.models.scan import ScanProfile
+
+
+class ScanBatch(Base):
+    __tablename__ = "scan_batches"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    profile: Mapped[ScanProfile] = mapped_column(
+        SAEnum(ScanProfile, name="scan_profile_enum"), nullable=False
+    )
+    modules: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Duplicate or unparseable URLs dropped at submission
+    skipped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    scans: Mapped[list["Scan"]] = relationship("Scan", back_populates="batch")
+
+    def __repr__(self) -> str:
+        return f"<ScanBatch id={self.id} user_id={self.user_id} total={self.total}>"
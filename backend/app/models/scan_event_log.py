@@ -0,0 +1,24 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ScanEventLog(Base):
+    """Live event log of a finished scan, compacted from its Redis Stream."""
+    __tablename__ = "scan_event_logs"
+
+    scan_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scans.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Events in order, each carrying its original event_id
+    events: Mapped[list[dict]] = mapped_column(JSONB, nullable=False, default=list)
+    last_event_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<ScanEventLog scan_id={self.scan_id} events={len(self.events)}>"
@@ -36,10 +36,20 @@ class ScanResult(Base):
     issues_high: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     issues_medium: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     issues_low: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Digest of the module inputs; equal fingerprints allow a result to be carried over
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    # Set when this result was copied from an earlier run instead of being re-scanned
+    carried_over_from_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scan_results.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     scan: Mapped["Scan"] = relationship("Scan", back_populates="results")
 
+    @property
+    def is_carried_over(self) -> bool:
+        return self.carried_over_from_id is not None
+
     def __repr__(self) -> str:
         return f"<ScanResult scan_id={self.scan_id} module={self.module} score={self.score}>"
@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Text, Integer, Boolean, Enum as SAEnum, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+from app.models.scan import ScanProfile
+
+
+class ScanSchedule(Base):
+    __tablename__ = "scan_schedules"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    normalized_url: Mapped[str] = mapped_column(Text, nullable=False)
+    profile: Mapped[ScanProfile] = mapped_column(
+        SAEnum(ScanProfile, name="scan_profile_enum"), nullable=False
+    )
+    modules: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
+    interval_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Runs are spread over this window with a fixed per-schedule offset
+    jitter_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    next_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    # Set when a due run was refused by the admission quota: the run is retried then,
+    # while next_run_at keeps the slot it belongs to (and the grid the next slots follow)
+    retry_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Latest scan started by this schedule; finished runs are diffed against the previous one
+    last_scan_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scans.id", ondelete="SET NULL", use_alter=True), nullable=True
+    )
+    # Latest completed scan, the baseline for the next diff
+    baseline_scan_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scans.id", ondelete="SET NULL", use_alter=True), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    changes: Mapped[list["ScanChange"]] = relationship(
+        "ScanChange", back_populates="schedule", cascade="all, delete-orphan"
+    )
+
+    def __repr__(self) -> str:
+        return f"<ScanSchedule id={self.id} url={self.url} every={self.interval_seconds}s>"
+
+
+class ScanChange(Base):
+    """Compact diff between two consecutive completed runs of a schedule.
+
+    Only written when a score or an issue count actually moved.
+    """
+    __tablename__ = "scan_changes"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    schedule_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scan_schedules.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    scan_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scans.id", ondelete="CASCADE"), nullable=False
+    )
+    previous_scan_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("scans.id", ondelete="SET NULL"), nullable=True
+    )
+    # {"overall_score": [old, new], "modules": {module: {"score": [old, new], "issues": {severity: [old, new]}}}}
+    diff: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    schedule: Mapped["ScanSchedule"] = relationship("ScanSchedule", back_populates="changes")
+
+    def __repr__(self) -> str:
+        return f"<ScanChange schedule_id={self.schedule_id} scan_id={self.scan_id}>"
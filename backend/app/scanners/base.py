@@ -1,15 +1,29 @@
 """Abstract base scanner defining the interface for all scan modules."""
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Coroutine
 
+import httpx
+
 logger = logging.getLogger(__name__)
 
 # Type alias for the live-update callback used by scanners
 ScanCallback = Callable[[dict[str, Any]], Coroutine[Any, Any, None]]
 
+# Response headers that change on every request and must not affect fingerprints
+VOLATILE_HEADERS = {
+    "date", "age", "expires", "set-cookie", "x-request-id", "x-amzn-requestid",
+    "cf-ray", "server-timing", "x-runtime", "x-served-by", "x-timer", "via",
+}
+
+# Cookie attributes whose values are stable and matter for the cookie checks;
+# other attributes (Expires, Max-Age) only count by name
+COOKIE_ATTRIBUTES_WITH_VALUES = {"samesite", "path", "domain"}
+
 
 class BaseScanner(ABC):
     """Base class that every scanner module must inherit from.
@@ -38,6 +52,57 @@ class BaseScanner(ABC):
         """
         ...
 
+    async def fingerprint(self, url: str) -> str | None:
+        """Return a digest of the inputs this module's result depends on.
+
+        Two runs with the same fingerprint are expected to produce the same
+        result, which lets the orchestrator carry a previous result over
+        instead of re-scanning.  Returns ``None`` when the module cannot be
+        fingerprinted cheaply; such modules are always executed.
+        """
+        return None
+
+    @staticmethod
+    def _digest(*parts: Any) -> str:
+        """Hash arbitrary JSON-serialisable parts into a stable hex digest."""
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _response_signature(response: httpx.Response) -> dict[str, Any]:
+        """Reduce an HTTP response to the parts that matter for fingerprinting."""
+        headers = sorted(
+            (name.lower(), value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in VOLATILE_HEADERS
+        )
+        return {
+            "url": str(response.url),
+            "status": response.status_code,
+            "etag": response.headers.get("etag"),
+            "headers": headers,
+            "body": hashlib.sha256(response.content).hexdigest(),
+            "cookies": BaseScanner._cookie_signature(response),
+        }
+
+    @staticmethod
+    def _cookie_signature(response: httpx.Response) -> list[list[Any]]:
+        """Name and attributes (Secure, HttpOnly, SameSite, Path, Domain, ...) of every cookie set.
+
+        Cookie values and expiry times change on every response and are left out.
+        """
+        cookies = []
+        for header in response.headers.get_list("set-cookie"):
+            name, *attributes = (part.strip() for part in header.split(";"))
+            flags = []
+            for attribute in attributes:
+                key, _, value = attribute.partition("=")
+                key = key.strip().lower()
+                if key:
+                    flags.append(f"{key}={value.strip().lower()}" if key in COOKIE_ATTRIBUTES_WITH_VALUES else key)
+            cookies.append([name.split("=", 1)[0].strip(), sorted(flags)])
+        return sorted(cookies)
+
     @abstractmethod
     def calculate_score(self, results: dict[str, Any]) -> int:
         """Compute a 0-100 score from the raw scan results."""
@@ -2,29 +2,131 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
-import socket
+import secrets
 import time
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
 from urllib.parse import urlparse
 
 import dns.asyncresolver
+import dns.flags
 import dns.resolver
-import httpx
 
+from app.config import settings
+from app.core.dns_cache import CachingResolver, http_client
 from app.scanners.base import BaseScanner, ScanCallback
+from app.scanners.tcp_probe import CLOSED, FILTERED, OPEN, PORT_SETS, happy_eyeballs, probe_ports, sample_latency
 
 logger = logging.getLogger(__name__)
 
-# Public DNS servers for propagation checks
+# Public resolvers for propagation checks, by operator and region.
+# Entries are "address" or "address#port"; settings.PROPAGATION_RESOLVERS replaces the list.
 PROPAGATION_SERVERS = {
     "Google": "8.8.8.8",
+    "Google (secondary)": "8.8.4.4",
     "Cloudflare": "1.1.1.1",
+    "Cloudflare (secondary)": "1.0.0.1",
+    "Quad9": "9.9.9.9",
+    "Quad9 (secondary)": "149.112.112.112",
+    "Quad9 ECS": "9.9.9.11",
     "OpenDNS": "208.67.222.222",
+    "OpenDNS (secondary)": "208.67.220.220",
+    "Level3 (US)": "4.2.2.1",
+    "Level3 (US, secondary)": "4.2.2.2",
+    "UltraDNS (US)": "64.6.64.6",
+    "Hurricane Electric (US)": "74.82.42.42",
+    "Comodo Secure DNS (US)": "8.26.56.26",
+    "Control D (CA)": "76.76.2.0",
+    "Alternate DNS (US)": "76.76.19.19",
+    "CIRA Canadian Shield (CA)": "149.112.121.10",
+    "AdGuard (CY)": "94.140.14.14",
+    "DNS.SB (DE)": "185.222.222.222",
+    "Mullvad (SE)": "194.242.2.2",
+    "Digitale Gesellschaft (CH)": "185.95.218.42",
+    "FDN (FR)": "80.67.169.12",
+    "puntCAT (ES)": "109.69.8.51",
+    "SafeDNS (UK)": "195.46.39.39",
+    "CleanBrowsing": "185.228.168.9",
+    "Yandex (RU)": "77.88.8.8",
+    "AliDNS (CN)": "223.5.5.5",
+    "DNSPod (CN)": "119.29.29.29",
+    "114DNS (CN)": "114.114.114.114",
+    "Baidu (CN)": "180.76.76.76",
+    "Quad101 (TW)": "101.101.101.101",
+    "KT (KR)": "168.126.63.1",
 }
 
-SCAN_PORTS = [80, 443, 8080, 8443]
+RECORD_TYPES = ["A", "AAAA", "MX", "NS", "TXT", "SOA", "CNAME"]
+RESOLVER_TIMEOUT = 5.0
+
+# Per record type: {"answer": Answer | None, "error": Exception | None, "elapsed_ms": float | None, "cached": bool}
+Lookups = dict[str, dict[str, Any]]
+
+# Record types of a bulk-mode row
+BULK_RECORD_TYPES = ["A", "AAAA", "CNAME", "MX"]
+BULK_COLUMNS = ["host", "status", "a", "aaaa", "cname", "mx", "dnssec", "wildcard", "cached", "ms", "error"]
+
+# Earliest start of the next bulk-mode query (monotonic clock): under "" for the whole
+# process, and under each user ID for that user's bulk runs together
+_bulk_next_query_at: dict[str, float] = {}
+# A schedule whose next slot has passed says nothing a missing one doesn't, so those
+# are swept out at this interval; only users paced within it keep an entry
+BULK_PACER_PRUNE_SECONDS = 60.0
+_bulk_pruned_at = 0.0
+
+
+def _reserve_slot(key: str, now: float, rate: float) -> float:
+    """Book the next free query slot on the *key* schedule, no earlier than *now*."""
+    global _bulk_pruned_at
+    if now - _bulk_pruned_at >= BULK_PACER_PRUNE_SECONDS:
+        _bulk_pruned_at = now
+        for stale in [name for name, at in _bulk_next_query_at.items() if at <= now]:
+            del _bulk_next_query_at[stale]
+    start = max(now, _bulk_next_query_at.get(key, 0.0))
+    _bulk_next_query_at[key] = start + 1 / rate
+    return start
+
+
+async def _pace_bulk_query(user_id: str | None = None) -> None:
+    """Space bulk-mode queries out to ``BULK_DNS_QUERIES_PER_SECOND`` across the process.
+
+    With *user_id*, that user's queries are also held to
+    ``BULK_DNS_USER_QUERIES_PER_SECOND``, however many bulk runs they have
+    open, so the rest of the process budget stays available to other users.
+    """
+    if user_id is not None:
+        # Wait for the user's slot before booking a process slot, so a user with many
+        # queued queries cannot book the process schedule ahead of everyone else
+        now = time.monotonic()
+        start = _reserve_slot(user_id, now, settings.BULK_DNS_USER_QUERIES_PER_SECOND)
+        if start > now:
+            await asyncio.sleep(start - now)
+    now = time.monotonic()
+    start = _reserve_slot("", now, settings.BULK_DNS_QUERIES_PER_SECOND)
+    if start > now:
+        await asyncio.sleep(start - now)
+
+
+def make_resolver(
+    nameservers: list[str] | None = None, port: int = 53, timeout: float = RESOLVER_TIMEOUT
+) -> dns.asyncresolver.Resolver:
+    """A resolver with the scanner's timeouts, asking for DNSSEC data so answers carry the AD flag."""
+    resolver = dns.asyncresolver.Resolver(configure=not nameservers)
+    resolver.timeout = timeout
+    resolver.lifetime = timeout
+    resolver.use_edns(0, dns.flags.DO, 4096)
+    if nameservers:
+        resolver.nameservers = nameservers
+        resolver.port = port
+    return resolver
+
+
+def parse_server(server: str) -> tuple[str, int]:
+    """Split an "address#port" resolver entry (port 53 when absent)."""
+    address, _, port = server.partition("#")
+    return address, int(port) if port else 53
 
 
 class DNSScanner(BaseScanner):
@@ -32,34 +134,55 @@ class DNSScanner(BaseScanner):
 
     name = "dns"
 
+    def __init__(self, port_set: str | None = None, propagation_servers: dict[str, str] | None = None) -> None:
+        super().__init__()
+        self.propagation_servers = propagation_servers or settings.PROPAGATION_RESOLVERS or PROPAGATION_SERVERS
+        self.ports = PORT_SETS[port_set or settings.PORT_SCAN_SET]
+        # One resolver for every lookup of the scan, behind the shared answer cache
+        self.resolver = CachingResolver(make_resolver())
+        # Lookups made by fingerprint(), handed over to the run() that follows it
+        self._prefetched: dict[str, Lookups] = {}
+
     async def run(self, url: str, callback: ScanCallback) -> dict[str, Any]:
         """Execute all DNS sub-tests and report progress via callback."""
         hostname = urlparse(url).hostname or url.replace("https://", "").replace("http://", "").split("/")[0]
         results: dict[str, Any] = {"hostname": hostname, "checks": {}}
 
         # 1. Resolve DNS records
-        results["checks"]["records"] = await self._resolve_records(hostname, callback)
+        record_ttls: dict[str, int] = {}
+        lookups = self._prefetched.pop(hostname, None) or await self._lookup_records(hostname)
+        results["checks"]["records"] = await self._resolve_records(lookups, callback, record_ttls)
+        results["checks"]["record_ttls"] = record_ttls
+
+        if self._is_nxdomain(lookups):
+            # Nothing else can succeed for a name that does not exist
+            results["checks"].update(self._nxdomain_checks())
+            score = self.calculate_score(results)
+            results["score"] = score
+            results["grade"] = self.calculate_grade(score)
+            return results
 
         # 2. Resolution time
-        results["checks"]["resolution_time"] = await self._measure_resolution_time(hostname, callback)
+        results["checks"]["resolution_time"] = await self._measure_resolution_time(lookups, callback)
 
         # 3. DNSSEC
-        results["checks"]["dnssec"] = await self._check_dnssec(hostname, callback)
+        results["checks"]["dnssec"] = await self._check_dnssec(lookups, callback)
 
         # 4. Propagation
         results["checks"]["propagation"] = await self._check_propagation(hostname, callback)
 
-        # 5. Ping / latency
-        results["checks"]["latency"] = await self._check_latency(hostname, callback)
+        # 5. Port scan
+        results["checks"]["ports"], port_probe = await self._scan_ports(lookups, callback)
+        results["checks"]["port_probe"] = port_probe
 
-        # 6. Port scan
-        results["checks"]["ports"] = await self._scan_ports(hostname, callback)
+        # 6. Ping / latency
+        results["checks"]["latency"] = await self._check_latency(lookups, port_probe, callback)
 
         # 7. HTTP → HTTPS redirect
         results["checks"]["https_redirect"] = await self._check_https_redirect(hostname, callback)
 
         # 8. IPv6 support
-        results["checks"]["ipv6"] = await self._check_ipv6(hostname, callback)
+        results["checks"]["ipv6"] = await self._check_ipv6(lookups, callback)
 
         # Calculate score
         score = self.calculate_score(results)
@@ -69,20 +192,228 @@ class DNSScanner(BaseScanner):
 
         return results
 
+    async def fingerprint(self, url: str) -> str | None:
+        """Digest of the DNS answers (record data, not TTLs) and the scored reachability checks.
+
+        Besides the answers it covers the state of every configured port
+        (one connect each) and the outcome of the HTTP → HTTPS redirect, so a
+        host that closes 443 or drops its redirect gets a fresh scan.
+        Latency and propagation are measurements, not states, and are left out.
+        """
+        hostname = urlparse(url).hostname or url.replace("https://", "").replace("http://", "").split("/")[0]
+        lookups = await self._lookup_records(hostname)
+        answers: dict[str, list[str]] = {}
+        for rtype, lookup in lookups.items():
+            error = lookup["error"]
+            if error is not None and not isinstance(error, (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN)):
+                self.logger.debug("DNS fingerprint failed for %s: %s", hostname, error)
+                return None
+            answers[rtype] = sorted(str(rdata) for rdata in lookup["answer"]) if lookup["answer"] is not None else []
+        self._prefetched[hostname] = lookups
+
+        address = self._target_address(lookups)
+        ports: dict[int, str] = {}
+        if address is not None:
+            probed = await probe_ports(
+                address,
+                self.ports,
+                concurrency=settings.PORT_SCAN_CONCURRENCY,
+                timeout=settings.PORT_SCAN_TIMEOUT_SECONDS,
+            )
+            ports = {port: probe["state"] for port, probe in probed.items()}
+        try:
+            async with http_client(follow_redirects=False, timeout=10) as client:
+                response = await client.get(f"http://{hostname}")
+            redirect: Any = [response.status_code, response.headers.get("location", "").startswith("https://")]
+        except Exception as exc:
+            redirect = type(exc).__name__
+        return self._digest(hostname, answers, ports, redirect)
+
+    async def _lookup_records(
+        self,
+        hostname: str,
+        rtypes: list[str] = RECORD_TYPES,
+        pace: Callable[[], Awaitable[None]] | None = None,
+    ) -> Lookups:
+        """Query every record type at once through the shared resolver.
+
+        An NXDOMAIN answer for any type cancels the queries still running:
+        the name does not exist for the others either.  *pace*, if given, is
+        awaited before each query.
+        """
+        lookups: Lookups = {
+            rtype: {"answer": None, "error": None, "elapsed_ms": None, "cached": False} for rtype in rtypes
+        }
+
+        async def _query(rtype: str) -> None:
+            if pace is not None:
+                await pace()
+            start = time.monotonic()
+            try:
+                answer, source = await self.resolver.resolve_with_source(hostname, rtype)
+                lookups[rtype]["answer"] = answer
+                lookups[rtype]["cached"] = source != "network"
+            except Exception as exc:
+                lookups[rtype]["error"] = exc
+            lookups[rtype]["elapsed_ms"] = round((time.monotonic() - start) * 1000, 2)
+
+        tasks = [asyncio.create_task(_query(rtype)) for rtype in rtypes]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                await finished
+                nxdomain = next(
+                    (lookup["error"] for lookup in lookups.values() if isinstance(lookup["error"], dns.resolver.NXDOMAIN)),
+                    None,
+                )
+                if nxdomain is not None:
+                    for rtype, lookup in lookups.items():
+                        if lookup["elapsed_ms"] is None:
+                            lookup["error"] = nxdomain
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        return lookups
+
+    @staticmethod
+    def _is_nxdomain(lookups: Lookups) -> bool:
+        return any(isinstance(lookup["error"], dns.resolver.NXDOMAIN) for lookup in lookups.values())
+
+    def _nxdomain_checks(self) -> dict[str, Any]:
+        """Results of the sub-tests skipped for a name that does not exist."""
+        error = "NXDOMAIN"
+        return {
+            "resolution_time": {"resolution_ms": None, "error": error},
+            "dnssec": {"enabled": False, "error": error},
+            "propagation": {"resolvers": {}, "clusters": [], "consistent": False, "answered": 0, "total": 0},
+            "latency": {"latency_ms": None},
+            "ports": {port: False for port in self.ports},
+            "port_probe": {"address": None, "ports": {}},
+            "https_redirect": {"redirects": False, "to_https": False, "error": error},
+            "ipv6": {"supported": False, "addresses": [], "error": error},
+        }
+
+    # ── Bulk mode ──
+
+    @staticmethod
+    def expand_wordlist(domain: str, words: Iterable[str]) -> list[str]:
+        """The apex *domain* followed by ``<word>.<domain>`` for every word."""
+        domain = domain.strip().strip(".").lower()
+        return [domain, *(f"{word.strip().strip('.').lower()}.{domain}" for word in words if word.strip())]
+
+    async def bulk_scan(
+        self, hostnames: Iterable[str], domain: str | None = None, user_id: str | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """DNS-only scan of many hostnames, yielding one compact row per host as each completes.
+
+        Up to ``BULK_DNS_CONCURRENCY`` hosts are resolved at once through the
+        shared answer cache, and queries are paced process-wide and per
+        *user_id* (see ``_pace_bulk_query``).  Rows come
+        in completion order, not input order.  With *domain* (a wordlist
+        scan), a host whose A records equal those of a random label under
+        the domain is flagged as a wildcard answer.
+
+        Row keys are ``BULK_COLUMNS``; record lists are sorted.
+        """
+        wildcard = await self._wildcard_addresses(domain) if domain else None
+        suffix = f".{domain.strip('.').lower()}" if domain else None
+        pending = iter(hostnames)
+        pace = functools.partial(_pace_bulk_query, user_id)
+        rows: asyncio.Queue = asyncio.Queue(maxsize=settings.BULK_DNS_CONCURRENCY)
+
+        async def _worker() -> None:
+            for hostname in pending:
+                under_wildcard = wildcard if suffix and hostname.endswith(suffix) else None
+                await rows.put(await self._bulk_row(hostname, under_wildcard, pace))
+
+        async def _run() -> None:
+            try:
+                await asyncio.gather(*(_worker() for _ in range(settings.BULK_DNS_CONCURRENCY)))
+            finally:
+                await rows.put(None)
+
+        runner = asyncio.create_task(_run())
+        try:
+            while (row := await rows.get()) is not None:
+                yield row
+        finally:
+            runner.cancel()
+
+    async def _bulk_row(
+        self, hostname: str, wildcard: list[str] | None, pace: Callable[[], Awaitable[None]]
+    ) -> dict[str, Any]:
+        start = time.monotonic()
+        row: dict[str, Any] = {"host": hostname, "status": "ok"}
+        try:
+            # Most wordlist names do not exist: ask for the rest only once A has not come back NXDOMAIN
+            lookups = await self._lookup_records(hostname, BULK_RECORD_TYPES[:1], pace=pace)
+            if not self._is_nxdomain(lookups):
+                lookups.update(await self._lookup_records(hostname, BULK_RECORD_TYPES[1:], pace=pace))
+        except Exception as exc:
+            return {**row, "status": "error", "error": str(exc)}
+        row["ms"] = round((time.monotonic() - start) * 1000, 2)
+
+        if self._is_nxdomain(lookups):
+            return {**row, "status": "nxdomain"}
+        failures = [
+            lookup["error"] for lookup in lookups.values()
+            if lookup["error"] is not None and not isinstance(lookup["error"], dns.resolver.NoAnswer)
+        ]
+        if len(failures) == len(lookups):
+            return {**row, "status": "error", "error": str(failures[0])}
+
+        def _records(rtype: str) -> list[Any]:
+            answer = lookups[rtype]["answer"]
+            return list(answer) if answer is not None else []
+
+        row["a"] = sorted(str(rdata) for rdata in _records("A"))
+        row["aaaa"] = sorted(str(rdata) for rdata in _records("AAAA"))
+        row["cname"] = next((str(rdata.target) for rdata in _records("CNAME")), None)
+        row["mx"] = [str(rdata.exchange) for rdata in sorted(_records("MX"), key=lambda rdata: rdata.preference)]
+        answered = [lookup["answer"] for lookup in lookups.values() if lookup["answer"] is not None]
+        row["dnssec"] = bool(answered) and all(answer.response.flags & dns.flags.AD for answer in answered)
+        row["wildcard"] = wildcard is not None and row["a"] == wildcard
+        row["cached"] = all(lookup["cached"] for lookup in lookups.values() if lookup["answer"] is not None)
+        if failures:
+            row["error"] = str(failures[0])
+        return row
+
+    async def _wildcard_addresses(self, domain: str) -> list[str] | None:
+        """A records that a name under *domain* that cannot exist resolves to; None without wildcard DNS."""
+        probe = f"{secrets.token_hex(8)}.{domain.strip('.')}"
+        try:
+            answer = await self.resolver.resolve(probe, "A")
+        except Exception:
+            return None
+        return sorted(str(rdata) for rdata in answer)
+
     # ── Sub-tests ──
 
-    async def _resolve_records(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
-        """Resolve A, AAAA, MX, NS, TXT, SOA, CNAME records."""
-        record_types = ["A", "AAAA", "MX", "NS", "TXT", "SOA", "CNAME"]
+    async def _resolve_records(
+        self, lookups: Lookups, callback: ScanCallback, ttls: dict[str, int] | None = None
+    ) -> dict[str, Any]:
+        """Report the A, AAAA, MX, NS, TXT, SOA, CNAME lookups.
+
+        When *ttls* is given it is filled with the TTL of each answered record set.
+        """
         records: dict[str, list[str]] = {}
 
-        for rtype in record_types:
-            try:
-                resolver = dns.asyncresolver.Resolver()
-                resolver.timeout = 5
-                resolver.lifetime = 5
-                answers = await resolver.resolve(hostname, rtype)
+        if self._is_nxdomain(lookups):
+            await callback({
+                "type": "log",
+                "phase": "dns",
+                "level": "error",
+                "message": "Domain does not exist (NXDOMAIN), skipping the remaining DNS checks",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+            return {rtype: [] for rtype in RECORD_TYPES}
+
+        for rtype in RECORD_TYPES:
+            answers, exc = lookups[rtype]["answer"], lookups[rtype]["error"]
+            if answers is not None:
                 records[rtype] = [str(rdata) for rdata in answers]
+                if ttls is not None and answers.rrset is not None:
+                    ttls[rtype] = answers.rrset.ttl
                 await callback({
                     "type": "log",
                     "phase": "dns",
@@ -90,7 +421,7 @@ class DNSScanner(BaseScanner):
                     "message": f"{rtype} records found ({len(records[rtype])})",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 })
-            except dns.resolver.NoAnswer:
+            elif isinstance(exc, dns.resolver.NoAnswer):
                 records[rtype] = []
                 await callback({
                     "type": "log",
@@ -99,16 +430,7 @@ class DNSScanner(BaseScanner):
                     "message": f"No {rtype} records found",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 })
-            except dns.resolver.NXDOMAIN:
-                records[rtype] = []
-                await callback({
-                    "type": "log",
-                    "phase": "dns",
-                    "level": "error",
-                    "message": f"Domain does not exist (NXDOMAIN) when querying {rtype}",
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
-            except Exception as exc:
+            else:
                 records[rtype] = []
                 await callback({
                     "type": "log",
@@ -120,155 +442,272 @@ class DNSScanner(BaseScanner):
 
         return records
 
-    async def _measure_resolution_time(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
-        """Measure how long DNS resolution takes."""
-        try:
-            resolver = dns.asyncresolver.Resolver()
-            start = time.monotonic()
-            await resolver.resolve(hostname, "A")
-            elapsed_ms = round((time.monotonic() - start) * 1000, 2)
+    async def _measure_resolution_time(self, lookups: Lookups, callback: ScanCallback) -> dict[str, Any]:
+        """Report how long the A lookup took (an answer served from the cache is flagged as such)."""
+        lookup = lookups["A"]
+        if lookup["answer"] is not None:
+            elapsed_ms = lookup["elapsed_ms"]
+            cached = " (cached answer)" if lookup["cached"] else ""
             await callback({
                 "type": "log",
                 "phase": "dns",
                 "level": "success",
-                "message": f"DNS resolution time: {elapsed_ms}ms",
+                "message": f"DNS resolution time: {elapsed_ms}ms{cached}",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             })
-            return {"resolution_ms": elapsed_ms}
-        except Exception as exc:
+            return {"resolution_ms": elapsed_ms, "cached": lookup["cached"]}
+        await callback({
+            "type": "log",
+            "phase": "dns",
+            "level": "error",
+            "message": f"DNS resolution failed: {lookup['error']}",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+        return {"resolution_ms": None, "error": str(lookup["error"])}
+
+    async def _check_dnssec(self, lookups: Lookups, callback: ScanCallback) -> dict[str, Any]:
+        """Check if DNSSEC is enabled for the domain (AD flag of the answers, which were queried with DO)."""
+        answer = next((lookups[rtype]["answer"] for rtype in RECORD_TYPES if lookups[rtype]["answer"] is not None), None)
+        if answer is None:
+            exc = lookups["A"]["error"]
             await callback({
                 "type": "log",
                 "phase": "dns",
-                "level": "error",
-                "message": f"DNS resolution failed: {exc}",
+                "level": "warning",
+                "message": f"DNSSEC check failed: {exc}",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             })
-            return {"resolution_ms": None, "error": str(exc)}
+            return {"enabled": False, "error": str(exc)}
 
-    async def _check_dnssec(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
-        """Check if DNSSEC is enabled for the domain."""
-        try:
-            resolver = dns.asyncresolver.Resolver()
-            resolver.use_edns(0, dns.flags.DO, 4096)
-            answer = await resolver.resolve(hostname, "A")
-            has_dnssec = bool(answer.response.flags & dns.flags.AD)
-            level = "success" if has_dnssec else "warning"
-            msg = "DNSSEC is enabled" if has_dnssec else "DNSSEC is not enabled"
+        has_dnssec = bool(answer.response.flags & dns.flags.AD)
+        level = "success" if has_dnssec else "warning"
+        msg = "DNSSEC is enabled" if has_dnssec else "DNSSEC is not enabled"
+        await callback({
+            "type": "log",
+            "phase": "dns",
+            "level": level,
+            "message": msg,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+        return {"enabled": has_dnssec}
+
+    async def _check_propagation(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
+        """Ask every propagation resolver for the A records at once and group them by answer.
+
+        Each resolver is queried directly (never through the answer cache)
+        with its own timeout, at most ``PROPAGATION_CONCURRENCY`` at a time.
+        Resolvers that returned the same address set form a cluster; a fully
+        propagated name has one cluster holding every resolver.
+        """
+        slots = asyncio.Semaphore(settings.PROPAGATION_CONCURRENCY)
+
+        async def _ask(name: str, server: str) -> tuple[str, dict[str, Any]]:
+            address, port = parse_server(server)
+            resolver = make_resolver([address], port=port, timeout=settings.PROPAGATION_TIMEOUT_SECONDS)
+            async with slots:
+                start = time.monotonic()
+                try:
+                    answers = await resolver.resolve(hostname, "A")
+                    result = {"server": server, "resolved": True, "ips": sorted(str(r) for r in answers)}
+                except dns.resolver.LifetimeTimeout:
+                    result = {"server": server, "resolved": False, "error": "timeout"}
+                except Exception as exc:
+                    result = {"server": server, "resolved": False, "error": str(exc)}
+                result["elapsed_ms"] = round((time.monotonic() - start) * 1000, 2)
+            return name, result
+
+        resolvers = dict(await asyncio.gather(*(
+            _ask(name, server) for name, server in self.propagation_servers.items()
+        )))
+
+        by_answer: dict[tuple[str, ...], list[str]] = {}
+        for name, result in resolvers.items():
+            if result["resolved"]:
+                by_answer.setdefault(tuple(result["ips"]), []).append(name)
+        answered = sum(len(names) for names in by_answer.values())
+        clusters = [
+            {"ips": list(ips), "resolvers": sorted(names), "share": round(len(names) / answered, 3)}
+            for ips, names in sorted(by_answer.items(), key=lambda item: -len(item[1]))
+        ]
+        failed = sorted(name for name, result in resolvers.items() if not result["resolved"])
+
+        consistent = len(clusters) == 1
+        await callback({
+            "type": "log",
+            "phase": "dns",
+            "level": "success" if consistent and not failed else "warning",
+            "message": (
+                f"Propagation: {answered}/{len(resolvers)} resolvers answered, "
+                f"{len(clusters)} distinct answer set{'s' if len(clusters) != 1 else ''}"
+            ),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+        if len(clusters) > 1:
+            majority, *minorities = clusters
             await callback({
                 "type": "log",
                 "phase": "dns",
-                "level": level,
-                "message": msg,
+                "level": "info",
+                "message": f"{len(majority['resolvers'])} resolvers return {', '.join(majority['ips'])}",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             })
-            return {"enabled": has_dnssec}
-        except Exception as exc:
+            for cluster in minorities:
+                await callback({
+                    "type": "log",
+                    "phase": "dns",
+                    "level": "warning",
+                    "message": (
+                        f"{len(cluster['resolvers'])} resolvers return {', '.join(cluster['ips'])}: "
+                        f"{', '.join(cluster['resolvers'])}"
+                    ),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                })
+        if failed:
             await callback({
                 "type": "log",
                 "phase": "dns",
                 "level": "warning",
-                "message": f"DNSSEC check failed: {exc}",
+                "message": f"Propagation failed on {', '.join(failed)}",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             })
-            return {"enabled": False, "error": str(exc)}
 
-    async def _check_propagation(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
-        """Test DNS propagation across public resolvers."""
-        propagation: dict[str, Any] = {}
-        for name, server_ip in PROPAGATION_SERVERS.items():
-            try:
-                resolver = dns.asyncresolver.Resolver()
-                resolver.nameservers = [server_ip]
-                resolver.timeout = 5
-                resolver.lifetime = 5
-                answers = await resolver.resolve(hostname, "A")
-                ips = [str(r) for r in answers]
-                propagation[name] = {"resolved": True, "ips": ips}
+        return {
+            "resolvers": resolvers,
+            "clusters": clusters,
+            "consistent": consistent,
+            "answered": answered,
+            "total": len(resolvers),
+        }
+
+    async def _scan_ports(self, lookups: Lookups, callback: ScanCallback) -> tuple[dict[int, bool], dict[str, Any]]:
+        """Probe the configured port set concurrently on the host's first address.
+
+        Returns:
+            (port -> open, probe details with the state and connect-time distribution of every port)
+        """
+        address = self._target_address(lookups)
+        if address is None:
+            return {port: False for port in self.ports}, {"address": None, "ports": {}}
+
+        probed = await probe_ports(
+            address,
+            self.ports,
+            samples=settings.PORT_SCAN_SAMPLES,
+            concurrency=settings.PORT_SCAN_CONCURRENCY,
+            timeout=settings.PORT_SCAN_TIMEOUT_SECONDS,
+        )
+        for port, probe in probed.items():
+            if probe["state"] == OPEN:
                 await callback({
                     "type": "log",
                     "phase": "dns",
                     "level": "success",
-                    "message": f"Propagation OK on {name} DNS ({server_ip}): {', '.join(ips)}",
+                    "message": f"Port {port} is open (connect {probe['connect_ms']['median']}ms)",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 })
-            except Exception as exc:
-                propagation[name] = {"resolved": False, "error": str(exc)}
+            elif port in (80, 443):
                 await callback({
                     "type": "log",
                     "phase": "dns",
-                    "level": "warning",
-                    "message": f"Propagation failed on {name} DNS ({server_ip}): {exc}",
+                    "level": "error" if port == 443 else "info",
+                    "message": f"Port {port} is {probe['state']}",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 })
-        return propagation
-
-    async def _check_latency(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
-        """Measure TCP connection latency (ping-like) to port 443 or 80."""
-        for port in [443, 80]:
-            try:
-                start = time.monotonic()
-                reader, writer = await asyncio.wait_for(
-                    asyncio.open_connection(hostname, port),
-                    timeout=5.0,
-                )
-                latency_ms = round((time.monotonic() - start) * 1000, 2)
-                writer.close()
-                await writer.wait_closed()
-                await callback({
-                    "type": "log",
-                    "phase": "dns",
-                    "level": "success",
-                    "message": f"TCP latency to port {port}: {latency_ms}ms",
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
-                return {"latency_ms": latency_ms, "port": port}
-            except Exception:
-                continue
 
+        states = [probe["state"] for probe in probed.values()]
         await callback({
             "type": "log",
             "phase": "dns",
-            "level": "error",
-            "message": "Could not measure latency (ports 443 and 80 unreachable)",
+            "level": "info",
+            "message": (
+                f"{states.count(OPEN)}/{len(states)} ports open on {address} "
+                f"({states.count(CLOSED)} closed, {states.count(FILTERED)} filtered)"
+            ),
             "timestamp": datetime.now(timezone.utc).isoformat(),
         })
-        return {"latency_ms": None}
-
-    async def _scan_ports(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
-        """Check if common web ports are open."""
-        port_results: dict[int, bool] = {}
-        for port in SCAN_PORTS:
-            try:
-                reader, writer = await asyncio.wait_for(
-                    asyncio.open_connection(hostname, port),
-                    timeout=3.0,
-                )
-                writer.close()
-                await writer.wait_closed()
-                port_results[port] = True
-                await callback({
-                    "type": "log",
-                    "phase": "dns",
-                    "level": "success",
-                    "message": f"Port {port} is open",
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
-            except Exception:
-                port_results[port] = False
-                level = "error" if port == 443 else "info"
+        return {port: probe["state"] == OPEN for port, probe in probed.items()}, {"address": address, "ports": probed}
+
+    async def _check_latency(self, lookups: Lookups, probe: dict[str, Any], callback: ScanCallback) -> dict[str, Any]:
+        """TCP connect latency to port 443 (or 80) of every A/AAAA address, from a series of samples.
+
+        ``latency_ms`` is the median connect time of the family a dual-stack
+        client would use.
+        """
+        port = next((port for port in [443, 80] if probe["ports"].get(port, {}).get("state") == OPEN), None)
+        addresses = [
+            str(rdata)
+            for rtype in ("A", "AAAA")
+            if lookups[rtype]["answer"] is not None
+            for rdata in lookups[rtype]["answer"]
+        ]
+        if port is None or not addresses:
+            await callback({
+                "type": "log",
+                "phase": "dns",
+                "level": "error",
+                "message": "Could not measure latency (ports 443 and 80 unreachable)",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+            return {"latency_ms": None}
+
+        sampled = await sample_latency(
+            addresses,
+            port,
+            samples=settings.LATENCY_SAMPLES,
+            spacing=settings.LATENCY_SAMPLE_SPACING_MS / 1000,
+            timeout=settings.PORT_SCAN_TIMEOUT_SECONDS,
+            concurrency=settings.PORT_SCAN_CONCURRENCY,
+        )
+        for family, stats in sampled["families"].items():
+            if stats["median"] is None:
                 await callback({
                     "type": "log",
                     "phase": "dns",
-                    "level": level,
-                    "message": f"Port {port} is closed",
+                    "level": "warning",
+                    "message": f"No {family} connect to port {port} succeeded ({stats['attempts']} attempts)",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 })
-        return port_results
+                continue
+            await callback({
+                "type": "log",
+                "phase": "dns",
+                "level": "success" if stats["loss"] == 0 else "warning",
+                "message": (
+                    f"TCP latency to port {port} over {family}: median {stats['median']}ms, "
+                    f"p95 {stats['p95']}ms, jitter {stats['jitter'] or 0}ms, loss {stats['loss']:.0%}"
+                ),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+
+        eyeballs = happy_eyeballs(sampled["families"])
+        if eyeballs["ipv6_penalty_ms"] is not None:
+            await callback({
+                "type": "log",
+                "phase": "dns",
+                "level": "info" if eyeballs["winner"] == "ipv6" else "warning",
+                "message": (
+                    f"IPv6 connects {abs(eyeballs['ipv6_penalty_ms'])}ms "
+                    f"{'slower' if eyeballs['ipv6_penalty_ms'] > 0 else 'faster'} than IPv4; "
+                    f"dual-stack clients will use {eyeballs['winner'].replace('ip', 'IP')}"
+                ),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+        latency_ms = eyeballs[f"{eyeballs['winner']}_ms"] if eyeballs["winner"] else None
+        return {"latency_ms": latency_ms, "port": port, **sampled, "happy_eyeballs": eyeballs}
+
+    @staticmethod
+    def _target_address(lookups: Lookups) -> str | None:
+        """The address the connect-based checks use: the first A record, else the first AAAA."""
+        for rtype in ("A", "AAAA"):
+            answer = lookups[rtype]["answer"]
+            if answer is not None and len(answer):
+                return str(answer[0])
+        return None
 
     async def _check_https_redirect(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
         """Check whether HTTP automatically redirects to HTTPS."""
         try:
-            async with httpx.AsyncClient(follow_redirects=False, timeout=10) as client:
+            async with http_client(follow_redirects=False, timeout=10) as client:
                 response = await client.get(f"http://{hostname}")
 
             redirects = response.status_code in (301, 302, 307, 308)
@@ -312,11 +751,10 @@ class DNSScanner(BaseScanner):
             })
             return {"redirects": False, "to_https": False, "error": str(exc)}
 
-    async def _check_ipv6(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
+    async def _check_ipv6(self, lookups: Lookups, callback: ScanCallback) -> dict[str, Any]:
         """Check if the domain has AAAA (IPv6) records."""
-        try:
-            resolver = dns.asyncresolver.Resolver()
-            answers = await resolver.resolve(hostname, "AAAA")
+        answers, exc = lookups["AAAA"]["answer"], lookups["AAAA"]["error"]
+        if answers is not None:
             ips = [str(r) for r in answers]
             await callback({
                 "type": "log",
@@ -326,7 +764,7 @@ class DNSScanner(BaseScanner):
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             })
             return {"supported": True, "addresses": ips}
-        except dns.resolver.NoAnswer:
+        if isinstance(exc, dns.resolver.NoAnswer):
             await callback({
                 "type": "log",
                 "phase": "dns",
@@ -335,15 +773,14 @@ class DNSScanner(BaseScanner):
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             })
             return {"supported": False, "addresses": []}
-        except Exception as exc:
-            await callback({
-                "type": "log",
-                "phase": "dns",
-                "level": "warning",
-                "message": f"IPv6 check failed: {exc}",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            })
-            return {"supported": False, "addresses": [], "error": str(exc)}
+        await callback({
+            "type": "log",
+            "phase": "dns",
+            "level": "warning",
+            "message": f"IPv6 check failed: {exc}",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+        return {"supported": False, "addresses": [], "error": str(exc)}
 
     # ── Scoring ──
 
@@ -9,6 +9,7 @@ from typing import Any
 
 import httpx
 
+from app.core.dns_cache import http_client
 from app.scanners.base import BaseScanner, ScanCallback
 
 logger = logging.getLogger(__name__)
@@ -46,9 +47,12 @@ class PerformanceScanner(BaseScanner):
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             })
 
-            tier_result = await self._run_tier(
-                url, num_users, duration, spawn_rate, tier_index, callback
-            )
+            # One client per tier, with a connection per user, so requests don't pay for client setup
+            limits = httpx.Limits(max_connections=num_users, max_keepalive_connections=num_users)
+            async with http_client(timeout=30, follow_redirects=True, limits=limits) as client:
+                tier_result = await self._run_tier(
+                    client, url, num_users, duration, spawn_rate, tier_index, callback
+                )
             results["levels"].append(tier_result)
 
             # Tier summary callback
@@ -75,6 +79,7 @@ class PerformanceScanner(BaseScanner):
 
     async def _run_tier(
         self,
+        client: httpx.AsyncClient,
         url: str,
         num_users: int,
         duration: int,
@@ -103,8 +108,7 @@ class PerformanceScanner(BaseScanner):
             while time.monotonic() - start_time < duration:
                 req_start = time.monotonic()
                 try:
-                    async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
-                        response = await client.get(url)
+                    response = await client.get(url)
                     elapsed = (time.monotonic() - req_start) * 1000  # ms
                     response_times.append(elapsed)
                     ttfb_values.append(elapsed)  # Simplified: using total time as TTFB
@@ -122,60 +126,23 @@ class PerformanceScanner(BaseScanner):
                 # Small delay between requests per user
                 await asyncio.sleep(0.1)
 
-        # Spawn users gradually
-        spawn_interval = 1.0 / max(spawn_rate, 1)
-        for i in range(num_users):
-            task = asyncio.create_task(_user_loop(i))
-            active_tasks.append(task)
-            users_spawned += 1
-
-            # Send live metrics every 2 seconds
-            now = time.monotonic()
-            if now - last_report >= report_interval and response_times:
-                sorted_times = sorted(response_times)
-                n = len(sorted_times)
-                elapsed_total = now - start_time
-
-                live = {
-                    "active_users": users_spawned,
-                    "total_requests": total_requests,
-                    "avg_response_time": sum(sorted_times) / n,
-                    "p50": sorted_times[int(n * 0.5)] if n > 0 else 0,
-                    "p95": sorted_times[int(n * 0.95)] if n > 0 else 0,
-                    "throughput": total_requests / max(elapsed_total, 0.01),
-                    "error_rate": (errors / max(total_requests, 1)) * 100,
-                }
-                await callback({
-                    "type": "progress",
-                    "phase": "performance",
-                    "progress_percent": int(
-                        ((tier_index + (now - start_time) / duration) / len(LOAD_TIERS)) * 100
-                    ),
-                    "message": f"Testing {users_spawned} users — {int(now - start_time)}s elapsed",
-                    "live_metrics": live,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
-                last_report = now
-
-            if i < num_users - 1:
-                await asyncio.sleep(spawn_interval)
-
-        # Wait for remaining duration
-        remaining = duration - (time.monotonic() - start_time)
-        if remaining > 0:
-            # Send live metrics during the remaining time
-            while remaining > 0:
-                wait_time = min(report_interval, remaining)
-                await asyncio.sleep(wait_time)
-                remaining = duration - (time.monotonic() - start_time)
-
-                if response_times:
+        try:
+            # Spawn users gradually
+            spawn_interval = 1.0 / max(spawn_rate, 1)
+            for i in range(num_users):
+                task = asyncio.create_task(_user_loop(i))
+                active_tasks.append(task)
+                users_spawned += 1
+
+                # Send live metrics every 2 seconds
+                now = time.monotonic()
+                if now - last_report >= report_interval and response_times:
                     sorted_times = sorted(response_times)
                     n = len(sorted_times)
-                    elapsed_total = time.monotonic() - start_time
+                    elapsed_total = now - start_time
 
                     live = {
-                        "active_users": num_users,
+                        "active_users": users_spawned,
                         "total_requests": total_requests,
                         "avg_response_time": sum(sorted_times) / n,
                         "p50": sorted_times[int(n * 0.5)] if n > 0 else 0,
@@ -187,17 +154,55 @@ class PerformanceScanner(BaseScanner):
                         "type": "progress",
                         "phase": "performance",
                         "progress_percent": int(
-                            ((tier_index + (time.monotonic() - start_time) / duration) / len(LOAD_TIERS)) * 100
+                            ((tier_index + (now - start_time) / duration) / len(LOAD_TIERS)) * 100
                         ),
-                        "message": f"Testing {num_users} users — {int(time.monotonic() - start_time)}s elapsed",
+                        "message": f"Testing {users_spawned} users — {int(now - start_time)}s elapsed",
                         "live_metrics": live,
                         "timestamp": datetime.now(timezone.utc).isoformat(),
                     })
-
-        # Cancel all user tasks
-        for task in active_tasks:
-            task.cancel()
-        await asyncio.gather(*active_tasks, return_exceptions=True)
+                    last_report = now
+
+                if i < num_users - 1:
+                    await asyncio.sleep(spawn_interval)
+
+            # Wait for remaining duration
+            remaining = duration - (time.monotonic() - start_time)
+            if remaining > 0:
+                # Send live metrics during the remaining time
+                while remaining > 0:
+                    wait_time = min(report_interval, remaining)
+                    await asyncio.sleep(wait_time)
+                    remaining = duration - (time.monotonic() - start_time)
+
+                    if response_times:
+                        sorted_times = sorted(response_times)
+                        n = len(sorted_times)
+                        elapsed_total = time.monotonic() - start_time
+
+                        live = {
+                            "active_users": num_users,
+                            "total_requests": total_requests,
+                            "avg_response_time": sum(sorted_times) / n,
+                            "p50": sorted_times[int(n * 0.5)] if n > 0 else 0,
+                            "p95": sorted_times[int(n * 0.95)] if n > 0 else 0,
+                            "throughput": total_requests / max(elapsed_total, 0.01),
+                            "error_rate": (errors / max(total_requests, 1)) * 100,
+                        }
+                        await callback({
+                            "type": "progress",
+                            "phase": "performance",
+                            "progress_percent": int(
+                                ((tier_index + (time.monotonic() - start_time) / duration) / len(LOAD_TIERS)) * 100
+                            ),
+                            "message": f"Testing {num_users} users — {int(time.monotonic() - start_time)}s elapsed",
+                            "live_metrics": live,
+                            "timestamp": datetime.now(timezone.utc).isoformat(),
+                        })
+        finally:
+            # Cancel all user tasks, also when the tier itself is cancelled (e.g. a lost host lease)
+            for task in active_tasks:
+                task.cancel()
+            await asyncio.gather(*active_tasks, return_exceptions=True)
 
         # Compute final metrics
         elapsed_total = time.monotonic() - start_time
@@ -1,6 +1,7 @@
 """Security Scanner (DAST) — headers, cookies, CORS, info disclosure, mixed content."""
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
 from datetime import datetime, timezone
@@ -10,6 +11,7 @@ from urllib.parse import urlparse
 import httpx
 from bs4 import BeautifulSoup
 
+from app.core.dns_cache import http_client
 from app.scanners.base import BaseScanner, ScanCallback
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,18 @@ SECURITY_HEADERS = {
     "X-XSS-Protection": {"severity": "low", "description": "Legacy XSS filter (deprecated but still useful)"},
 }
 
+# Origin sent by the CORS check; a server that echoes it back reflects arbitrary origins
+CORS_PROBE_ORIGIN = "https://evil.example.com"
+
+# Paths probed for an auto-generated directory index
+DIRECTORY_LISTING_PATHS = ["/", "/images/", "/assets/", "/uploads/", "/static/"]
+
+
+def _is_directory_listing(body: str) -> bool:
+    """Whether a response body looks like a web server's directory index."""
+    body = body.lower()
+    return "index of" in body or "directory listing" in body
+
 
 class SecurityScanner(BaseScanner):
     """Perform Dynamic Application Security Testing (DAST) checks."""
@@ -36,7 +50,7 @@ class SecurityScanner(BaseScanner):
         results: dict[str, Any] = {"url": url, "issues": []}
 
         try:
-            async with httpx.AsyncClient(
+            async with http_client(
                 follow_redirects=True, timeout=15, verify=False
             ) as client:
                 response = await client.get(url)
@@ -83,6 +97,42 @@ class SecurityScanner(BaseScanner):
 
         return results
 
+    async def fingerprint(self, url: str) -> str | None:
+        """Digest of every response the checks look at.
+
+        Covers the landing response (ETag, non-volatile headers, body hash),
+        the CORS preflight answer and whether each directory-listing path
+        serves an index, fetched concurrently over one client.
+        """
+        parsed = urlparse(url)
+        base = f"{parsed.scheme}://{parsed.netloc}"
+        try:
+            async with http_client(timeout=15, verify=False) as client:
+                response, cors, *listings = await asyncio.gather(
+                    client.get(url, follow_redirects=True),
+                    client.options(url, headers={"Origin": CORS_PROBE_ORIGIN}),
+                    *(client.get(f"{base}{path}") for path in DIRECTORY_LISTING_PATHS),
+                    return_exceptions=True,
+                )
+        except Exception as exc:
+            self.logger.debug("Security fingerprint failed for %s: %s", url, exc)
+            return None
+        if isinstance(response, BaseException):
+            self.logger.debug("Security fingerprint failed for %s: %s", url, response)
+            return None
+
+        # Failed probes are hashed by exception type, matching the checks that skip them
+        cors_signature = type(cors).__name__ if isinstance(cors, BaseException) else {
+            "status": cors.status_code,
+            "allow_origin": cors.headers.get("access-control-allow-origin"),
+            "allow_credentials": cors.headers.get("access-control-allow-credentials"),
+        }
+        listing_signature = {
+            path: type(listing).__name__ if isinstance(listing, BaseException) else _is_directory_listing(listing.text)
+            for path, listing in zip(DIRECTORY_LISTING_PATHS, listings)
+        }
+        return self._digest(url, self._response_signature(response), cors_signature, listing_signature)
+
     async def _check_security_headers(
         self, headers: httpx.Headers, results: dict, callback: ScanCallback
     ) -> None:
@@ -189,9 +239,9 @@ class SecurityScanner(BaseScanner):
     async def _check_cors(self, url: str, results: dict, callback: ScanCallback) -> None:
         """Check CORS configuration for overly permissive settings."""
         try:
-            async with httpx.AsyncClient(timeout=10, verify=False) as client:
+            async with http_client(timeout=10, verify=False) as client:
                 response = await client.options(
-                    url, headers={"Origin": "https://evil.example.com"}
+                    url, headers={"Origin": CORS_PROBE_ORIGIN}
                 )
 
             acao = response.headers.get("access-control-allow-origin")
@@ -210,7 +260,7 @@ class SecurityScanner(BaseScanner):
                     "message": "CORS: Wildcard (*) origin allowed",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 })
-            elif acao == "https://evil.example.com":
+            elif acao == CORS_PROBE_ORIGIN:
                 results["issues"].append({
                     "severity": "critical",
                     "category": "cors",
@@ -402,15 +452,13 @@ class SecurityScanner(BaseScanner):
         """Test common directories for directory listing."""
         parsed = urlparse(url)
         base = f"{parsed.scheme}://{parsed.netloc}"
-        test_paths = ["/", "/images/", "/assets/", "/uploads/", "/static/"]
         listing_found = False
 
-        for path in test_paths:
+        for path in DIRECTORY_LISTING_PATHS:
             try:
-                async with httpx.AsyncClient(timeout=5, verify=False) as client:
+                async with http_client(timeout=5, verify=False) as client:
                     response = await client.get(f"{base}{path}")
-                body = response.text.lower()
-                if "index of" in body or "directory listing" in body:
+                if _is_directory_listing(response.text):
                     listing_found = True
                     results["issues"].append({
                         "severity": "medium",
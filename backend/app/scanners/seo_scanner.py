@@ -10,6 +10,7 @@ from urllib.parse import urlparse
 import httpx
 from bs4 import BeautifulSoup
 
+from app.core.dns_cache import http_client
 from app.scanners.base import BaseScanner, ScanCallback
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class SEOScanner(BaseScanner):
         results: dict[str, Any] = {"url": url}
 
         try:
-            async with httpx.AsyncClient(
+            async with http_client(
                 follow_redirects=True, timeout=15,
                 headers={"User-Agent": "SynapsBranch SEO Scanner/1.0"}
             ) as client:
@@ -72,6 +73,29 @@ class SEOScanner(BaseScanner):
 
         return results
 
+    async def fingerprint(self, url: str) -> str | None:
+        """Digest of the landing response plus robots.txt and sitemap.xml."""
+        parsed = urlparse(url)
+        base = f"{parsed.scheme}://{parsed.netloc}"
+        try:
+            async with http_client(
+                follow_redirects=True, timeout=15,
+                headers={"User-Agent": "SynapsBranch SEO Scanner/1.0"}
+            ) as client:
+                page = await client.get(url)
+                robots = await client.get(f"{base}/robots.txt")
+                sitemap = await client.head(f"{base}/sitemap.xml")
+        except Exception as exc:
+            self.logger.debug("SEO fingerprint failed for %s: %s", url, exc)
+            return None
+        return self._digest(
+            url,
+            self._response_signature(page),
+            self._response_signature(robots),
+            sitemap.status_code,
+            sitemap.headers.get("content-type", ""),
+        )
+
     # ── Sub-checks ──
 
     async def _check_meta(self, soup: BeautifulSoup, callback: ScanCallback) -> dict[str, Any]:
@@ -305,7 +329,7 @@ class SEOScanner(BaseScanner):
 
         # robots.txt
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with http_client(timeout=10) as client:
                 robots_resp = await client.get(f"{base}/robots.txt")
             if robots_resp.status_code == 200:
                 index["robots_txt"] = {"exists": True, "content": robots_resp.text[:2000]}
@@ -320,7 +344,7 @@ class SEOScanner(BaseScanner):
 
         # sitemap.xml
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with http_client(timeout=10) as client:
                 sitemap_resp = await client.get(f"{base}/sitemap.xml")
             if sitemap_resp.status_code == 200 and "xml" in sitemap_resp.headers.get("content-type", ""):
                 index["sitemap"] = {"exists": True}
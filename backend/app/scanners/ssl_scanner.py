@@ -1,12 +1,15 @@
 """SSL/TLS Scanner — certificate analysis, protocol checks, vulnerability detection."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import ssl
+import warnings
 from datetime import datetime, timezone
 from typing import Any
 from urllib.parse import urlparse
 
-import httpx
 from sslyze import (
     Scanner,
     ServerScanRequest,
@@ -15,10 +18,19 @@ from sslyze import (
 )
 from sslyze.errors import ServerHostnameCouldNotBeResolved
 
+from app.core.dns_cache import dns_resolver, http_client
 from app.scanners.base import BaseScanner, ScanCallback
 
 logger = logging.getLogger(__name__)
 
+# Protocol versions the fingerprint handshakes with one at a time
+FINGERPRINT_TLS_VERSIONS = [
+    ssl.TLSVersion.TLSv1,
+    ssl.TLSVersion.TLSv1_1,
+    ssl.TLSVersion.TLSv1_2,
+    ssl.TLSVersion.TLSv1_3,
+]
+
 
 class SSLScanner(BaseScanner):
     """Analyse SSL/TLS certificates, protocols, cipher suites, and vulnerabilities."""
@@ -37,7 +49,14 @@ class SSLScanner(BaseScanner):
         })
 
         try:
-            server_location = ServerNetworkLocation(hostname=hostname, port=443)
+            # Resolved through the shared DNS cache; sslyze would otherwise look it up again
+            try:
+                addresses = await dns_resolver.addresses(hostname)
+            except Exception as exc:
+                raise ServerHostnameCouldNotBeResolved(f"Could not resolve {hostname}: {exc}")
+            if not addresses:
+                raise ServerHostnameCouldNotBeResolved(f"Could not resolve {hostname}")
+            server_location = ServerNetworkLocation(hostname=hostname, port=443, ip_address=addresses[0])
             scan_request = ServerScanRequest(
                 server_location=server_location,
                 scan_commands={
@@ -96,6 +115,80 @@ class SSLScanner(BaseScanner):
 
         return results
 
+    async def fingerprint(self, url: str) -> str | None:
+        """Digest of the leaf certificate, peer IP, HSTS and what each TLS version negotiates.
+
+        Every version in ``FINGERPRINT_TLS_VERSIONS`` gets its own handshake, so
+        enabling or dropping a protocol, changing the preferred cipher or turning
+        on compression changes the digest.  SSL 2.0/3.0, Heartbleed and CCS
+        injection need sslyze's probes and are not covered; ``RESULT_REUSE_MAX_AGE``
+        bounds how long those can go unchecked.
+        """
+        hostname = urlparse(url).hostname or url.replace("https://", "").replace("http://", "").split("/")[0]
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+        try:
+            addresses = await dns_resolver.addresses(hostname)
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(addresses[0], 443, ssl=context, server_hostname=hostname),
+                timeout=10.0,
+            )
+            try:
+                ssl_object = writer.get_extra_info("ssl_object")
+                peer_ip = writer.get_extra_info("peername")[0]
+                leaf_der = ssl_object.getpeercert(binary_form=True) or b""
+                tls = {"version": ssl_object.version(), "cipher": ssl_object.cipher()}
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+            protocols = await asyncio.gather(*(
+                self._probe_protocol(peer_ip, hostname, version) for version in FINGERPRINT_TLS_VERSIONS
+            ))
+
+            async with http_client(verify=False, timeout=10) as client:
+                response = await client.head(f"https://{hostname}")
+            hsts = response.headers.get("strict-transport-security")
+        except Exception as exc:
+            self.logger.debug("SSL fingerprint failed for %s: %s", hostname, exc)
+            return None
+
+        accepted = {version.name: probe for version, probe in zip(FINGERPRINT_TLS_VERSIONS, protocols)}
+        return self._digest(hostname, peer_ip, hashlib.sha256(leaf_der).hexdigest(), tls, accepted, hsts)
+
+    async def _probe_protocol(
+        self, address: str, hostname: str, version: ssl.TLSVersion
+    ) -> dict[str, Any] | None:
+        """Handshake pinned to *version*; the negotiated cipher and compression, or None if refused."""
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        with warnings.catch_warnings():
+            # TLS 1.0/1.1 are deprecated in the ssl module, but probing for them is the point
+            warnings.simplefilter("ignore", DeprecationWarning)
+            context.minimum_version = version
+            context.maximum_version = version
+        context.set_ciphers("ALL:@SECLEVEL=0")
+
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(address, 443, ssl=context, server_hostname=hostname),
+                timeout=5.0,
+            )
+        except (ssl.SSLError, ConnectionError):
+            return None
+        try:
+            ssl_object = writer.get_extra_info("ssl_object")
+            return {"cipher": ssl_object.cipher()[0], "compression": ssl_object.compression()}
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ssl.SSLError, ConnectionError):
+                pass
+
     async def _extract_cert_info(self, scan_result: Any, callback: ScanCallback) -> dict[str, Any]:
         """Extract certificate validity, chain, key size, and signature algorithm."""
         cert_info: dict[str, Any] = {}
@@ -290,7 +383,7 @@ class SSLScanner(BaseScanner):
     async def _check_hsts(self, hostname: str, callback: ScanCallback) -> dict[str, Any]:
         """Check for HTTP Strict Transport Security header."""
         try:
-            async with httpx.AsyncClient(verify=False, timeout=10) as client:
+            async with http_client(verify=False, timeout=10) as client:
                 response = await client.get(f"https://{hostname}")
 
             hsts_header = response.headers.get("strict-transport-security")
@@ -0,0 +1,225 @@
+"""Concurrent TCP connect probes with per-host connection limits.
+
+A probe is a plain TCP connect: an accepted connection means the port is
+open, a reset that it is closed, and no reply within the timeout that it is
+filtered.  The connect time of every accepted connection is kept, so open
+ports come back with a connect-time distribution.
+
+``sample_latency`` measures one port the same way, but with a series of
+spaced connects per address and loss and jitter alongside the distribution,
+and ``happy_eyeballs`` says which address family a dual-stack client would
+end up using.
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import statistics
+import time
+import weakref
+from typing import Any
+
+OPEN = "open"
+CLOSED = "closed"
+FILTERED = "filtered"
+
+# RFC 8305: how long a client waits on IPv6 before also trying IPv4
+CONNECTION_ATTEMPT_DELAY_MS = 250
+
+# Common web, admin, database and infrastructure ports
+TOP_100_PORTS = [
+    21, 22, 23, 25, 53, 80, 81, 88, 110, 111, 135, 139, 143, 179, 389, 443, 445, 465, 514, 587,
+    631, 636, 873, 990, 993, 995, 1080, 1194, 1433, 1521, 1723, 1883, 2049, 2082, 2083, 2086, 2087, 2095, 2096, 2181,
+    2375, 2376, 2379, 3000, 3128, 3306, 3389, 4000, 4443, 4848, 5000, 5001, 5432, 5601, 5672, 5900, 5984, 6379, 6443, 7001,
+    7002, 7080, 7443, 7474, 8000, 8001, 8008, 8069, 8080, 8081, 8082, 8086, 8088, 8090, 8161, 8181, 8200, 8443, 8500, 8834,
+    8880, 8888, 9000, 9001, 9042, 9090, 9091, 9200, 9300, 9418, 9443, 9990, 10000, 10250, 11211, 15672, 27017, 50000, 50070, 61616,
+]
+
+PORT_SETS: dict[str, list[int]] = {
+    "web": [80, 443, 8080, 8443],
+    "top100": TOP_100_PORTS,
+}
+
+# One limit per target address, shared by every probe running in the process
+_host_slots: weakref.WeakValueDictionary[tuple[str, int], asyncio.Semaphore] = weakref.WeakValueDictionary()
+
+
+def _slots(address: str, limit: int) -> asyncio.Semaphore:
+    semaphore = _host_slots.get((address, limit))
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(limit)
+        _host_slots[(address, limit)] = semaphore
+    return semaphore
+
+
+async def connect_time(address: str, port: int, timeout: float) -> tuple[str, float | None]:
+    """Connect once and close; returns the port state and the connect time in ms if it was accepted."""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout=timeout)
+    except asyncio.TimeoutError:
+        return FILTERED, None
+    except ConnectionRefusedError:
+        return CLOSED, None
+    except OSError:
+        # Host or network unreachable: nothing answers on that port from here
+        return FILTERED, None
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return OPEN, elapsed_ms
+
+
+def summarize(samples: list[float]) -> dict[str, Any] | None:
+    """Distribution of connect times in ms."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        "samples": len(ordered),
+        "min": round(ordered[0], 2),
+        "median": round(statistics.median(ordered), 2),
+        "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 2),
+        "max": round(ordered[-1], 2),
+        "mean": round(statistics.fmean(ordered), 2),
+    }
+
+
+async def probe_ports(
+    address: str,
+    ports: list[int],
+    *,
+    samples: int = 1,
+    concurrency: int = 20,
+    timeout: float = 3.0,
+) -> dict[int, dict[str, Any]]:
+    """Probe every port of one address concurrently.
+
+    Args:
+        address: IP address to connect to.
+        ports: Ports to probe.
+        samples: Connects per open port; the extra ones only refine its connect-time distribution.
+        concurrency: Connections in flight to this address at once, across all concurrent probes.
+        timeout: Seconds before an unanswered connect counts as filtered.
+
+    Returns:
+        Port -> ``{"state": ..., "connect_ms": distribution or None}``.
+    """
+    slots = _slots(address, concurrency)
+
+    async def _probe(port: int) -> tuple[int, dict[str, Any]]:
+        async with slots:
+            state, elapsed_ms = await connect_time(address, port, timeout)
+        times = [elapsed_ms] if elapsed_ms is not None else []
+        if state == OPEN:
+            for _ in range(samples - 1):
+                async with slots:
+                    again, elapsed_ms = await connect_time(address, port, timeout)
+                if again == OPEN:
+                    times.append(elapsed_ms)
+        return port, {"state": state, "connect_ms": summarize(times)}
+
+    return dict(await asyncio.gather(*(_probe(port) for port in ports)))
+
+
+async def sample_connects(
+    address: str,
+    port: int,
+    *,
+    samples: int,
+    spacing: float,
+    timeout: float,
+    concurrency: int = 20,
+) -> list[float | None]:
+    """Connect *samples* times, starting one every *spacing* seconds without waiting for the previous one.
+
+    Returns:
+        Connect time in ms per attempt in start order; None for attempts that were not accepted.
+    """
+    slots = _slots(address, concurrency)
+
+    async def _sample(index: int) -> float | None:
+        await asyncio.sleep(index * spacing)
+        async with slots:
+            state, elapsed_ms = await connect_time(address, port, timeout)
+        return elapsed_ms if state == OPEN else None
+
+    return list(await asyncio.gather(*(_sample(index) for index in range(samples))))
+
+
+def latency_stats(attempts: list[float | None]) -> dict[str, Any]:
+    """Distribution, loss and jitter of a series of connect attempts.
+
+    Jitter is the mean difference between consecutive successful samples
+    (as in RFC 3550), so a steady but slow path has none.
+    """
+    times = [elapsed_ms for elapsed_ms in attempts if elapsed_ms is not None]
+    stats = summarize(times) or {"samples": 0, "min": None, "median": None, "p95": None, "max": None, "mean": None}
+    stats["attempts"] = len(attempts)
+    stats["loss"] = round(1 - len(times) / len(attempts), 3) if attempts else None
+    stats["jitter"] = (
+        round(statistics.fmean(abs(b - a) for a, b in zip(times, times[1:])), 2) if len(times) > 1 else None
+    )
+    return stats
+
+
+async def sample_latency(
+    addresses: list[str],
+    port: int,
+    *,
+    samples: int = 10,
+    spacing: float = 0.1,
+    timeout: float = 3.0,
+    concurrency: int = 20,
+) -> dict[str, Any]:
+    """Sample connect latency to every address of a host at once.
+
+    Returns:
+        ``{"addresses": {address: stats}, "families": {"ipv4" | "ipv6": stats over all its addresses}}``.
+    """
+    series = await asyncio.gather(*(
+        sample_connects(address, port, samples=samples, spacing=spacing, timeout=timeout, concurrency=concurrency)
+        for address in addresses
+    ))
+    attempts_by_address = dict(zip(addresses, series))
+    per_address = {address: latency_stats(attempts) for address, attempts in attempts_by_address.items()}
+    by_family: dict[str, list[str]] = {}
+    for address in addresses:
+        by_family.setdefault(f"ipv{ipaddress.ip_address(address).version}", []).append(address)
+
+    families = {}
+    for family, members in sorted(by_family.items()):
+        stats = latency_stats([elapsed_ms for address in members for elapsed_ms in attempts_by_address[address]])
+        # Consecutive samples only make sense per address
+        jitters = [per_address[address]["jitter"] for address in members if per_address[address]["jitter"] is not None]
+        stats["jitter"] = round(statistics.fmean(jitters), 2) if jitters else None
+        families[family] = stats
+    return {"addresses": per_address, "families": families}
+
+
+def happy_eyeballs(families: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Which family a dual-stack client connects over, given median connect times per family.
+
+    A client starts with IPv6 and only races IPv4 after
+    ``CONNECTION_ATTEMPT_DELAY_MS``, so IPv4 wins only when IPv6 is that
+    much slower (or unreachable).
+    """
+    ipv4_ms = families.get("ipv4", {}).get("median")
+    ipv6_ms = families.get("ipv6", {}).get("median")
+    if ipv4_ms is None and ipv6_ms is None:
+        winner = None
+    elif ipv6_ms is None:
+        winner = "ipv4"
+    elif ipv4_ms is None:
+        winner = "ipv6"
+    else:
+        winner = "ipv4" if ipv4_ms + CONNECTION_ATTEMPT_DELAY_MS < ipv6_ms else "ipv6"
+    return {
+        "winner": winner,
+        "ipv4_ms": ipv4_ms,
+        "ipv6_ms": ipv6_ms,
+        "ipv6_penalty_ms": round(ipv6_ms - ipv4_ms, 2) if ipv4_ms is not None and ipv6_ms is not None else None,
+    }
@@ -9,7 +9,11 @@ from app.schemas.auth import (
     PasswordReset,
     OAuthCallback,
 )
-from app.schemas.scan import ScanCreate, ScanSchema, ScanDetailSchema
+from app.schemas.scan import (
+    ScanCreate, ScanSchema, ScanDetailSchema, ScanQueueStatus,
+    ScanBatchCreate, ScanBatchSchema, ScanBatchProgress,
+)
+from app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleSchema, ScanChangeSchema
 from app.schemas.result import ScanResultCreate, ScanResultSchema
 from app.schemas.report import ReportCreate, ReportSchema, AIScanAnalysis
 
@@ -25,6 +29,14 @@ __all__ = [
     "ScanCreate",
     "ScanSchema",
     "ScanDetailSchema",
+    "ScanQueueStatus",
+    "ScanBatchCreate",
+    "ScanBatchSchema",
+    "ScanBatchProgress",
+    "ScheduleCreate",
+    "ScheduleUpdate",
+    "ScheduleSchema",
+    "ScanChangeSchema",
     "ScanResultCreate",
     "ScanResultSchema",
     "ReportCreate",
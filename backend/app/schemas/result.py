@@ -25,6 +25,8 @@ class ScanResultCreate(BaseModel):
 class ScanResultSchema(ScanResultCreate):
     id: uuid.UUID
     scan_id: uuid.UUID
+    fingerprint: str | None = None
+    carried_over_from_id: uuid.UUID | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
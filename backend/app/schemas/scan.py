@@ -1,18 +1,44 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, model_validator
 
-from app.models.scan import ScanStatus
+from app.models.scan import ScanStatus, ScanProfile
+from app.models.scan_result import ScanModule
 from app.schemas.result import ScanResultSchema
 
 
+# ──────────────────────────────────────────────────────
+# Profile selection
+# ──────────────────────────────────────────────────────
+
+def selected_profile(profile: ScanProfile, modules: list[ScanModule] | None) -> ScanProfile:
+    """The profile a request runs: ``custom`` whenever modules are given, which a custom profile requires."""
+    if modules:
+        return ScanProfile.custom
+    if profile == ScanProfile.custom:
+        raise ValueError("modules are required for a custom profile")
+    return profile
+
+
+class ProfileSelection(BaseModel):
+    """Validation for request schemas that declare ``profile`` and ``modules`` fields."""
+
+    @model_validator(mode="after")
+    def _custom_when_modules_given(self) -> "ProfileSelection":
+        self.profile = selected_profile(self.profile, self.modules)
+        return self
+
+
 # ──────────────────────────────────────────────────────
 # Scan Schemas
 # ──────────────────────────────────────────────────────
 
-class ScanCreate(BaseModel):
+class ScanCreate(ProfileSelection):
     url: str  # validated by the orchestrator
+    profile: ScanProfile = ScanProfile.full
+    modules: list[ScanModule] | None = None  # explicit selection overrides the profile
+    force_fresh: bool = False  # never attach to an identical in-flight or recent scan
 
 
 class ScanSchema(BaseModel):
@@ -20,7 +46,14 @@ class ScanSchema(BaseModel):
     user_id: uuid.UUID
     url: str
     status: ScanStatus
+    profile: ScanProfile
+    modules: list[str]
+    coalesced_into_id: uuid.UUID | None = None
+    batch_id: uuid.UUID | None = None
+    schedule_id: uuid.UUID | None = None
     current_phase: str | None
+    # Module -> running | done | failed while the scan runs (modules may run in parallel)
+    module_phases: dict[str, str] | None = None
     overall_score: int | None
     started_at: datetime | None
     completed_at: datetime | None
@@ -30,6 +63,57 @@ class ScanSchema(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ScanQueueStatus(BaseModel):
+    """Position of a scan in the admission queue."""
+    state: str  # queued | running | completed | failed | not_queued
+    position: int | None = None
+    eta_seconds: int | None = None
+
+
 class ScanDetailSchema(ScanSchema):
     """Scan with its module results embedded."""
     results: list[ScanResultSchema] = []
+
+
+# ──────────────────────────────────────────────────────
+# Batch Schemas
+# ──────────────────────────────────────────────────────
+
+class ScanBatchCreate(ProfileSelection):
+    urls: list[str]
+    profile: ScanProfile = ScanProfile.standard
+    modules: list[ScanModule] | None = None
+
+
+class DNSBulkCreate(BaseModel):
+    hostnames: list[str] = []
+    # Wordlist mode: every word is scanned as <word>.<domain>, plus the domain itself
+    domain: str | None = None
+    words: list[str] = []
+
+    @model_validator(mode="after")
+    def _hosts_or_domain(self) -> "DNSBulkCreate":
+        if not self.hostnames and not self.domain:
+            raise ValueError("hostnames or a domain is required")
+        return self
+
+
+class ScanBatchSchema(BaseModel):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    profile: ScanProfile
+    modules: list[str]
+    total: int
+    skipped: int  # duplicate or invalid URLs dropped at submission
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ScanBatchProgress(ScanBatchSchema):
+    """Batch with aggregate progress of its scans."""
+    pending: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    average_score: float | None = None
@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from app.models.scan import ScanProfile
+from app.models.scan_result import ScanModule
+from app.schemas.scan import ProfileSelection
+
+
+# ──────────────────────────────────────────────────────
+# Schedule Schemas
+# ──────────────────────────────────────────────────────
+
+class ScheduleCreate(ProfileSelection):
+    url: str
+    profile: ScanProfile = ScanProfile.standard
+    modules: list[ScanModule] | None = None
+    interval_minutes: int = Field(default=24 * 60, ge=15)
+    # Spread window for the start time; defaults to a tenth of the interval (max 1h)
+    jitter_minutes: int | None = Field(default=None, ge=0)
+    start_at: datetime | None = None
+
+
+class ScheduleUpdate(BaseModel):
+    enabled: bool | None = None
+    interval_minutes: int | None = Field(default=None, ge=15)
+    jitter_minutes: int | None = Field(default=None, ge=0)
+
+
+class ScheduleSchema(BaseModel):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    url: str
+    profile: ScanProfile
+    modules: list[str]
+    interval_seconds: int
+    jitter_seconds: int
+    enabled: bool
+    next_run_at: datetime
+    # Set while a run refused by the scan quota waits for its retry
+    retry_at: datetime | None
+    last_run_at: datetime | None
+    last_scan_id: uuid.UUID | None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ScanChangeSchema(BaseModel):
+    id: uuid.UUID
+    schedule_id: uuid.UUID
+    scan_id: uuid.UUID
+    previous_scan_id: uuid.UUID | None
+    diff: dict
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,290 @@
+"""Bulk scan submission — many URLs in one request, fanned out as one batch."""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import re
+import uuid
+from typing import Any, AsyncIterator, Iterable
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import async_session_maker
+from app.models.scan import Scan, ScanProfile, ScanStatus
+from app.models.scan_batch import ScanBatch
+from app.models.scan_result import ScanModule, ScanResult
+from app.scanners.dns_scanner import BULK_COLUMNS, DNSScanner
+from app.services import scan_scheduler
+from app.services.scan_profiles import HEAVY_MODULES, MODULE_ORDER, resolve_modules
+from app.utils.url import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT; keeps each statement well under the bind-parameter limit
+INSERT_CHUNK_SIZE = 1000
+# Rows fetched per round trip while streaming an export
+EXPORT_CHUNK_SIZE = 500
+# A DNS hostname; underscores are allowed for service labels such as _dmarc
+_HOSTNAME_RE = re.compile(r"^(?=.{1,253}$)([a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)*[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?$")
+
+
+# ── parsing ──
+
+def parse_upload(raw: bytes) -> list[str]:
+    """Extract URLs from an NDJSON or plain-text upload.
+
+    Each non-empty line is either a JSON string, a JSON object with a ``url``
+    key, or a bare URL.  Lines starting with ``#`` are ignored.
+    """
+    urls: list[str] = []
+    for line in raw.decode("utf-8", errors="replace").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line[0] in "{\"":
+            try:
+                value = json.loads(line)
+            except ValueError:
+                value = None
+            if isinstance(value, dict):
+                value = value.get("url")
+            if isinstance(value, str):
+                urls.append(value)
+            continue
+        urls.append(line)
+    return urls
+
+
+def _dedupe(urls: Iterable[str]) -> tuple[list[tuple[str, str]], int]:
+    """Return unique (url, normalized_url) pairs in submission order and the number dropped."""
+    seen: set[str] = set()
+    unique: list[tuple[str, str]] = []
+    skipped = 0
+    for url in urls:
+        url = url.strip()
+        try:
+            normalized = normalize_url(url) if url else ""
+        except ValueError:
+            normalized = ""
+        # A URL without a host can never be scanned
+        if not urlsplit(normalized).hostname or normalized in seen:
+            skipped += 1
+            continue
+        seen.add(normalized)
+        unique.append((url, normalized))
+    return unique, skipped
+
+
+# ── submission ──
+
+async def create_batch(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    urls: list[str],
+    profile: ScanProfile,
+    modules: list[ScanModule] | None,
+) -> ScanBatch:
+    """Create a batch of scans and queue them all for fair dispatch.
+
+    Rows are written with multi-row INSERTs and queued with pipelined
+    scheduler calls, so the cost of a submission grows with the number of
+    chunks rather than the number of URLs.  Load tests are not available in
+    bulk: they are serialised per host and would hold a batch for hours.
+    """
+    selected = resolve_modules(profile, modules)
+    if any(module in HEAVY_MODULES for module in selected):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The performance module is not available for bulk scans",
+        )
+
+    unique, skipped = _dedupe(urls)
+    if not unique:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No valid URLs submitted")
+    if len(unique) > settings.SCHED_BULK_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may contain at most {settings.SCHED_BULK_MAX_URLS} URLs",
+        )
+
+    try:
+        await scan_scheduler.admit_bulk(user_id, len(unique))
+    except scan_scheduler.QuotaExceeded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(int(exc.retry_after) + 1)},
+        )
+
+    batch = ScanBatch(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        profile=profile,
+        modules=selected,
+        total=len(unique),
+        skipped=skipped,
+    )
+    db.add(batch)
+    await db.flush()
+
+    scan_ids = [uuid.uuid4() for _ in unique]
+    rows = [
+        {
+            "id": scan_id,
+            "user_id": user_id,
+            "url": url,
+            "normalized_url": normalized,
+            "status": ScanStatus.pending,
+            "batch_id": batch.id,
+            "profile": profile,
+            "modules": selected,
+        }
+        for scan_id, (url, normalized) in zip(scan_ids, unique)
+    ]
+    for offset in range(0, len(rows), INSERT_CHUNK_SIZE):
+        await db.execute(insert(Scan).values(rows[offset:offset + INSERT_CHUNK_SIZE]))
+    await db.commit()
+
+    # Queue only once committed, so the dispatcher never starts a scan the workers can't see
+    await scan_scheduler.enqueue_many(user_id, scan_ids, selected)
+    logger.info("Queued batch %s with %d scans (%d skipped)", batch.id, len(unique), skipped)
+    return batch
+
+
+# ── progress ──
+
+async def get_progress(db: AsyncSession, batch: ScanBatch) -> dict[str, Any]:
+    """Aggregate status counts and the average score of a batch in one query."""
+    statement = (
+        select(Scan.status, func.count(), func.avg(Scan.overall_score))
+        .where(Scan.batch_id == batch.id)
+        .group_by(Scan.status)
+    )
+    progress: dict[str, Any] = {s.value: 0 for s in ScanStatus}
+    scored = 0
+    score_sum = 0.0
+    for scan_status, count, avg_score in (await db.execute(statement)).all():
+        progress[scan_status.value] = count
+        if avg_score is not None:
+            scored += count
+            score_sum += float(avg_score) * count
+    progress["average_score"] = round(score_sum / scored, 1) if scored else None
+    return progress
+
+
+# ── export ──
+
+EXPORT_COLUMNS = ["scan_id", "url", "status", "overall_score", *(m.value for m in MODULE_ORDER)]
+
+
+async def _export_rows(batch_id: uuid.UUID) -> AsyncIterator[dict[str, Any]]:
+    """Yield one flat row per scan of the batch, with a score column per module.
+
+    Runs on its own session because the response body is streamed after the
+    request's session has been closed.
+    """
+    statement = (
+        select(Scan.id, Scan.url, Scan.status, Scan.overall_score, ScanResult.module, ScanResult.score)
+        .outerjoin(ScanResult, ScanResult.scan_id == Scan.id)
+        .where(Scan.batch_id == batch_id)
+        .order_by(Scan.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    async with async_session_maker() as db:
+        current: dict[str, Any] | None = None
+        async for scan_id, url, scan_status, overall, module, score in await db.stream(statement):
+            if current is None or current["scan_id"] != str(scan_id):
+                if current is not None:
+                    yield current
+                current = {"scan_id": str(scan_id), "url": url, "status": scan_status.value, "overall_score": overall}
+            if module is not None:
+                current[module.value] = score
+        if current is not None:
+            yield current
+
+
+async def export_ndjson(batch_id: uuid.UUID) -> AsyncIterator[bytes]:
+    async for row in _export_rows(batch_id):
+        yield (json.dumps(row) + "\n").encode("utf-8")
+
+
+async def export_csv(batch_id: uuid.UUID) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    async for row in _export_rows(batch_id):
+        writer.writerow(row)
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+# ── bulk DNS ──
+
+def _hostname(value: str) -> str | None:
+    """The hostname in a bare name or URL, lowercased; None if it is not a valid one."""
+    value = value.strip().lower()
+    if "//" in value:
+        value = urlsplit(value).hostname or ""
+    value = value.split("/")[0].rstrip(".")
+    return value if _HOSTNAME_RE.match(value) else None
+
+
+def dns_bulk_hostnames(hostnames: list[str], domain: str | None, words: list[str]) -> tuple[list[str], str | None]:
+    """Validate and dedupe the hosts of a bulk DNS scan (a host list, or a wordlist under a domain).
+
+    Returns:
+        (unique hostnames in submission order, the validated domain if one was given)
+    """
+    apex = None
+    if domain:
+        apex = _hostname(domain)
+        if apex is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid domain")
+        hostnames = [*hostnames, *DNSScanner.expand_wordlist(apex, words)]
+    unique = list(dict.fromkeys(host for host in map(_hostname, hostnames) if host))
+    if not unique:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No valid hostnames submitted")
+    if len(unique) > settings.BULK_DNS_MAX_HOSTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A bulk DNS scan may contain at most {settings.BULK_DNS_MAX_HOSTS} hostnames",
+        )
+    return unique, apex
+
+
+async def admit_dns_bulk(user_id: uuid.UUID, hostnames: list[str]) -> None:
+    """Charge a bulk DNS run to the user's hostname bucket; a 429 with Retry-After when it is empty."""
+    try:
+        await scan_scheduler.admit_bulk_dns(user_id, len(hostnames))
+    except scan_scheduler.QuotaExceeded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(int(exc.retry_after) + 1)},
+        )
+
+
+async def dns_bulk_ndjson(hostnames: list[str], domain: str | None, user_id: uuid.UUID) -> AsyncIterator[bytes]:
+    async for row in DNSScanner().bulk_scan(hostnames, domain, user_id=str(user_id)):
+        yield (json.dumps(row) + "\n").encode("utf-8")
+
+
+async def dns_bulk_csv(hostnames: list[str], domain: str | None, user_id: uuid.UUID) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=BULK_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    async for row in DNSScanner().bulk_scan(hostnames, domain, user_id=str(user_id)):
+        # Rows go out as they complete, so flush each one
+        writer.writerow({key: " ".join(value) if isinstance(value, list) else value for key, value in row.items()})
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,84 @@
+"""Replayable scan event logs.
+
+While a scan runs, its events live in a bounded Redis Stream written by the
+event bus.  When the scan finishes, the stream is compacted into a single
+``scan_event_logs`` row (intermediate progress updates are dropped, every
+other event is kept with its original ID) and the stream is left to expire,
+so finished scans replay from one primary-key lookup.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import get_redis
+from app.models.scan_event_log import ScanEventLog
+from app.utils.event_ids import is_after
+from app.websocket.event_bus import log_key
+
+logger = logging.getLogger(__name__)
+
+# The stream outlives compaction briefly for clients that are mid-replay
+COMPACTED_LOG_TTL_SECONDS = 10 * 60
+# Event types where only the latest one per phase is worth replaying
+COLLAPSIBLE_TYPES = {"progress"}
+
+
+def _decode(entries: list[tuple[str, dict[str, str]]]) -> list[dict[str, Any]]:
+    return [{"event_id": event_id, **json.loads(fields["e"])} for event_id, fields in entries]
+
+
+def _collapse(events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep every event except progress updates superseded by a later one of the same phase."""
+    latest: dict[tuple[str, Any], str] = {}
+    for event in events:
+        if event.get("type") in COLLAPSIBLE_TYPES:
+            latest[(event["type"], event.get("phase"))] = event["event_id"]
+    return [
+        event for event in events
+        if event.get("type") not in COLLAPSIBLE_TYPES
+        or latest[(event["type"], event.get("phase"))] == event["event_id"]
+    ]
+
+
+async def read_events(db: AsyncSession, scan_id: str, after: str | None = None) -> list[dict[str, Any]]:
+    """Return the events of a scan after the given event ID, oldest first.
+
+    Reads the live stream while it exists, and the compacted log otherwise.
+    """
+    client = await get_redis()
+    key = log_key(scan_id)
+    entries = await client.xrange(key, min="-" if after is None else f"({after}")
+    if entries or await client.exists(key):
+        return _decode(entries)
+
+    try:
+        log = await db.get(ScanEventLog, UUID(scan_id))
+    except ValueError:
+        return []
+    if log is None:
+        return []
+    return [event for event in log.events if is_after(event.get("event_id"), after)]
+
+
+async def compact_event_log(db: AsyncSession, scan_id: str) -> None:
+    """Persist a finished scan's event stream to the database and let the stream expire."""
+    client = await get_redis()
+    key = log_key(scan_id)
+    events = _collapse(_decode(await client.xrange(key)))
+    if not events:
+        return
+
+    log = await db.get(ScanEventLog, UUID(scan_id))
+    if log is None:
+        log = ScanEventLog(scan_id=UUID(scan_id))
+        db.add(log)
+    log.events = events
+    log.last_event_id = events[-1]["event_id"]
+    await db.commit()
+    await client.expire(key, COMPACTED_LOG_TTL_SECONDS)
+    logger.info("Compacted %d events of scan %s", len(events), scan_id)
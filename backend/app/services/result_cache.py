@@ -0,0 +1,114 @@
+"""Redis-backed cache of module results shared across users.
+
+Entries are keyed on the module fingerprint, so a change of DNS answers,
+certificate, peer IP or landing page produces a different key.  The TTL of
+each entry is derived from the result itself where the data carries its own
+validity (DNS record TTLs, certificate expiry) and falls back to a fixed
+per-module policy otherwise.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from app.core.metrics import incr_counter
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+MIN_TTL_SECONDS = 60
+MAX_TTL_SECONDS = 6 * 60 * 60
+
+
+def _dns_ttl(data: dict[str, Any]) -> int | None:
+    """Valid until the shortest record TTL expires."""
+    ttls = data.get("checks", {}).get("record_ttls") or {}
+    return min(ttls.values()) if ttls else None
+
+
+def _ssl_ttl(data: dict[str, Any]) -> int | None:
+    """Valid until the certificate expires (the fingerprint covers cert and IP changes)."""
+    not_after = data.get("certificate", {}).get("not_after")
+    if not not_after:
+        return None
+    remaining = datetime.fromisoformat(not_after) - datetime.now(timezone.utc)
+    return int(remaining.total_seconds())
+
+
+# module -> (TTL derived from the result, fallback TTL). Missing modules are never cached.
+TTL_POLICIES: dict[str, tuple[Callable[[dict[str, Any]], int | None], int]] = {
+    "dns": (_dns_ttl, 5 * 60),
+    "ssl": (_ssl_ttl, 60 * 60),
+    "security": (lambda data: None, 30 * 60),
+    "seo": (lambda data: None, 60 * 60),
+}
+
+
+def _key(module: str, fingerprint: str) -> str:
+    return f"module_cache:{module}:{fingerprint}"
+
+
+def ttl_for(module: str, data: dict[str, Any]) -> int | None:
+    """Return the cache TTL in seconds for a result, or None if it must not be cached."""
+    policy = TTL_POLICIES.get(module)
+    if policy is None or data.get("error"):
+        return None
+    derive, fallback = policy
+    try:
+        ttl = derive(data)
+    except Exception:
+        ttl = None
+    if ttl is None:
+        ttl = fallback
+    if ttl < MIN_TTL_SECONDS:
+        return None
+    return min(ttl, MAX_TTL_SECONDS)
+
+
+async def get_cached_result(module: str, fingerprint: str | None) -> dict[str, Any] | None:
+    """Look up a cached result for *module*; records a hit or miss."""
+    if fingerprint is None or module not in TTL_POLICIES:
+        return None
+    try:
+        client = await get_redis()
+        raw = await client.get(_key(module, fingerprint))
+    except Exception as exc:
+        logger.warning("Module cache lookup failed for %s: %s", module, exc)
+        return None
+
+    await incr_counter(f"module_cache.{'hit' if raw else 'miss'}.{module}")
+    return json.loads(raw) if raw else None
+
+
+async def store_result(
+    module: str,
+    fingerprint: str | None,
+    result_id: str,
+    score: int,
+    grade: str | None,
+    data: dict[str, Any],
+    issues: dict[str, int],
+) -> None:
+    """Cache a freshly computed result with a TTL derived from its data."""
+    if fingerprint is None:
+        return
+    ttl = ttl_for(module, data)
+    if ttl is None:
+        return
+    payload = {
+        "result_id": result_id,
+        "score": score,
+        "grade": grade,
+        "data": data,
+        "issues": issues,
+        "cached_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        client = await get_redis()
+        await client.set(_key(module, fingerprint), json.dumps(payload, default=str), ex=ttl)
+    except Exception as exc:
+        logger.warning("Module cache store failed for %s: %s", module, exc)
+        return
+    await incr_counter(f"module_cache.store.{module}")
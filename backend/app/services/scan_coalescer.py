@@ -0,0 +1,145 @@
+"""Scan coalescing — attach identical concurrent scans of a URL to a single run."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import get_redis
+from app.models.scan import Scan, ScanStatus
+from app.models.scan_result import ScanResult
+
+logger = logging.getLogger(__name__)
+
+# A completed scan younger than this is shared instead of starting a new run
+COALESCE_WINDOW = timedelta(minutes=10)
+# Upper bound on how long an in-flight claim is kept without being refreshed
+INFLIGHT_CLAIM_TTL_SECONDS = 60 * 60
+# A claim is taken before its scan row is committed; a concurrent submission waits
+# this long for the row to become visible before treating the claim as abandoned
+UNCOMMITTED_CLAIM_WAIT_SECONDS = 2.0
+UNCOMMITTED_CLAIM_POLL_SECONDS = 0.05
+
+
+def _claim_key(normalized_url: str, modules: list[str]) -> str:
+    digest = hashlib.sha1(f"{normalized_url}|{','.join(modules)}".encode("utf-8")).hexdigest()
+    return f"scan_coalesce:{digest}"
+
+
+def _is_shareable(primary: Scan | None, modules: list[str]) -> bool:
+    """A primary can be shared while running, or shortly after completing."""
+    if primary is None or primary.coalesced_into_id is not None or primary.modules != modules:
+        return False
+    if primary.status in (ScanStatus.pending, ScanStatus.running):
+        return True
+    if primary.status == ScanStatus.completed and primary.completed_at is not None:
+        return primary.completed_at >= datetime.now(timezone.utc) - COALESCE_WINDOW
+    return False
+
+
+async def _load_claim(db: AsyncSession, key: str, modules: list[str]) -> Scan | None:
+    """Return the claimed primary if it can be shared.
+
+    A claim whose row is not visible yet belongs to a submission that has not
+    committed; it is polled for up to ``UNCOMMITTED_CLAIM_WAIT_SECONDS``
+    rather than being taken over.
+    """
+    client = await get_redis()
+    deadline = time.monotonic() + UNCOMMITTED_CLAIM_WAIT_SECONDS
+    while True:
+        primary_id = await client.get(key)
+        if primary_id is None:
+            return None
+        primary = await db.get(Scan, uuid.UUID(primary_id))
+        if primary is not None or time.monotonic() >= deadline:
+            return primary if _is_shareable(primary, modules) else None
+        await asyncio.sleep(UNCOMMITTED_CLAIM_POLL_SECONDS)
+
+
+async def claim_or_attach(db: AsyncSession, scan: Scan, force_fresh: bool = False) -> Scan | None:
+    """Register *scan* as the run for its URL, or return the run it should attach to.
+
+    *scan* must already be flushed (it needs an ID).  The claim lives in Redis
+    so that concurrent submissions for the same URL race on a single
+    ``SET NX`` rather than on a database query.
+
+    Returns:
+        The primary Scan to attach to, or None if *scan* must run itself.
+    """
+    key = _claim_key(scan.normalized_url, scan.modules)
+    client = await get_redis()
+
+    if force_fresh:
+        await client.set(key, str(scan.id), ex=INFLIGHT_CLAIM_TTL_SECONDS)
+        return None
+
+    primary = await _load_claim(db, key, scan.modules)
+    if primary is not None:
+        return primary
+
+    # No usable claim: take it, or attach to whoever won the race in between
+    if await client.set(key, str(scan.id), ex=INFLIGHT_CLAIM_TTL_SECONDS, nx=True):
+        return None
+    primary = await _load_claim(db, key, scan.modules)
+    if primary is None:
+        await client.set(key, str(scan.id), ex=INFLIGHT_CLAIM_TTL_SECONDS)
+    return primary
+
+
+async def release_claim(scan: Scan) -> None:
+    """Keep a completed run shareable for the coalescing window, drop failed ones."""
+    if not scan.normalized_url:
+        return
+    key = _claim_key(scan.normalized_url, scan.modules)
+    client = await get_redis()
+    if await client.get(key) != str(scan.id):
+        return
+    if scan.status == ScanStatus.completed:
+        await client.expire(key, int(COALESCE_WINDOW.total_seconds()))
+    else:
+        await client.delete(key)
+
+
+async def copy_results(db: AsyncSession, primary: Scan, follower: Scan) -> None:
+    """Copy the primary's results and final state onto an attached scan (not committed)."""
+    statement = select(ScanResult).where(ScanResult.scan_id == primary.id)
+    results = (await db.execute(statement)).scalars().all()
+    for result in results:
+        db.add(ScanResult(
+            scan_id=follower.id,
+            module=result.module,
+            score=result.score,
+            grade=result.grade,
+            data=result.data,
+            issues_critical=result.issues_critical,
+            issues_high=result.issues_high,
+            issues_medium=result.issues_medium,
+            issues_low=result.issues_low,
+            fingerprint=result.fingerprint,
+            carried_over_from_id=result.carried_over_from_id or result.id,
+        ))
+
+    follower.status = primary.status
+    follower.current_phase = primary.current_phase
+    follower.overall_score = primary.overall_score
+    follower.started_at = primary.started_at
+    follower.completed_at = primary.completed_at
+    follower.duration_seconds = primary.duration_seconds
+    db.add(follower)
+
+
+async def complete_followers(db: AsyncSession, primary: Scan) -> list[Scan]:
+    """Propagate a finished primary run to every scan attached to it (not committed)."""
+    statement = select(Scan).where(Scan.coalesced_into_id == primary.id)
+    followers = (await db.execute(statement)).scalars().all()
+    for follower in followers:
+        await copy_results(db, primary, follower)
+    if followers:
+        logger.info("Propagated scan %s to %d attached scan(s)", primary.id, len(followers))
+    return list(followers)
@@ -1,13 +1,24 @@
 import asyncio
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any
+from urllib.parse import urlparse
+from uuid import UUID, uuid4
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.scan import Scan, ScanStatus
+from app.core.locks import host_lease
+from app.core.redis import set_module_state, set_scan_phase
+from app.models.scan import Scan, ScanStatus, ScanProfile
 from app.models.scan_result import ScanResult
-from app.websocket.manager import ws_manager
+from app.services.event_log import compact_event_log
+from app.services.result_cache import get_cached_result, store_result
+from app.services.scan_coalescer import complete_followers, release_claim
+from app.services.scan_profiles import HEAVY_MODULES, resolve_modules
+from app.services.schedule_service import record_run
+from app.websocket.event_batcher import EventBatcher
+from app.websocket.event_bus import publish_event
 from app.scanners.dns_scanner import DNSScanner
 from app.scanners.ssl_scanner import SSLScanner
 from app.scanners.performance_scanner import PerformanceScanner
@@ -16,33 +27,79 @@ from app.scanners.seo_scanner import SEOScanner
 
 logger = logging.getLogger(__name__)
 
+SCANNER_CLASSES = {
+    "dns": DNSScanner,
+    "ssl": SSLScanner,
+    "performance": PerformanceScanner,
+    "security": SecurityScanner,
+    "seo": SEOScanner,
+}
+
+# How long an earlier result stays reusable when the module fingerprint is unchanged.
+# Modules missing here (performance) are always re-run.  The SSL fingerprint does not
+# cover SSL 2.0/3.0, Heartbleed or CCS injection, and the DNS one leaves out latency
+# and propagation, so those results age out sooner.
+RESULT_REUSE_MAX_AGE = {
+    "dns": timedelta(hours=12),
+    "ssl": timedelta(hours=6),
+    "security": timedelta(hours=12),
+    "seo": timedelta(hours=12),
+}
+
 class ScanOrchestrator:
     """
-    Orchestrates the execution of all scanners sequentially for a given Scan.
+    Orchestrates the execution of the selected scanners sequentially for a given Scan.
     Handles database state updates, WebSocket notifications, and error catching.
+
+    Database writes are coalesced: the scan is committed once when it starts
+    and once when it finishes (results and final status in one transaction).
+    Intermediate phase changes only go to Redis.
+
+    ``run()`` executes every module in-process.  Workers can instead call
+    ``start()``, ``run_module()`` + ``commit_module()`` per module, and
+    ``finalize()`` from separate tasks.
     """
     
     def __init__(self, db: AsyncSession, scan: Scan):
         self.db = db
         self.scan = scan
-        self.scanners = [
-            ("dns", DNSScanner()),
-            ("ssl", SSLScanner()),
-            ("performance", PerformanceScanner()),
-            ("security", SecurityScanner()),
-            ("seo", SEOScanner())
-        ]
+        # Only build the scanners selected for this scan (all of them for legacy rows)
+        modules = scan.modules or resolve_modules(ScanProfile.full)
+        self.scanners = [(module, SCANNER_CLASSES[module]()) for module in modules]
+        # Scans attached to this run through coalescing; filled in when it finishes
+        self.followers: list[Scan] = []
+        self._pending_cache_writes: list[tuple] = []
+        # Log lines and progress snapshots are published in frames
+        self._events = EventBatcher(self._publish_event)
         
     async def _send_ws_message(self, message: dict) -> None:
-        """Helper to send a message via WebSocket, catching and ignoring disconnection errors."""
+        """Queue a live event for this scan; it is published on the event bus with the next frame."""
+        await self._events.emit(message)
+
+    async def _publish_event(self, message: dict) -> None:
+        """Publish a live event on the event bus; the API replicas forward it to clients."""
         try:
-            await ws_manager.send_to_scan(str(self.scan.id), message)
+            await publish_event(str(self.scan.id), message)
         except Exception as e:
-            logger.warning(f"Failed to send WS message for scan {self.scan.id}: {e}")
+            logger.warning(f"Failed to publish event for scan {self.scan.id}: {e}")
+
+    async def _save_scan_result(
+        self,
+        module_name: str,
+        score: int,
+        grade: str,
+        data: dict,
+        issues: dict,
+        fingerprint: str | None = None,
+        carried_over_from: ScanResult | None = None,
+    ) -> None:
+        """Helper to stage a ScanResult; it is committed together with the final scan status.
 
-    async def _save_scan_result(self, module_name: str, score: int, grade: str, data: dict, issues: dict) -> None:
-        """Helper to save a ScanResult to the database."""
+        Freshly scanned results are queued for the shared module cache, which is
+        only written once the result is committed.
+        """
         result = ScanResult(
+            id=uuid4(),
             scan_id=self.scan.id,
             module=module_name,
             score=score,
@@ -52,132 +109,314 @@ class ScanOrchestrator:
             issues_high=issues.get("high", 0),
             issues_medium=issues.get("medium", 0),
             issues_low=issues.get("low", 0),
+            fingerprint=fingerprint,
+            carried_over_from_id=carried_over_from.id if carried_over_from else None,
         )
         self.db.add(result)
+        if carried_over_from is None:
+            self._pending_cache_writes.append(
+                (module_name, fingerprint, str(result.id), score, grade, data, issues)
+            )
+
+    async def _find_reusable_result(self, module_name: str, fingerprint: str | None) -> ScanResult | None:
+        """Return the latest fresh result of a previous scan of the same URL with a matching fingerprint.
+
+        Only original results are considered (never carried-over copies), so
+        freshness is always measured from the run that actually scanned the site.
+        """
+        max_age = RESULT_REUSE_MAX_AGE.get(module_name)
+        if fingerprint is None or max_age is None:
+            return None
+
+        statement = (
+            select(ScanResult)
+            .join(Scan, ScanResult.scan_id == Scan.id)
+            .where(
+                Scan.user_id == self.scan.user_id,
+                Scan.url == self.scan.url,
+                Scan.id != self.scan.id,
+                ScanResult.module == module_name,
+                ScanResult.fingerprint == fingerprint,
+                ScanResult.carried_over_from_id.is_(None),
+                ScanResult.created_at >= datetime.now(timezone.utc) - max_age,
+            )
+            .order_by(ScanResult.created_at.desc())
+            .limit(1)
+        )
+        result = await self.db.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def _set_phase(self, phase: str) -> None:
+        """Publish the live phase to Redis without touching the database."""
+        try:
+            await set_scan_phase(str(self.scan.id), phase)
+        except Exception as e:
+            logger.warning(f"Failed to store live phase for scan {self.scan.id}: {e}")
+
+    async def _set_module_state(self, module_name: str, state: str) -> None:
+        """Publish one module's live state; parallel module tasks each write their own field."""
+        try:
+            await set_module_state(str(self.scan.id), module_name, state)
+        except Exception as e:
+            logger.warning(f"Failed to store live state of {module_name} for scan {self.scan.id}: {e}")
+
+    async def _reuse_or_run(self, module_name: str, scanner: Any, callback: Any) -> tuple:
+        """Obtain a module result from the shared cache, a previous scan, or by running the scanner.
+
+        Returns:
+            (fingerprint, carried_over_from, score, grade, data, issues)
+        """
+        fingerprint = await scanner.fingerprint(self.scan.url)
+
+        # 1. Shared cache: results are valid for any user while the inputs are unchanged
+        cached = await get_cached_result(module_name, fingerprint)
+        source = await self.db.get(ScanResult, UUID(cached["result_id"])) if cached else None
+        if source is not None:
+            await self._send_ws_message({
+                "type": "log",
+                "phase": module_name,
+                "level": "info",
+                "message": f"Inputs unchanged, using cached result from {cached['cached_at']}",
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+            return fingerprint, source, cached["score"], cached["grade"], cached["data"], cached["issues"]
+
+        # 2. Same user's earlier scan of this URL
+        previous = await self._find_reusable_result(module_name, fingerprint)
+        if previous is not None:
+            issues = {
+                "critical": previous.issues_critical,
+                "high": previous.issues_high,
+                "medium": previous.issues_medium,
+                "low": previous.issues_low,
+            }
+            await self._send_ws_message({
+                "type": "log",
+                "phase": module_name,
+                "level": "info",
+                "message": f"Inputs unchanged since {previous.created_at.isoformat()}, reusing previous result",
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+            return fingerprint, previous, previous.score, previous.grade, previous.data, issues
+
+        # 3. Run Scanner; load tests hold a per-host lease so a site is never load-tested twice at once
+        if module_name in HEAVY_MODULES:
+            async def _on_wait(position: int) -> None:
+                await self._send_ws_message({
+                    "type": "queue",
+                    "phase": module_name,
+                    "position": position,
+                    "message": f"Waiting for another load test on this host to finish (position {position})",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                })
+
+            host = urlparse(self.scan.url).hostname or self.scan.url
+            # A lease that cannot be renewed cancels the run and surfaces as LeaseLost (module failed)
+            async with host_lease(host, str(self.scan.id), on_wait=_on_wait):
+                raw_results = await scanner.run(self.scan.url, callback)
+        else:
+            raw_results = await scanner.run(self.scan.url, callback)
+
+        # Calculate Score and Grade
+        score = scanner.calculate_score(raw_results)
+        grade = scanner.calculate_grade(score)
+
+        # Extract issues counts (pseudo logic, depends on scanner implementation)
+        # Scanners should ideally return an 'issues' dict in their raw_results
+        issues = raw_results.get("issues_summary", {"critical": 0, "high": 0, "medium": 0, "low": 0})
+        return fingerprint, None, score, grade, raw_results, issues
+
+    async def _commit(self) -> None:
+        """Commit staged changes, then publish freshly scanned results to the shared cache."""
         await self.db.commit()
+        for entry in self._pending_cache_writes:
+            await store_result(*entry)
+        self._pending_cache_writes.clear()
 
     async def _update_scan_status(self, status: ScanStatus, current_phase: str | None = None, overall_score: int | None = None) -> None:
-        """Helper to update the main Scan record."""
+        """Helper to update and commit the main Scan record (with any staged results)."""
         self.scan.status = status
         if current_phase is not None:
             self.scan.current_phase = current_phase
+            await self._set_phase(current_phase)
         if overall_score is not None:
             self.scan.overall_score = overall_score
             
-        if status == ScanStatus.COMPLETED or status == ScanStatus.FAILED:
+        if status == ScanStatus.completed or status == ScanStatus.failed:
             self.scan.completed_at = datetime.now(timezone.utc)
             if self.scan.started_at:
                 self.scan.duration_seconds = int((self.scan.completed_at - self.scan.started_at).total_seconds())
+            # Attached scans share this run's outcome within the same transaction
+            self.followers = await complete_followers(self.db, self.scan)
                 
         self.db.add(self.scan)
-        await self.db.commit()
+        await self._commit()
 
-    async def run(self) -> None:
-        """
-        Executes all scanners sequentially.
+        if status == ScanStatus.completed or status == ScanStatus.failed:
+            try:
+                await release_claim(self.scan)
+            except Exception as e:
+                logger.warning(f"Failed to release coalescing claim for scan {self.scan.id}: {e}")
+
+    async def start(self) -> None:
+        """Mark the scan as running."""
+        logger.info(f"Starting orchestration for scan {self.scan.id} on {self.scan.url}")
+        self.scan.started_at = datetime.now(timezone.utc)
+        await self._update_scan_status(ScanStatus.running, current_phase="starting")
+
+    async def run_module(self, module_name: str) -> int | None:
+        """Run (or reuse) a single module and stage its result.
+
+        Module failures are reported over the live stream and swallowed so the
+        remaining modules still run (graceful degradation).
+
+        Returns:
+            The module score, or None if the module failed.
         """
+        modules = [name for name, _ in self.scanners]
+        scanner = dict(self.scanners)[module_name]
         try:
-            logger.info(f"Starting orchestration for scan {self.scan.id} on {self.scan.url}")
+            logger.info(f"[{self.scan.id}] Starting module: {module_name}")
             
-            # Start scan
-            self.scan.started_at = datetime.now(timezone.utc)
-            await self._update_scan_status(ScanStatus.RUNNING, current_phase="starting")
+            # Notify Phase Change
+            await self._set_module_state(module_name, "running")
+            await self._send_ws_message({
+                "type": "phase_change", 
+                "phase": module_name, 
+                "phase_index": modules.index(module_name) + 1, 
+                "total_phases": len(modules), 
+                "status": "running"
+            })
 
-            total_score = 0
-            successful_modules = 0
-            
-            total_phases = len(self.scanners)
-
-            for index, (module_name, scanner) in enumerate(self.scanners):
-                try:
-                    logger.info(f"[{self.scan.id}] Starting module: {module_name}")
-                    
-                    # Notify Phase Change
-                    await self._update_scan_status(ScanStatus.RUNNING, current_phase=module_name)
-                    await self._send_ws_message({
-                        "type": "phase_change", 
-                        "phase": module_name, 
-                        "phase_index": index + 1, 
-                        "total_phases": total_phases, 
-                        "status": "running"
-                    })
-
-                    # Define callback for live updates
-                    async def live_update_callback(event_type: str, data: dict) -> None:
-                        message = {"type": event_type, "phase": module_name}
-                        message.update(data)
-                        await self._send_ws_message(message)
-
-                    # Run Scanner
-                    raw_results = await scanner.run(self.scan.url, live_update_callback)
-                    
-                    # Calculate Score and Grade
-                    score = scanner.calculate_score(raw_results)
-                    grade = scanner.calculate_grade(score)
-                    
-                    # Extract issues counts (pseudo logic, depends on scanner implementation)
-                    # Scanners should ideally return an 'issues' dict in their raw_results
-                    issues = raw_results.get("issues_summary", {"critical": 0, "high": 0, "medium": 0, "low": 0})
-
-                    # Save result
-                    await self._save_scan_result(module_name, score, grade, raw_results, issues)
-                    
-                    total_score += score
-                    successful_modules += 1
-
-                    # Notify Module Complete
-                    await self._send_ws_message({
-                        "type": "module_complete", 
-                        "phase": module_name, 
-                        "score": score, 
-                        "grade": grade, 
-                        "issues_count": issues
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"[{self.scan.id}] Error in module {module_name}: {e}", exc_info=True)
-                    # Notify Error via Log
-                    await self._send_ws_message({
-                        "type": "log", 
-                        "phase": module_name, 
-                        "level": "error", 
-                        "message": f"Module failed: {str(e)}", 
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    })
-                    # We continue to the next scanner (Graceful degradation)
-
-            # Finalize Scan
-            if successful_modules > 0:
-                overall_score = total_score // successful_modules
-                await self._update_scan_status(ScanStatus.COMPLETED, current_phase="completed", overall_score=overall_score)
-                
-                await self._send_ws_message({
-                    "type": "scan_complete", 
-                    "overall_score": overall_score, 
-                    "duration_seconds": self.scan.duration_seconds, 
-                    "report_generating": True
-                })
-                
-                logger.info(f"Scan {self.scan.id} completed successfully with score {overall_score}")
-                
-            else:
-                # All modules failed
-                await self._update_scan_status(ScanStatus.FAILED, current_phase="failed", overall_score=0)
-                await self._send_ws_message({
-                    "type": "scan_complete", 
-                    "overall_score": 0, 
-                    "duration_seconds": self.scan.duration_seconds, 
-                    "report_generating": False
-                })
-                logger.error(f"Scan {self.scan.id} failed: all modules failed.")
+            # Scanners emit complete payloads; tag them with the phase in case they don't
+            async def live_update_callback(data: dict) -> None:
+                message = {"phase": module_name}
+                message.update(data)
+                await self._send_ws_message(message)
+
+            fingerprint, previous, score, grade, raw_results, issues = await self._reuse_or_run(
+                module_name, scanner, live_update_callback
+            )
+
+            # Save result
+            await self._save_scan_result(
+                module_name, score, grade, raw_results, issues,
+                fingerprint=fingerprint, carried_over_from=previous,
+            )
 
+            # Notify Module Complete
+            await self._send_ws_message({
+                "type": "module_complete", 
+                "phase": module_name, 
+                "score": score, 
+                "grade": grade, 
+                "issues_count": issues,
+                "carried_over": previous is not None
+            })
+            await self._set_module_state(module_name, "done")
+            return score
+            
         except Exception as e:
-            logger.error(f"Critical orchestration error for scan {self.scan.id}: {e}", exc_info=True)
-            await self._update_scan_status(ScanStatus.FAILED, current_phase="failed")
+            logger.error(f"[{self.scan.id}] Error in module {module_name}: {e}", exc_info=True)
+            # Notify Error via Log
             await self._send_ws_message({
                 "type": "log", 
-                "phase": "orchestrator", 
+                "phase": module_name, 
                 "level": "error", 
-                "message": "Critical orchestration failure.", 
+                "message": f"Module failed: {str(e)}", 
                 "timestamp": datetime.now(timezone.utc).isoformat()
             })
+            await self._set_module_state(module_name, "failed")
+            return None
+
+    async def commit_module(self) -> None:
+        """Commit a module result staged by ``run_module`` (used when modules run as separate tasks)."""
+        await self._events.close()
+        await self._commit()
+
+    async def finalize(self) -> None:
+        """Compute the overall score from the stored results and close the scan."""
+        statement = select(ScanResult.score).where(ScanResult.scan_id == self.scan.id)
+        scores = (await self.db.execute(statement)).scalars().all()
+
+        if scores:
+            overall_score = sum(scores) // len(scores)
+            await self._update_scan_status(ScanStatus.completed, current_phase="completed", overall_score=overall_score)
+            
+            await self._send_ws_message({
+                "type": "scan_complete", 
+                "overall_score": overall_score, 
+                "duration_seconds": self.scan.duration_seconds, 
+                "report_generating": True
+            })
+            
+            logger.info(f"Scan {self.scan.id} completed successfully with score {overall_score}")
+
+            if self.scan.schedule_id is not None:
+                await self._record_schedule_run()
+            
+        else:
+            # All modules failed
+            await self._update_scan_status(ScanStatus.failed, current_phase="failed", overall_score=0)
+            await self._send_ws_message({
+                "type": "scan_complete", 
+                "overall_score": 0, 
+                "duration_seconds": self.scan.duration_seconds, 
+                "report_generating": False
+            })
+            logger.error(f"Scan {self.scan.id} failed: all modules failed.")
+
+        await self._close_event_log()
+
+    async def _record_schedule_run(self) -> None:
+        """Diff a scheduled run against the previous one and announce it only if something moved."""
+        try:
+            change = await record_run(self.db, self.scan)
+        except Exception as e:
+            logger.warning(f"Failed to record schedule run for scan {self.scan.id}: {e}")
+            await self.db.rollback()
+            return
+        if change is not None:
+            await self._send_ws_message({
+                "type": "changed",
+                "schedule_id": str(change.schedule_id),
+                "previous_scan_id": str(change.previous_scan_id),
+                "diff": change.diff,
+            })
+
+    async def _close_event_log(self) -> None:
+        """Move the finished scan's live event stream into the database for cheap replay."""
+        await self._events.close()
+        try:
+            await compact_event_log(self.db, str(self.scan.id))
+        except Exception as e:
+            logger.warning(f"Failed to compact event log for scan {self.scan.id}: {e}")
+            await self.db.rollback()
+
+    async def fail(self) -> None:
+        """Mark the scan as failed after an unexpected orchestration error."""
+        await self._update_scan_status(ScanStatus.failed, current_phase="failed")
+        await self._send_ws_message({
+            "type": "log", 
+            "phase": "orchestrator", 
+            "level": "error", 
+            "message": "Critical orchestration failure.", 
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
+        await self._close_event_log()
+
+    async def run(self) -> None:
+        """
+        Executes all selected scanners sequentially in this process.
+        """
+        try:
+            await self.start()
+            # Load tests may have to wait for the host lease, so run them after the probes
+            ordered = sorted(self.scanners, key=lambda item: item[0] in HEAVY_MODULES)
+            for module_name, _ in ordered:
+                await self.run_module(module_name)
+            await self.finalize()
+
+        except Exception as e:
+            logger.error(f"Critical orchestration error for scan {self.scan.id}: {e}", exc_info=True)
+            await self.fail()
@@ -0,0 +1,45 @@
+"""Scan profiles: which modules a scan runs and which worker queue each module goes to."""
+from __future__ import annotations
+
+from app.models.scan import ScanProfile
+from app.models.scan_result import ScanModule
+
+# Canonical execution order of the modules
+MODULE_ORDER: list[ScanModule] = [
+    ScanModule.dns,
+    ScanModule.ssl,
+    ScanModule.performance,
+    ScanModule.security,
+    ScanModule.seo,
+]
+
+PROFILE_MODULES: dict[ScanProfile, list[ScanModule]] = {
+    ScanProfile.quick: [ScanModule.dns, ScanModule.ssl],
+    ScanProfile.standard: [ScanModule.dns, ScanModule.ssl, ScanModule.security, ScanModule.seo],
+    ScanProfile.full: list(MODULE_ORDER),
+}
+
+# Modules that generate load against the target and take minutes to run
+HEAVY_MODULES = {ScanModule.performance}
+
+LIGHT_QUEUE = "light"
+HEAVY_QUEUE = "heavy"
+
+
+def resolve_modules(profile: ScanProfile, modules: list[ScanModule] | None = None) -> list[str]:
+    """Return the module names to run, in canonical order.
+
+    An explicit module list always wins (the profile is then ``custom``).
+    """
+    if modules:
+        selected = set(modules)
+    else:
+        selected = set(PROFILE_MODULES.get(profile, MODULE_ORDER))
+    return [module.value for module in MODULE_ORDER if module in selected]
+
+
+def queue_for_module(module: str) -> str:
+    """Pick the Celery queue for a module task so light probes never wait behind load tests."""
+    if ScanModule(module) in HEAVY_MODULES:
+        return HEAVY_QUEUE
+    return LIGHT_QUEUE
@@ -0,0 +1,234 @@
+"""Fair-share admission scheduler in front of the scan workers.
+
+Submissions pass two per-user token buckets (scans, and load-test
+user-seconds) and are then queued with weighted fair queuing: every scan
+gets a virtual finish tag ``max(vtime, user's last finish) + cost / weight``
+and the dispatcher always starts the pending scan with the smallest tag.
+A user submitting 500 scans therefore only delays other users by their
+fair share, while the workers stay busy up to ``SCHED_MAX_INFLIGHT_SCANS``.
+
+All state lives in Redis and every mutation is a single Lua script, so the
+API replicas and the periodic dispatcher can run concurrently.
+"""
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from typing import Any
+
+from app.config import settings
+from app.core.redis import get_redis
+from app.scanners.performance_scanner import LOAD_TIERS
+from app.services.scan_profiles import HEAVY_MODULES
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "sched:pending"      # zset scan_id -> finish tag
+RUNNING_KEY = "sched:running"      # zset scan_id -> dispatch time
+VTIME_KEY = "sched:vtime"          # system virtual time
+COST_KEY = "sched:cost"            # hash scan_id -> estimated seconds
+START_KEY = "sched:start"          # hash scan_id -> start tag
+WEIGHT_KEY = "sched:weight"        # hash user_id -> weight (default 1)
+
+# A dispatched scan older than this no longer holds a slot (crashed worker)
+RUNNING_STALE_SECONDS = 2 * 60 * 60
+
+# Rough wall-clock estimate per module, used as the WFQ cost and for ETAs
+LIGHT_MODULE_SECONDS = 15
+LOAD_TEST_SECONDS = sum(tier["duration"] for tier in LOAD_TIERS)
+LOAD_TEST_USER_SECONDS = sum(tier["users"] * tier["duration"] for tier in LOAD_TIERS)
+
+# Check every bucket first, then charge all of them, so a denial costs nothing.
+# KEYS: bucket keys; ARGV: now, then (capacity, refill_per_second, cost) per bucket
+_TOKEN_BUCKETS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local state = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local cap = tonumber(ARGV[2 + (i - 1) * 3])
+    local rate = tonumber(ARGV[3 + (i - 1) * 3])
+    local cost = tonumber(ARGV[4 + (i - 1) * 3])
+    local b = redis.call('hmget', key, 'tokens', 'ts')
+    local tokens = tonumber(b[1]) or cap
+    local ts = tonumber(b[2]) or now
+    tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+    state[i] = {tokens, cap, rate, cost}
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local tokens, cap, rate, cost = unpack(state[i])
+    if wait == 0 then tokens = tokens - cost end
+    redis.call('hset', key, 'tokens', tokens, 'ts', now)
+    redis.call('expire', key, math.ceil(cap / rate) + 60)
+end
+if wait == 0 then return {1, '0'} end
+return {0, tostring(wait)}
+"""
+
+# KEYS: pending, vtime, user finish, cost, start; ARGV: scan_id, cost, weight
+_ENQUEUE_SCRIPT = """
+local vtime = tonumber(redis.call('get', KEYS[2]) or '0')
+local last = tonumber(redis.call('get', KEYS[3]) or '0')
+local start = math.max(vtime, last)
+local finish = start + tonumber(ARGV[2]) / tonumber(ARGV[3])
+redis.call('set', KEYS[3], tostring(finish), 'EX', 86400)
+redis.call('zadd', KEYS[1], finish, ARGV[1])
+redis.call('hset', KEYS[4], ARGV[1], ARGV[2])
+redis.call('hset', KEYS[5], ARGV[1], tostring(start))
+return tostring(finish)
+"""
+
+# KEYS: pending, running, vtime, cost, start; ARGV: now, max_inflight, stale_before
+_DISPATCH_SCRIPT = """
+redis.call('zremrangebyscore', KEYS[2], '-inf', ARGV[3])
+local free = tonumber(ARGV[2]) - redis.call('zcard', KEYS[2])
+local out = {}
+while free > 0 do
+    local head = redis.call('zpopmin', KEYS[1])
+    if #head == 0 then break end
+    local scan_id = head[1]
+    local start = tonumber(redis.call('hget', KEYS[5], scan_id) or '0')
+    local vtime = tonumber(redis.call('get', KEYS[3]) or '0')
+    if start > vtime then redis.call('set', KEYS[3], tostring(start)) end
+    redis.call('hdel', KEYS[4], scan_id)
+    redis.call('hdel', KEYS[5], scan_id)
+    redis.call('zadd', KEYS[2], ARGV[1], scan_id)
+    table.insert(out, scan_id)
+    free = free - 1
+end
+return out
+"""
+
+
+class QuotaExceeded(Exception):
+    """Raised when a user's token bucket cannot cover a new scan."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Scan quota exceeded, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def estimate_cost(modules: list[str]) -> int:
+    """Estimated worker seconds for a scan with the given modules."""
+    return sum(LOAD_TEST_SECONDS if module in HEAVY_MODULES else LIGHT_MODULE_SECONDS for module in modules)
+
+
+async def admit(user_id: uuid.UUID, modules: list[str], count: int = 1) -> None:
+    """Charge the user's scan and load-test buckets for *count* scans.
+
+    Raises:
+        QuotaExceeded: with the number of seconds until the buckets can cover them.
+    """
+    client = await get_redis()
+    keys = [f"sched:bucket:scans:{user_id}"]
+    args: list[Any] = [
+        time.time(),
+        settings.SCHED_SCAN_BURST, settings.SCHED_SCANS_PER_HOUR / 3600, count,
+    ]
+    if any(module in HEAVY_MODULES for module in modules):
+        keys.append(f"sched:bucket:load:{user_id}")
+        args += [
+            settings.SCHED_LOAD_USER_SECONDS_BURST,
+            settings.SCHED_LOAD_USER_SECONDS_PER_HOUR / 3600,
+            LOAD_TEST_USER_SECONDS * count,
+        ]
+    allowed, wait = await client.eval(_TOKEN_BUCKETS_SCRIPT, len(keys), *keys, *args)
+    if not int(allowed):
+        raise QuotaExceeded(float(wait))
+
+
+async def admit_bulk(user_id: uuid.UUID, count: int) -> None:
+    """Charge the user's bulk bucket for a batch of *count* scans.
+
+    Batches are metered separately from single scans so one upload does not
+    need a per-scan burst large enough to cover it; fairness towards other
+    users still comes from the fair queue.
+
+    Raises:
+        QuotaExceeded: with the number of seconds until the bucket can cover the batch.
+    """
+    client = await get_redis()
+    allowed, wait = await client.eval(
+        _TOKEN_BUCKETS_SCRIPT, 1, f"sched:bucket:bulk:{user_id}",
+        time.time(), settings.SCHED_BULK_MAX_URLS, settings.SCHED_BULK_URLS_PER_HOUR / 3600, count,
+    )
+    if not int(allowed):
+        raise QuotaExceeded(float(wait))
+
+
+async def admit_bulk_dns(user_id: uuid.UUID, count: int) -> None:
+    """Charge the user's bulk DNS bucket for a run over *count* hostnames.
+
+    Raises:
+        QuotaExceeded: with the number of seconds until the bucket can cover the run.
+    """
+    client = await get_redis()
+    allowed, wait = await client.eval(
+        _TOKEN_BUCKETS_SCRIPT, 1, f"sched:bucket:dns:{user_id}",
+        time.time(), settings.BULK_DNS_HOSTS_BURST, settings.BULK_DNS_HOSTS_PER_HOUR / 3600, count,
+    )
+    if not int(allowed):
+        raise QuotaExceeded(float(wait))
+
+
+async def enqueue(user_id: uuid.UUID, scan_id: uuid.UUID, modules: list[str]) -> None:
+    """Queue an admitted scan for fair dispatch."""
+    client = await get_redis()
+    weight = float(await client.hget(WEIGHT_KEY, str(user_id)) or 1)
+    await client.eval(
+        _ENQUEUE_SCRIPT, 5,
+        PENDING_KEY, VTIME_KEY, f"sched:finish:{user_id}", COST_KEY, START_KEY,
+        str(scan_id), estimate_cost(modules), weight,
+    )
+
+
+async def enqueue_many(user_id: uuid.UUID, scan_ids: list[uuid.UUID], modules: list[str]) -> None:
+    """Queue many admitted scans of one user, pipelined in a single round trip per chunk."""
+    client = await get_redis()
+    weight = float(await client.hget(WEIGHT_KEY, str(user_id)) or 1)
+    cost = estimate_cost(modules)
+    keys = [PENDING_KEY, VTIME_KEY, f"sched:finish:{user_id}", COST_KEY, START_KEY]
+    for offset in range(0, len(scan_ids), 500):
+        pipe = client.pipeline(transaction=False)
+        for scan_id in scan_ids[offset:offset + 500]:
+            pipe.eval(_ENQUEUE_SCRIPT, 5, *keys, str(scan_id), cost, weight)
+        await pipe.execute()
+
+
+async def dispatch_ready() -> list[str]:
+    """Pop as many pending scans as there are free worker slots, in fair order.
+
+    The caller is responsible for actually starting the returned scans.
+    """
+    client = await get_redis()
+    now = time.time()
+    return await client.eval(
+        _DISPATCH_SCRIPT, 5,
+        PENDING_KEY, RUNNING_KEY, VTIME_KEY, COST_KEY, START_KEY,
+        now, settings.SCHED_MAX_INFLIGHT_SCANS, now - RUNNING_STALE_SECONDS,
+    )
+
+
+async def release(scan_id: uuid.UUID | str) -> None:
+    """Free the worker slot held by a finished scan."""
+    client = await get_redis()
+    await client.zrem(RUNNING_KEY, str(scan_id))
+
+
+async def queue_status(scan_id: uuid.UUID | str) -> dict[str, Any]:
+    """Return the queue position and an ETA to start for a scan."""
+    client = await get_redis()
+    scan_id = str(scan_id)
+    rank = await client.zrank(PENDING_KEY, scan_id)
+    if rank is None:
+        running = await client.zscore(RUNNING_KEY, scan_id)
+        return {"state": "running" if running is not None else "not_queued", "position": None, "eta_seconds": None}
+
+    ahead = await client.zrange(PENDING_KEY, 0, rank - 1) if rank else []
+    costs = await client.hmget(COST_KEY, ahead) if ahead else []
+    work_ahead = sum(float(cost or LIGHT_MODULE_SECONDS) for cost in costs)
+    eta = work_ahead / max(settings.SCHED_MAX_INFLIGHT_SCANS, 1)
+    return {"state": "queued", "position": rank + 1, "eta_seconds": round(eta)}
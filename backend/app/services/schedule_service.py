@@ -0,0 +1,216 @@
+"""Recurring scans — start due schedules and diff each run against the previous one.
+
+Every schedule gets a fixed start offset inside its jitter window, derived
+from its ID, so a thousand nightly schedules created at the same minute are
+spread over the window instead of hitting the workers (and their targets)
+at once, and each one still runs at a stable time of day.
+
+Scheduled scans take the normal incremental path: unchanged module inputs
+are served from the result cache or carried over from the previous run.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import incr_counter
+from app.models.scan import Scan, ScanStatus
+from app.models.scan_result import ScanResult
+from app.models.scan_schedule import ScanChange, ScanSchedule
+from app.services import scan_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Schedules started per dispatcher pass; the rest wait for the next pass
+DUE_BATCH_SIZE = 500
+DEFAULT_MAX_JITTER = timedelta(hours=1)
+ISSUE_SEVERITIES = ("critical", "high", "medium", "low")
+
+
+# ── timing ──
+
+def default_jitter_seconds(interval_seconds: int) -> int:
+    return int(min(interval_seconds / 10, DEFAULT_MAX_JITTER.total_seconds()))
+
+
+def _offset(schedule: ScanSchedule) -> timedelta:
+    """Stable per-schedule offset inside the jitter window."""
+    if schedule.jitter_seconds <= 0:
+        return timedelta(0)
+    digest = int(hashlib.sha1(schedule.id.bytes).hexdigest()[:8], 16)
+    return timedelta(seconds=digest % schedule.jitter_seconds)
+
+
+def first_run_at(schedule: ScanSchedule, start_at: datetime | None = None) -> datetime:
+    return (start_at or datetime.now(timezone.utc)) + _offset(schedule)
+
+
+def advance(schedule: ScanSchedule, now: datetime) -> None:
+    """Move ``next_run_at`` to the first slot after *now*, skipping missed slots.
+
+    A pending quota retry belonged to the slot being left, so it is dropped.
+    """
+    schedule.retry_at = None
+    offset = _offset(schedule)
+    interval = timedelta(seconds=schedule.interval_seconds)
+    slot = schedule.next_run_at - offset
+    if slot + offset <= now:
+        missed = (now - slot - offset) // interval + 1
+        slot += interval * missed
+    schedule.next_run_at = slot + offset
+
+
+# ── dispatch ──
+
+async def start_due_schedules(db: AsyncSession) -> int:
+    """Create and queue a scan for every schedule that is due.
+
+    Rows are locked with ``SKIP LOCKED``, so several beat or worker processes
+    can run this concurrently without starting a schedule twice.  A schedule
+    whose previous scan is still pending or running skips this slot; one the
+    admission quota refuses is retried once the quota allows, and its
+    following runs stay on its slot grid.
+
+    Returns:
+        The number of scans queued.
+    """
+    now = datetime.now(timezone.utc)
+    statement = (
+        select(ScanSchedule)
+        .where(
+            ScanSchedule.enabled.is_(True),
+            ScanSchedule.next_run_at <= now,
+            or_(ScanSchedule.retry_at.is_(None), ScanSchedule.retry_at <= now),
+        )
+        .order_by(ScanSchedule.next_run_at)
+        .limit(DUE_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    schedules = (await db.execute(statement)).scalars().all()
+    if not schedules:
+        return 0
+
+    last_ids = [s.last_scan_id for s in schedules if s.last_scan_id]
+    busy: set[uuid.UUID] = set()
+    if last_ids:
+        rows = await db.execute(
+            select(Scan.id).where(
+                Scan.id.in_(last_ids),
+                Scan.status.in_((ScanStatus.pending, ScanStatus.running)),
+            )
+        )
+        busy = set(rows.scalars().all())
+
+    queued: list[tuple[uuid.UUID, uuid.UUID, list[str]]] = []
+    for schedule in schedules:
+        if schedule.last_scan_id in busy:
+            logger.info("Schedule %s skipped a slot: previous scan still running", schedule.id)
+            advance(schedule, now)
+            continue
+        try:
+            await scan_scheduler.admit(schedule.user_id, schedule.modules)
+        except scan_scheduler.QuotaExceeded as exc:
+            # next_run_at stays on the slot, so advance() finds the grid again after the retry
+            schedule.retry_at = now + timedelta(seconds=exc.retry_after)
+            continue
+
+        scan = Scan(
+            id=uuid.uuid4(),
+            user_id=schedule.user_id,
+            url=schedule.url,
+            normalized_url=schedule.normalized_url,
+            schedule_id=schedule.id,
+            profile=schedule.profile,
+            modules=schedule.modules,
+        )
+        db.add(scan)
+        schedule.last_scan_id = scan.id
+        schedule.last_run_at = now
+        advance(schedule, now)
+        queued.append((schedule.user_id, scan.id, schedule.modules))
+    await db.commit()
+
+    # Queue only once committed, so the dispatcher never starts a scan the workers can't see
+    for user_id, scan_id, modules in queued:
+        await scan_scheduler.enqueue(user_id, scan_id, modules)
+    return len(queued)
+
+
+# ── change detection ──
+
+def _issues(result: ScanResult) -> dict[str, int]:
+    return {severity: getattr(result, f"issues_{severity}") for severity in ISSUE_SEVERITIES}
+
+
+def compute_diff(
+    previous_score: int | None,
+    current_score: int | None,
+    previous: dict[str, ScanResult],
+    current: dict[str, ScanResult],
+) -> dict[str, Any]:
+    """Return only what moved between two runs; an empty dict means no change.
+
+    Values are ``[old, new]`` pairs; a module missing from one run scores ``None``.
+    """
+    diff: dict[str, Any] = {}
+    if previous_score != current_score:
+        diff["overall_score"] = [previous_score, current_score]
+
+    modules: dict[str, Any] = {}
+    for module in sorted(set(previous) | set(current)):
+        old, new = previous.get(module), current.get(module)
+        if old is None or new is None:
+            modules[module] = {"score": [old.score if old else None, new.score if new else None]}
+            continue
+        entry: dict[str, Any] = {}
+        if old.score != new.score:
+            entry["score"] = [old.score, new.score]
+        old_issues, new_issues = _issues(old), _issues(new)
+        issues = {s: [old_issues[s], new_issues[s]] for s in ISSUE_SEVERITIES if old_issues[s] != new_issues[s]}
+        if issues:
+            entry["issues"] = issues
+        if entry:
+            modules[module] = entry
+    if modules:
+        diff["modules"] = modules
+    return diff
+
+
+async def record_run(db: AsyncSession, scan: Scan) -> ScanChange | None:
+    """Diff a completed scheduled scan against the schedule's previous completed run.
+
+    Stores a ScanChange only when something moved and makes *scan* the new
+    baseline.  Safe to call twice for the same scan.
+    """
+    schedule = await db.get(ScanSchedule, scan.schedule_id)
+    if schedule is None or schedule.baseline_scan_id == scan.id:
+        return None
+
+    previous_id = schedule.baseline_scan_id
+    schedule.baseline_scan_id = scan.id
+    change: ScanChange | None = None
+    if previous_id is not None:
+        previous_scan = await db.get(Scan, previous_id)
+        rows = await db.execute(select(ScanResult).where(ScanResult.scan_id.in_((previous_id, scan.id))))
+        by_scan: dict[uuid.UUID, dict[str, ScanResult]] = {previous_id: {}, scan.id: {}}
+        for result in rows.scalars().all():
+            by_scan[result.scan_id][result.module.value] = result
+
+        diff = compute_diff(
+            previous_scan.overall_score if previous_scan else None,
+            scan.overall_score,
+            by_scan[previous_id],
+            by_scan[scan.id],
+        )
+        if diff:
+            change = ScanChange(schedule_id=schedule.id, scan_id=scan.id, previous_scan_id=previous_id, diff=diff)
+            db.add(change)
+        await incr_counter(f"schedule.{'changed' if diff else 'unchanged'}")
+    await db.commit()
+    return change
@@ -0,0 +1,17 @@
+"""Helpers for scan event IDs (Redis Stream entry IDs, ``<millis>-<seq>``)."""
+from __future__ import annotations
+
+
+def parse_event_id(event_id: str) -> tuple[int, int]:
+    millis, _, seq = event_id.partition("-")
+    return int(millis), int(seq or 0)
+
+
+def is_after(event_id: str | None, after: str | None) -> bool:
+    """True if *event_id* comes after *after* (events without an ID always pass)."""
+    if event_id is None or after is None:
+        return True
+    try:
+        return parse_event_id(event_id) > parse_event_id(after)
+    except ValueError:
+        return True
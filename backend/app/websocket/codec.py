@@ -0,0 +1,156 @@
+"""Wire encodings of live scan events.
+
+JSON text frames are the default.  Clients that offer the
+``webpulse.msgpack.v1`` WebSocket subprotocol (or pass ``?encoding=msgpack``)
+get binary msgpack frames in a schema-keyed layout instead: an event of a
+known type is an array ``[type_code, field, field, ...]`` in the field order
+of ``SCHEMAS`` (plus a trailing map of any fields outside the schema), and
+timestamps are integer milliseconds since the epoch.  Events of unknown types
+stay maps.  The first frame of a msgpack connection is the schema table, so
+clients do not have to hard-code it.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any
+
+import msgpack
+
+JSON = "json"
+MSGPACK = "msgpack"
+MSGPACK_SUBPROTOCOL = "webpulse.msgpack.v1"
+SCHEMA_VERSION = 1
+
+# Field order per event type; a type's code is its position in this table
+SCHEMAS: dict[str, tuple[str, ...]] = {
+    "log": ("event_id", "phase", "level", "message", "timestamp"),
+    "log_batch": ("event_id", "phase", "entries"),
+    "progress": ("event_id", "phase", "progress_percent", "message", "timestamp", "live_metrics"),
+    "phase_change": ("event_id", "phase", "phase_index", "total_phases", "status"),
+    "module_complete": ("event_id", "phase", "score", "grade", "issues_count", "carried_over"),
+    "scan_complete": ("event_id", "overall_score", "duration_seconds", "report_generating"),
+    "queue": ("event_id", "phase", "position", "message"),
+    "changed": ("event_id", "schedule_id", "previous_scan_id", "diff"),
+    "frames_dropped": ("count",),
+    "ping": ("t",),
+}
+# Nested objects with a fixed set of keys, sent as arrays too
+NESTED_SCHEMAS: dict[str, tuple[str, ...]] = {
+    "live_metrics": ("active_users", "total_requests", "avg_response_time", "p50", "p95", "throughput", "error_rate"),
+}
+TYPE_CODES = {event_type: code for code, event_type in enumerate(SCHEMAS)}
+TIMESTAMP_FIELDS = {"timestamp"}
+
+
+def negotiate(subprotocols: list[str], requested: str | None = None) -> tuple[str, str | None]:
+    """Pick the encoding of a WebSocket connection.
+
+    Args:
+        subprotocols: Subprotocols offered by the client.
+        requested: The ``encoding`` query parameter, if any.
+
+    Returns:
+        (encoding, subprotocol to accept)
+    """
+    if MSGPACK_SUBPROTOCOL in subprotocols:
+        return MSGPACK, MSGPACK_SUBPROTOCOL
+    if requested == MSGPACK:
+        return MSGPACK, None
+    return JSON, None
+
+
+def _epoch_ms(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+    except ValueError:
+        return value
+
+
+def _pack_value(field: str, value: Any) -> Any:
+    if field in TIMESTAMP_FIELDS:
+        return _epoch_ms(value)
+    if field == "entries" and isinstance(value, list):
+        return [_layout(entry) for entry in value]
+    nested = NESTED_SCHEMAS.get(field)
+    if nested and isinstance(value, dict):
+        if not value:
+            return None
+        if value.keys() <= set(nested):
+            return [value.get(key) for key in nested]
+    return value
+
+
+def _layout(event: dict[str, Any]) -> Any:
+    code = TYPE_CODES.get(event.get("type"))
+    if code is None:
+        return {key: _pack_value(key, value) for key, value in event.items()}
+    fields = SCHEMAS[event["type"]]
+    row = [code, *(_pack_value(field, event.get(field)) for field in fields)]
+    extra = {key: value for key, value in event.items() if key != "type" and key not in fields}
+    if extra:
+        row.append({key: _pack_value(key, value) for key, value in extra.items()})
+    return row
+
+
+def encode(event: dict[str, Any], encoding: str = JSON) -> str | bytes:
+    """Encode an event as a text (JSON) or binary (msgpack) frame."""
+    if encoding == MSGPACK:
+        return msgpack.packb(_layout(event), default=str)
+    return json.dumps(event, default=str)
+
+
+def schema_frame() -> bytes:
+    """The frame that opens a msgpack connection: the layout of every event type."""
+    return msgpack.packb({
+        "type": "schema",
+        "version": SCHEMA_VERSION,
+        "types": {event_type: [TYPE_CODES[event_type], list(fields)] for event_type, fields in SCHEMAS.items()},
+        "nested": {field: list(keys) for field, keys in NESTED_SCHEMAS.items()},
+    })
+
+
+def _unpack_value(field: str, value: Any) -> Any:
+    if field == "entries" and isinstance(value, list):
+        return [_restore(entry) for entry in value]
+    nested = NESTED_SCHEMAS.get(field)
+    if nested and isinstance(value, list):
+        return dict(zip(nested, value))
+    if nested and value is None:
+        return {}
+    return value
+
+
+def _restore(row: Any) -> dict[str, Any]:
+    if isinstance(row, dict):
+        return row
+    event_type = list(SCHEMAS)[row[0]]
+    fields = SCHEMAS[event_type]
+    event = {"type": event_type}
+    for field, value in zip(fields, row[1:]):
+        if value is not None:
+            event[field] = _unpack_value(field, value)
+    if len(row) > len(fields) + 1:
+        event.update(row[-1])
+    return event
+
+
+def decode_msgpack(payload: bytes) -> dict[str, Any]:
+    """Decode a msgpack frame back into an event (timestamps stay integers)."""
+    return _restore(msgpack.unpackb(payload))
+
+
+def decode_client_frame(message: dict[str, Any]) -> dict[str, Any] | None:
+    """Decode a frame sent by a client (a JSON or msgpack map); None if it is not one."""
+    try:
+        if message.get("text") is not None:
+            frame = json.loads(message["text"])
+        elif message.get("bytes") is not None:
+            frame = msgpack.unpackb(message["bytes"])
+        else:
+            return None
+    except (ValueError, msgpack.UnpackException):
+        return None
+    return frame if isinstance(frame, dict) else None
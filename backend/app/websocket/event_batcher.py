@@ -0,0 +1,101 @@
+"""Publisher-side framing of live scan events.
+
+Scanners report every record and check as its own log line, and some report
+progress many times a second.  Publishing each of them is one Redis round
+trip on the worker and one frame per client on every API replica, so the
+batcher collects log lines for a short window and publishes them as a single
+``log_batch`` frame, and keeps only the latest progress snapshot per phase
+within the window.  Any other event flushes the window first, so the order
+of logs relative to phase changes and results is preserved.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from app.config import settings
+from app.core.metrics import incr_counter
+
+logger = logging.getLogger(__name__)
+
+# Event types where only the latest one per phase in a window is published
+MERGEABLE_TYPES = {"progress"}
+
+Publish = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class EventBatcher:
+    """Buffers a scan's log lines and progress snapshots and publishes them as frames."""
+
+    def __init__(self, publish: Publish, interval_ms: int | None = None) -> None:
+        self._publish = publish
+        self.interval = (settings.EVENT_LOG_FRAME_MS if interval_ms is None else interval_ms) / 1000
+        self._lines: list[dict[str, Any]] = []
+        self._snapshots: dict[Any, dict[str, Any]] = {}
+        self._timer: asyncio.Task | None = None
+        # Publishes go out one at a time so frames reach the bus in order
+        self._lock = asyncio.Lock()
+        self.lines = 0
+        self.frames = 0
+        self.merged = 0
+
+    async def emit(self, event: dict[str, Any]) -> None:
+        """Queue or publish one event."""
+        event_type = event.get("type")
+        if event_type == "log":
+            self._lines.append(event)
+            self.lines += 1
+        elif event_type in MERGEABLE_TYPES:
+            if event.get("phase") in self._snapshots:
+                self.merged += 1
+            self._snapshots[event.get("phase")] = event
+        else:
+            async with self._lock:
+                await self._flush()
+                await self._send(event)
+            return
+
+        if self.interval <= 0:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Publish everything buffered so far."""
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        lines, self._lines = self._lines, []
+        snapshots, self._snapshots = self._snapshots, {}
+
+        if len(lines) == 1:
+            await self._send(lines[0])
+        elif lines:
+            await self._send({"type": "log_batch", "phase": lines[-1].get("phase"), "entries": lines})
+        for snapshot in snapshots.values():
+            await self._send(snapshot)
+
+    async def _send(self, event: dict[str, Any]) -> None:
+        self.frames += 1
+        await self._publish(event)
+
+    async def close(self) -> None:
+        """Flush and record how much batching saved."""
+        await self.flush()
+        if self.lines:
+            await incr_counter("events.log_lines", self.lines)
+        if self.merged:
+            await incr_counter("events.progress_merged", self.merged)
+        if self.frames:
+            await incr_counter("events.frames_published", self.frames)
+        self.lines = self.frames = self.merged = 0
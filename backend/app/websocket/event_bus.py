@@ -0,0 +1,154 @@
+"""Cross-process scan event bus over Redis pub/sub.
+
+Scans run in worker processes while WebSocket clients are connected to
+whichever API replica they reached, so events cannot be delivered in-process.
+Workers publish every event on ``scan_events:{scan_id}``; each API replica
+subscribes only to the scans its own clients are watching and forwards the
+events to them.  Adding API replicas therefore adds no per-event work on the
+others.
+
+Every event is also appended to a bounded per-scan Redis Stream
+(``scan_log:{scan_id}``) in the same script, and carries the stream entry ID
+as ``event_id``, so clients that connect late or reconnect can replay what
+they missed (see app.services.event_log).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio.client import PubSub
+
+from app.core.redis import get_redis
+from app.websocket.manager import ws_manager
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "scan_events:"
+LOG_PREFIX = "scan_log:"
+RECONNECT_DELAY_SECONDS = 1.0
+# Events kept per scan for replay; older ones are trimmed
+LOG_MAXLEN = 2000
+# Logs of scans that never finish (crashed worker) expire on their own
+LOG_TTL_SECONDS = 24 * 60 * 60
+
+# Append to the scan's log, then publish the event with its log ID spliced in
+# as the first key, so subscribers get the same ID a replay would.
+# KEYS: log, channel; ARGV: event JSON object, maxlen, ttl
+_PUBLISH_SCRIPT = """
+local id = redis.call('xadd', KEYS[1], 'MAXLEN', '~', ARGV[2], '*', 'e', ARGV[1])
+redis.call('expire', KEYS[1], ARGV[3])
+redis.call('publish', KEYS[2], '{"event_id":"' .. id .. '",' .. string.sub(ARGV[1], 2))
+return id
+"""
+
+Deliver = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+
+def channel_for(scan_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{scan_id}"
+
+
+def log_key(scan_id: str) -> str:
+    return f"{LOG_PREFIX}{scan_id}"
+
+
+async def publish_event(scan_id: str, event: dict[str, Any]) -> str:
+    """Record a scan event in its log and publish it to every API replica watching the scan.
+
+    Returns:
+        The event ID.
+    """
+    client = await get_redis()
+    return await client.eval(
+        _PUBLISH_SCRIPT, 2, log_key(scan_id), channel_for(scan_id),
+        json.dumps(event, default=str), LOG_MAXLEN, LOG_TTL_SECONDS,
+    )
+
+
+class EventBusListener:
+    """Subscribes to the scans watched by local clients and hands their events to *deliver*.
+
+    Subscriptions are reference counted per scan.  If the Redis connection
+    drops, the listener reconnects and re-subscribes to every watched scan.
+    """
+
+    def __init__(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._watchers: dict[str, int] = {}
+        self._pubsub: PubSub | None = None
+        self._task: asyncio.Task | None = None
+        self._has_watchers = asyncio.Event()
+
+    async def start(self) -> None:
+        client = await get_redis()
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def watch(self, scan_id: str) -> None:
+        """Start receiving events for *scan_id* (one call per local subscriber)."""
+        self._watchers[scan_id] = self._watchers.get(scan_id, 0) + 1
+        if self._watchers[scan_id] == 1 and self._pubsub is not None:
+            await self._pubsub.subscribe(channel_for(scan_id))
+        self._has_watchers.set()
+
+    async def unwatch(self, scan_id: str) -> None:
+        """Drop one local subscriber of *scan_id*; unsubscribes after the last one."""
+        count = self._watchers.get(scan_id, 0) - 1
+        if count > 0:
+            self._watchers[scan_id] = count
+            return
+        self._watchers.pop(scan_id, None)
+        if not self._watchers:
+            self._has_watchers.clear()
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(channel_for(scan_id))
+            except Exception as exc:
+                logger.warning("Failed to unsubscribe from scan %s: %s", scan_id, exc)
+
+    @property
+    def watched_scans(self) -> int:
+        return len(self._watchers)
+
+    async def _resubscribe(self) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        client = await get_redis()
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        if self._watchers:
+            await self._pubsub.subscribe(*(channel_for(scan_id) for scan_id in self._watchers))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._has_watchers.wait()
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is None or message.get("type") != "message":
+                    continue
+                scan_id = message["channel"][len(CHANNEL_PREFIX):]
+                await self._deliver(scan_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Scan event bus error, reconnecting: %s", exc)
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                try:
+                    await self._resubscribe()
+                except Exception as exc:
+                    logger.warning("Scan event bus reconnect failed: %s", exc)
+
+
+# Global listener of this API process (started in the app lifespan)
+event_bus = EventBusListener(ws_manager.send_to_scan)
@@ -1,68 +1,325 @@
 """WebSocket connection manager for real-time scan updates."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import statistics
+import time
+from collections import deque
 from typing import Any
 
 from fastapi import WebSocket
 
+from app.core.metrics import incr_counter
+from app.utils.event_ids import is_after
+from app.websocket.codec import JSON, encode
+
 logger = logging.getLogger(__name__)
 
+# A client that cannot take a message within this time is considered stuck
+SEND_TIMEOUT_SECONDS = 2.0
+# Frames queued per client before the oldest droppable ones are discarded
+OUTBOX_SIZE = 256
+# Close code sent to evicted slow consumers (1013: try again later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Frames a lagging client can lose without losing state: logs are informative
+# and every progress snapshot supersedes the previous one
+DROPPABLE_TYPES = {"log", "log_batch", "progress"}
+# Frames where only the latest unsent one per phase is worth sending
+MERGEABLE_TYPES = {"progress", "ping"}
 
-class ConnectionManager:
-    """Manages WebSocket connections keyed by scan_id.
 
-    Each scan can have one active WebSocket connection at a time.
-    Messages are sent as JSON payloads.
+async def send_frame(websocket: WebSocket, payload: str | bytes) -> None:
+    """Send an encoded event as a text or binary frame."""
+    if isinstance(payload, bytes):
+        await websocket.send_bytes(payload)
+    else:
+        await websocket.send_text(payload)
+
+
+class _Outbox:
+    """Bounded send queue of one client, drained by its own writer task.
+
+    A progress snapshot supersedes an unsent one of the same phase.  When the
+    queue is full the oldest droppable frame is discarded, and the client is
+    told how many it missed so it can resume from the replay log.
     """
 
-    def __init__(self) -> None:
-        self._connections: dict[str, WebSocket] = {}
+    def __init__(self, manager: ConnectionManager, scan_id: str, websocket: WebSocket, held: bool, encoding: str) -> None:
+        self.manager = manager
+        self.scan_id = scan_id
+        self.websocket = websocket
+        self.held = held
+        self.encoding = encoding
+        # [data, payload] cells, oldest first
+        self.frames: deque[list[Any]] = deque()
+        self._mergeable: dict[tuple[Any, Any], list[Any]] = {}
+        self._ready = asyncio.Event()
+        self._unreported_drops = 0
+        self._sending = False
+        self.closed = False
+        self.dropped = 0
+        self.merged = 0
+        self.connected_at = time.monotonic()
+        # Round trip of the latest answered ping, in milliseconds
+        self.rtt_ms: float | None = None
+        self.task = asyncio.create_task(self._write())
 
-    async def connect(self, scan_id: str, websocket: WebSocket) -> None:
-        """Accept and register a WebSocket connection for a scan."""
-        await websocket.accept()
-        self._connections[scan_id] = websocket
-        logger.info("WebSocket connected for scan %s", scan_id)
+    @staticmethod
+    def _key(data: dict[str, Any]) -> tuple[Any, Any]:
+        return data.get("type"), data.get("phase")
 
-    def disconnect(self, scan_id: str) -> None:
-        """Remove a WebSocket connection for a scan."""
-        self._connections.pop(scan_id, None)
-        logger.info("WebSocket disconnected for scan %s", scan_id)
+    def put(self, data: dict[str, Any], payload: str | bytes) -> bool:
+        """Queue a frame; returns False if the client is too far behind to keep."""
+        key = self._key(data)
+        superseded = self._mergeable.get(key)
+        if superseded is not None:
+            # Moved to the tail rather than overwritten, so event IDs stay in order
+            self._remove(superseded)
+            self.merged += 1
+        elif len(self.frames) >= self.manager.outbox_size and not self._drop_oldest():
+            return False
+        cell = [data, payload]
+        self.frames.append(cell)
+        if key[0] in MERGEABLE_TYPES:
+            self._mergeable[key] = cell
+        if not self.held:
+            self._ready.set()
+        return True
 
-    async def send_to_scan(self, scan_id: str, data: dict[str, Any]) -> None:
-        """Send a JSON message to the WebSocket associated with a scan.
+    def _drop_oldest(self) -> bool:
+        for cell in self.frames:
+            if cell[0].get("type") in DROPPABLE_TYPES:
+                self._remove(cell)
+                self.dropped += 1
+                self._unreported_drops += 1
+                return True
+        return False
+
+    def _remove(self, cell: list[Any]) -> None:
+        self.frames.remove(cell)
+        if self._mergeable.get(self._key(cell[0])) is cell:
+            del self._mergeable[self._key(cell[0])]
+
+    def release(self, after: str | None) -> None:
+        """Discard frames the replay already covered and start sending."""
+        for cell in [cell for cell in self.frames if not is_after(cell[0].get("event_id"), after)]:
+            self._remove(cell)
+        self.held = False
+        if self.frames:
+            self._ready.set()
 
-        Silently disconnects if the send fails (client gone).
+    async def _send(self, payload: str | bytes) -> None:
+        await asyncio.wait_for(send_frame(self.websocket, payload), timeout=self.manager.send_timeout)
+
+    def close(self) -> None:
+        """Stop the writer task.
+
+        The flag ends its loop even when ``wait_for`` swallows the cancellation
+        (a send that completes as it is cancelled).
         """
-        websocket = self._connections.get(scan_id)
-        if websocket is None:
-            return
+        self.closed = True
+        self.task.cancel()
 
+    async def _write(self) -> None:
         try:
-            await websocket.send_json(data)
+            while not self.closed:
+                await self._ready.wait()
+                if self._unreported_drops:
+                    notice = {"type": "frames_dropped", "count": self._unreported_drops}
+                    self._unreported_drops = 0
+                    await self._send(encode(notice, self.encoding))
+                cell = self.frames[0]
+                self._remove(cell)
+                if not self.frames:
+                    self._ready.clear()
+                self._sending = True
+                await self._send(cell[1])
+                self._sending = False
+        except asyncio.CancelledError:
+            raise
         except Exception as exc:
-            logger.warning(
-                "Failed to send WebSocket message for scan %s: %s", scan_id, exc
+            await self.manager._evict(self, exc)
+
+    @property
+    def depth(self) -> int:
+        """Frames waiting to be sent."""
+        return len(self.frames) + self._sending
+
+    @property
+    def idle(self) -> bool:
+        return self.held or self.task.done() or not (self.frames or self._sending)
+
+
+class ConnectionManager:
+    """Manages WebSocket connections keyed by scan_id.
+
+    Any number of clients (tabs, teammates) can watch the same scan.  A
+    message is serialised once per wire format and queued for every client;
+    each client has a bounded outbox drained by its own writer task, so a
+    slow connection only ever falls behind itself.  A lagging client gets the latest
+    progress snapshot instead of every one, loses the oldest log frames
+    first, and is evicted if its send times out or its outbox fills up with
+    frames that cannot be dropped.
+    """
+
+    def __init__(self, send_timeout: float = SEND_TIMEOUT_SECONDS, outbox_size: int = OUTBOX_SIZE) -> None:
+        self._connections: dict[str, dict[WebSocket, _Outbox]] = {}
+        self.send_timeout = send_timeout
+        self.outbox_size = outbox_size
+        # Evictions, counter updates and cancelled writers still finishing in the background,
+        # referenced so they are not garbage-collected mid-flight
+        self._tasks: set[asyncio.Task] = set()
+
+    def _track(self, task: asyncio.Task) -> None:
+        if not task.done():
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _spawn(self, coro: Any) -> None:
+        self._track(asyncio.create_task(coro))
+
+    async def connect(self, scan_id: str, websocket: WebSocket, hold: bool = False, encoding: str = JSON) -> None:
+        """Register an accepted WebSocket connection for a scan.
+
+        With *hold*, live events are queued but not sent until ``release``, so
+        the caller can first replay earlier events without losing or
+        reordering any.  *encoding* is the wire format negotiated with the
+        client (see app.websocket.codec).
+        """
+        self._connections.setdefault(scan_id, {})[websocket] = _Outbox(self, scan_id, websocket, held=hold, encoding=encoding)
+        logger.info("WebSocket connected for scan %s (%d watching)", scan_id, len(self._connections[scan_id]))
+
+    async def release(self, scan_id: str, websocket: WebSocket, after: str | None) -> None:
+        """Send the events queued during replay that come after event *after*, then go live."""
+        outbox = self._outbox(scan_id, websocket)
+        if outbox is not None:
+            outbox.release(after)
+
+    def disconnect(self, scan_id: str, websocket: WebSocket) -> None:
+        """Remove one WebSocket connection of a scan."""
+        subscribers = self._connections.get(scan_id)
+        if subscribers is None:
+            return
+        outbox = subscribers.pop(websocket, None)
+        if not subscribers:
+            del self._connections[scan_id]
+        if outbox is None:
+            return
+        if outbox.task is not asyncio.current_task():
+            outbox.close()
+            # Kept until the cancellation has run, so close_all() can wait for it
+            self._track(outbox.task)
+        if outbox.dropped or outbox.merged:
+            logger.info(
+                "WebSocket for scan %s had %d frames dropped and %d merged",
+                scan_id, outbox.dropped, outbox.merged,
             )
-            self.disconnect(scan_id)
+            self._spawn(self._record_backpressure(outbox))
+        logger.info("WebSocket disconnected for scan %s", scan_id)
 
-    async def broadcast(self, data: dict[str, Any]) -> None:
-        """Send a JSON message to all connected WebSocket clients."""
-        disconnected: list[str] = []
-        for scan_id, websocket in self._connections.items():
+    @staticmethod
+    async def _record_backpressure(outbox: _Outbox) -> None:
+        if outbox.dropped:
+            await incr_counter("ws.frames_dropped", outbox.dropped)
+        if outbox.merged:
+            await incr_counter("ws.frames_merged", outbox.merged)
+
+    async def _evict(self, outbox: _Outbox, exc: Exception | None) -> None:
+        self.disconnect(outbox.scan_id, outbox.websocket)
+        if exc is None or isinstance(exc, asyncio.TimeoutError):
+            logger.warning("Evicting slow WebSocket consumer of scan %s", outbox.scan_id)
+            await incr_counter("ws.evicted_slow")
             try:
-                await websocket.send_json(data)
+                await asyncio.wait_for(outbox.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), timeout=self.send_timeout)
             except Exception:
-                disconnected.append(scan_id)
+                pass
+        else:
+            logger.warning("Failed to send WebSocket message for scan %s: %s", outbox.scan_id, exc)
+
+    def _fan_out(self, outboxes: list[_Outbox], data: dict[str, Any]) -> None:
+        # Encoded once per wire format, however many clients use it
+        payloads: dict[str, str | bytes] = {}
+        for outbox in outboxes:
+            payload = payloads.get(outbox.encoding)
+            if payload is None:
+                payload = payloads[outbox.encoding] = encode(data, outbox.encoding)
+            if not outbox.put(data, payload):
+                self.disconnect(outbox.scan_id, outbox.websocket)
+                self._spawn(self._evict(outbox, None))
+
+    async def send_to_scan(self, scan_id: str, data: dict[str, Any]) -> None:
+        """Queue a JSON message for every WebSocket watching a scan."""
+        self._fan_out(list(self._connections.get(scan_id, {}).values()), data)
+
+    async def broadcast(self, data: dict[str, Any]) -> None:
+        """Queue a JSON message for all connected WebSocket clients."""
+        self._fan_out([outbox for subscribers in self._connections.values() for outbox in subscribers.values()], data)
+
+    def _outbox(self, scan_id: str, websocket: WebSocket) -> _Outbox | None:
+        return self._connections.get(scan_id, {}).get(websocket)
+
+    def ping(self, scan_id: str, websocket: WebSocket) -> None:
+        """Queue a ping behind the client's pending frames; its pong measures the delivery latency."""
+        outbox = self._outbox(scan_id, websocket)
+        if outbox is not None:
+            self._fan_out([outbox], {"type": "ping", "t": int(time.time() * 1000)})
+
+    def record_pong(self, scan_id: str, websocket: WebSocket, sent_ms: Any) -> None:
+        """Store the round trip of a ping the client answered."""
+        outbox = self._outbox(scan_id, websocket)
+        if outbox is not None and isinstance(sent_ms, (int, float)):
+            outbox.rtt_ms = max(time.time() * 1000 - sent_ms, 0.0)
+
+    def stats(self) -> dict[str, Any]:
+        """Connection gauges of this replica: counts, send-queue depths and ping round trips."""
+        outboxes = [outbox for subscribers in self._connections.values() for outbox in subscribers.values()]
+        depths = sorted(outbox.depth for outbox in outboxes)
+        rtts = sorted(outbox.rtt_ms for outbox in outboxes if outbox.rtt_ms is not None)
+
+        def _quantile(values: list, q: float) -> Any:
+            return values[min(int(len(values) * q), len(values) - 1)] if values else None
+
+        return {
+            "connections": len(outboxes),
+            "scans": len(self._connections),
+            "replaying": sum(outbox.held for outbox in outboxes),
+            "queue_depth": {
+                "total": sum(depths),
+                "p95": _quantile(depths, 0.95),
+                "max": depths[-1] if depths else None,
+            },
+            "rtt_ms": {
+                "samples": len(rtts),
+                "p50": round(statistics.median(rtts), 1) if rtts else None,
+                "p95": round(_quantile(rtts, 0.95), 1) if rtts else None,
+                "max": round(rtts[-1], 1) if rtts else None,
+            },
+            "frames_dropped": sum(outbox.dropped for outbox in outboxes),
+            "frames_merged": sum(outbox.merged for outbox in outboxes),
+        }
+
+    async def drain(self) -> None:
+        """Wait until every live client has been sent everything queued so far."""
+        while not all(outbox.idle for subscribers in self._connections.values() for outbox in subscribers.values()):
+            await asyncio.sleep(0.005)
+
+    async def close_all(self) -> None:
+        """Disconnect every client and wait for the writer tasks and pending evictions to finish (shutdown)."""
+        outboxes = [outbox for subscribers in self._connections.values() for outbox in subscribers.values()]
+        for outbox in outboxes:
+            self.disconnect(outbox.scan_id, outbox.websocket)
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
-        for scan_id in disconnected:
-            self.disconnect(scan_id)
+    def subscribers(self, scan_id: str) -> int:
+        """Return the number of clients watching a scan."""
+        return len(self._connections.get(scan_id, ()))
 
     @property
     def active_connections(self) -> int:
         """Return the number of active WebSocket connections."""
-        return len(self._connections)
+        return sum(len(subscribers) for subscribers in self._connections.values())
 
 
 # Global singleton instance
@@ -0,0 +1,172 @@
+"""Lifecycle of one live-scan WebSocket connection.
+
+1. Accept, negotiating the wire encoding.
+2. Subscribe: the client sends ``{"type": "subscribe", "token": <access
+   JWT>, "last_event_id": ...}`` as its first frame (non-browser clients may
+   pass ``?token=`` instead), and the scan must belong to the token's user.
+3. Replay the events the client missed, then go live through the
+   ConnectionManager.
+4. Until the client leaves: ping it every ``WS_PING_INTERVAL_SECONDS`` (the
+   pong gives the delivery round trip) and close it if nothing at all has
+   been received for ``WS_IDLE_TIMEOUT_SECONDS``.
+
+Rejections close the socket with 44xx codes mirroring the HTTP statuses.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.deps import get_current_user
+from app.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import incr_counter
+from app.models.scan import Scan
+from app.services.event_log import read_events
+from app.websocket.codec import MSGPACK, decode_client_frame, encode, negotiate, schema_frame
+from app.websocket.event_bus import event_bus
+from app.websocket.manager import send_frame, ws_manager
+
+logger = logging.getLogger(__name__)
+
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_NOT_FOUND = 4404
+CLOSE_IDLE = 4408
+
+
+class _Rejected(Exception):
+    def __init__(self, code: int, reason: str) -> None:
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+
+async def _receive_frame(websocket: WebSocket, timeout: float) -> dict[str, Any] | None:
+    """Wait for the next client frame; None for frames that are not a JSON/msgpack map.
+
+    Raises:
+        WebSocketDisconnect: If the client went away.
+        asyncio.TimeoutError: If nothing arrived in time.
+    """
+    message = await asyncio.wait_for(websocket.receive(), timeout=timeout)
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return decode_client_frame(message)
+
+
+async def _subscribe(websocket: WebSocket, token: str | None, last_event_id: str | None) -> tuple[str | None, str | None]:
+    """Take the token (and resume position) from the query or from the subscribe frame."""
+    if token:
+        return token, last_event_id
+    try:
+        frame = await _receive_frame(websocket, settings.WS_SUBSCRIBE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise _Rejected(CLOSE_UNAUTHORIZED, "Subscribe timeout")
+    if not frame or frame.get("type") != "subscribe":
+        raise _Rejected(CLOSE_UNAUTHORIZED, "Expected a subscribe frame")
+    return frame.get("token"), frame.get("last_event_id") or last_event_id
+
+
+async def _authorize(token: str | None, scan_id: str) -> str:
+    """Check the token and scan ownership; returns the ID of the run whose events the scan follows."""
+    if not token:
+        raise _Rejected(CLOSE_UNAUTHORIZED, "Missing token")
+    async with async_session_maker() as db:
+        try:
+            user = await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+        except HTTPException as exc:
+            raise _Rejected(CLOSE_FORBIDDEN if exc.status_code == 403 else CLOSE_UNAUTHORIZED, str(exc.detail))
+        try:
+            scan = await db.get(Scan, UUID(scan_id))
+        except ValueError:
+            scan = None
+    if scan is None:
+        raise _Rejected(CLOSE_NOT_FOUND, "Scan not found")
+    if scan.user_id != user.id:
+        raise _Rejected(CLOSE_FORBIDDEN, "Not enough permissions")
+    # Scans coalesced into another run share that run's live stream
+    return str(scan.coalesced_into_id or scan.id)
+
+
+async def _replay(websocket: WebSocket, stream_id: str, last_event_id: str | None, encoding: str) -> str | None:
+    """Send the events the client has not seen yet; returns the last event ID sent."""
+    async with async_session_maker() as db:
+        events = await read_events(db, stream_id, after=last_event_id)
+    for event in events:
+        await send_frame(websocket, encode(event, encoding))
+    return events[-1]["event_id"] if events else last_event_id
+
+
+async def _ping_loop(stream_id: str, websocket: WebSocket) -> None:
+    while True:
+        await asyncio.sleep(settings.WS_PING_INTERVAL_SECONDS)
+        ws_manager.ping(stream_id, websocket)
+
+
+async def _listen(websocket: WebSocket, stream_id: str) -> None:
+    """Read client frames until it leaves or goes quiet for longer than the idle timeout."""
+    while True:
+        try:
+            frame = await _receive_frame(websocket, settings.WS_IDLE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.info("Closing idle WebSocket for scan %s", stream_id)
+            await incr_counter("ws.reaped_idle")
+            # Unregister first so the outbox writer is not sending while we close
+            ws_manager.disconnect(stream_id, websocket)
+            await websocket.close(code=CLOSE_IDLE)
+            return
+        if frame and frame.get("type") == "pong":
+            ws_manager.record_pong(stream_id, websocket, frame.get("t"))
+
+
+async def serve_scan_socket(
+    websocket: WebSocket,
+    scan_id: str,
+    last_event_id: str | None = None,
+    encoding: str | None = None,
+    token: str | None = None,
+) -> None:
+    """Run one client connection from accept to close."""
+    wire_format, subprotocol = negotiate(websocket.scope.get("subprotocols", []), encoding)
+    await websocket.accept(subprotocol=subprotocol)
+    try:
+        token, last_event_id = await _subscribe(websocket, token, last_event_id)
+        stream_id = await _authorize(token, scan_id)
+    except _Rejected as exc:
+        logger.info("Rejected WebSocket for scan %s: %s", scan_id, exc.reason)
+        await incr_counter("ws.rejected")
+        await websocket.close(code=exc.code, reason=exc.reason)
+        return
+    except WebSocketDisconnect:
+        return
+
+    connected_at = time.monotonic()
+    await incr_counter("ws.connected")
+    # Hold live events until the replay is done so none are lost or duplicated
+    await ws_manager.connect(stream_id, websocket, hold=True, encoding=wire_format)
+    # Events are published by the workers; subscribe this replica to them while the client stays
+    await event_bus.watch(stream_id)
+    pinger = None
+    try:
+        await send_frame(websocket, encode({"type": "subscribed", "scan_id": scan_id}, wire_format))
+        if wire_format == MSGPACK:
+            await websocket.send_bytes(schema_frame())
+        replayed_to = await _replay(websocket, stream_id, last_event_id, wire_format)
+        await ws_manager.release(stream_id, websocket, replayed_to)
+        pinger = asyncio.create_task(_ping_loop(stream_id, websocket))
+        await _listen(websocket, stream_id)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if pinger is not None:
+            pinger.cancel()
+        ws_manager.disconnect(stream_id, websocket)
+        await event_bus.unwatch(stream_id)
+        await incr_counter("ws.connected_seconds", int(time.monotonic() - connected_at))
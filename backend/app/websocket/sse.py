@@ -0,0 +1,118 @@
+"""Server-Sent Events transport for live scan events.
+
+SSE clients are registered with the same ConnectionManager and event bus as
+WebSocket clients, through a queue-backed stand-in for the socket, so they
+get the same fan-out, replay and slow-consumer eviction.  One stream can
+carry several scans; its event IDs are then a cursor with the position of
+every scan, so a single ``Last-Event-ID`` resumes all of them.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator
+
+from app.core.database import async_session_maker
+from app.services.event_log import read_events
+from app.utils.event_ids import is_after
+from app.websocket.event_bus import event_bus
+from app.websocket.manager import ws_manager
+
+logger = logging.getLogger(__name__)
+
+# Handoff between a client's outbox and its HTTP response; merging, dropping
+# and eviction of lagging clients happen in the outbox
+QUEUE_SIZE = 16
+HEARTBEAT_SECONDS = 15
+
+_CLOSED = object()
+
+
+class QueueSubscriber:
+    """Looks like a WebSocket to ConnectionManager, but queues frames for an HTTP response."""
+
+    def __init__(self, scan_id: str, queue: asyncio.Queue) -> None:
+        self.scan_id = scan_id
+        self._queue = queue
+
+    async def send_text(self, text: str) -> None:
+        await self._queue.put((self.scan_id, text))
+
+    async def close(self, code: int = 1000) -> None:
+        # Evicted: end the response so the client reconnects with its Last-Event-ID.
+        # The queue is full at this point; the frames dropped here are replayed on reconnect.
+        while True:
+            try:
+                self._queue.put_nowait((self.scan_id, _CLOSED))
+                return
+            except asyncio.QueueFull:
+                self._queue.get_nowait()
+
+
+def parse_cursor(last_event_id: str | None, scan_ids: list[str]) -> dict[str, str]:
+    """Read a Last-Event-ID: a bare event ID for one scan, or ``scan=id,...`` for several."""
+    if not last_event_id:
+        return {}
+    if "=" not in last_event_id:
+        return {scan_ids[0]: last_event_id} if len(scan_ids) == 1 else {}
+    cursor = dict(part.split("=", 1) for part in last_event_id.split(",") if "=" in part)
+    return {scan_id: event_id for scan_id, event_id in cursor.items() if scan_id in scan_ids}
+
+
+def _format_cursor(cursor: dict[str, str]) -> str:
+    return ",".join(f"{scan_id}={event_id}" for scan_id, event_id in cursor.items())
+
+
+async def scan_event_stream(streams: dict[str, str], last_event_id: str | None = None) -> AsyncIterator[dict[str, Any]]:
+    """Yield SSE messages for the given scans: missed events first, then live ones.
+
+    Args:
+        streams: Requested scan ID -> ID of the run whose events it follows
+            (differs for scans coalesced into another run).
+        last_event_id: The client's ``Last-Event-ID`` header, if resuming.
+    """
+    scan_ids = list(streams)
+    multiplexed = len(scan_ids) > 1
+    cursor = parse_cursor(last_event_id, scan_ids)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    subscribers = {scan_id: QueueSubscriber(scan_id, queue) for scan_id in scan_ids}
+
+    def _message(scan_id: str, event: dict[str, Any]) -> dict[str, Any]:
+        if event.get("event_id"):
+            cursor[scan_id] = event["event_id"]
+        if multiplexed:
+            event = {"scan_id": scan_id, **event}
+        return {
+            "id": _format_cursor(cursor) if multiplexed else cursor.get(scan_id),
+            "event": event.get("type", "message"),
+            "data": json.dumps(event, default=str),
+        }
+
+    for scan_id, stream_id in streams.items():
+        await ws_manager.connect(stream_id, subscribers[scan_id], hold=True)
+        await event_bus.watch(stream_id)
+    try:
+        # Read the backlog up front: the session must not stay checked out while a slow client drains it
+        async with async_session_maker() as db:
+            missed = {
+                scan_id: await read_events(db, stream_id, after=cursor.get(scan_id))
+                for scan_id, stream_id in streams.items()
+            }
+        for scan_id, stream_id in streams.items():
+            for event in missed.pop(scan_id):
+                yield _message(scan_id, event)
+            await ws_manager.release(stream_id, subscribers[scan_id], cursor.get(scan_id))
+
+        while True:
+            scan_id, text = await queue.get()
+            if text is _CLOSED:
+                return
+            event = json.loads(text)
+            if not is_after(event.get("event_id"), cursor.get(scan_id)):
+                continue
+            yield _message(scan_id, event)
+    finally:
+        for scan_id, stream_id in streams.items():
+            ws_manager.disconnect(stream_id, subscribers[scan_id])
+            await event_bus.unwatch(stream_id)
@@ -1,4 +1,27 @@
+"""Celery application.
+
+A scan is split into one task per module.  Load tests go to the ``heavy``
+queue and every other module (plus dispatch, finalisation and reports) to
+``light``, so a multi-minute load test never holds a slot that dozens of
+short DNS/SSL/SEO probes could use:
+
+    celery -A app.workers.celery_app worker -Q light   # many slots, deeper prefetch
+    celery -A app.workers.celery_app worker -Q heavy   # few slots, prefetch 1
+
+Each pool picks its concurrency and prefetch from settings unless they are
+given on the command line.  Every worker process runs its tasks on one
+persistent event loop with shared DB and Redis pools (app.workers.runtime).
+
+Scans are admitted by the fair-share scheduler (app.services.scan_scheduler);
+celery beat runs the dispatcher that feeds them to the workers, and starts
+recurring scans from app.services.schedule_service:
+
+    celery -A app.workers.celery_app beat
+"""
 from celery import Celery
+from celery.signals import celeryd_init
+from kombu import Queue
+
 from app.config import settings
 
 celery_app = Celery(
@@ -15,5 +38,41 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
-    broker_connection_retry_on_startup=True
+    broker_connection_retry_on_startup=True,
+    task_queues=(Queue("light"), Queue("heavy")),
+    task_default_queue="light",
+    beat_schedule={
+        "dispatch-queued-scans": {
+            "task": "tasks.dispatch_scans_task",
+            "schedule": 2.0,
+        },
+        "start-due-schedules": {
+            "task": "tasks.start_due_schedules_task",
+            "schedule": 30.0,
+        },
+    },
 )
+
+WORKER_POOLS = {
+    "light": {
+        "worker_concurrency": settings.CELERY_LIGHT_CONCURRENCY,
+        "worker_prefetch_multiplier": settings.CELERY_LIGHT_PREFETCH,
+    },
+    "heavy": {
+        "worker_concurrency": settings.CELERY_HEAVY_CONCURRENCY,
+        "worker_prefetch_multiplier": settings.CELERY_HEAVY_PREFETCH,
+        # A load test that dies with its worker must not be silently lost
+        "task_acks_late": True,
+    },
+}
+
+
+@celeryd_init.connect
+def configure_worker_pool(sender=None, conf=None, options=None, **kwargs) -> None:
+    """Apply the pool settings of the queue this worker consumes (-Q light|heavy)."""
+    queues = (options or {}).get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    # A worker consuming the heavy queue is sized as a heavy worker
+    pool = "heavy" if "heavy" in queues else "light"
+    conf.update(WORKER_POOLS[pool])
@@ -0,0 +1,90 @@
+"""Long-lived event loop and shared resources for a worker process.
+
+Celery tasks are synchronous, so each one has to drive its coroutine on an
+event loop.  Creating a fresh loop per task (``asyncio.run``) also throws
+away everything bound to it: the SQLAlchemy/asyncpg pool, the Redis
+connection pool, the scanners' HTTP keep-alive connections and any other
+open sockets.  Instead every worker process opens one loop when it starts,
+initialises the shared resources on it once, and runs each task's coroutine
+on that same loop.
+
+The loop is created after the prefork pool forks (``worker_process_init``),
+never in the parent, so no child inherits a loop or a connection.  Pools
+that do not fork (``--pool solo``) start the runtime lazily on first use.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Coroutine, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.config import settings
+from app.core.database import close_db, init_db
+from app.core.dns_cache import close_http_pools, open_http_pools
+from app.core.redis import close_redis, init_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+async def _open_resources() -> None:
+    init_db(str(settings.DATABASE_URL))
+    await init_redis()
+    open_http_pools()
+
+
+async def _close_resources() -> None:
+    await close_http_pools()
+    await close_redis()
+    await close_db()
+
+
+def start() -> None:
+    """Create this process's event loop and open the shared DB, Redis and HTTP pools."""
+    global _loop
+    if _loop is not None:
+        return
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    _loop.run_until_complete(_open_resources())
+    logger.info("Worker runtime started")
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run *coro* to completion on the worker's persistent loop."""
+    if _loop is None:
+        start()
+    return _loop.run_until_complete(coro)
+
+
+def stop() -> None:
+    """Close the shared resources, cancel leftover tasks and close the loop."""
+    global _loop
+    if _loop is None:
+        return
+    loop, _loop = _loop, None
+    try:
+        loop.run_until_complete(_close_resources())
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
+        logger.info("Worker runtime stopped")
+
+
+@worker_process_init.connect
+def _start_on_worker_init(**kwargs: Any) -> None:
+    start()
+
+
+@worker_process_shutdown.connect
+def _stop_on_worker_shutdown(**kwargs: Any) -> None:
+    stop()
@@ -0,0 +1,244 @@
+"""Asyncio scan runner fed from a Redis Stream, an alternative to the Celery workers.
+
+Every scanner is I/O bound, so a prefork worker that runs one scan per
+process spends most of its time waiting on the network.  This runner keeps
+one event loop per process and runs up to ``STREAM_RUNNER_CONCURRENCY``
+whole scans on it at once, each with the same ``ScanOrchestrator`` the
+Celery tasks use:
+
+    SCAN_EXECUTOR=streams                               # API, beat and dispatcher
+    python -m app.workers.stream_runner                 # one or more runner processes
+
+Delivery is at-least-once through a consumer group.  A job is acknowledged
+only after its scan has finished; jobs held by a runner that died are
+reclaimed once they have been idle for ``STREAM_RUNNER_CLAIM_IDLE_SECONDS``
+(live runners keep their own in-flight jobs fresh), and a job delivered
+``STREAM_RUNNER_MAX_DELIVERIES`` times is moved to the dead-letter stream
+and its scan marked failed.  Report generation stays on the Celery light
+workers, since PDF rendering would block the loop.
+
+Raise ``SCHED_MAX_INFLIGHT_SCANS`` to the total concurrency of the runners,
+otherwise the admission scheduler keeps them under-used.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+from typing import Any
+from uuid import UUID
+
+from redis.exceptions import ResponseError
+
+from app.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import incr_counter
+from app.core.redis import get_redis
+from app.models.scan import Scan, ScanStatus
+from app.services.scan_orchestrator import ScanOrchestrator
+from app.workers import runtime
+from app.workers.tasks import generate_report_task, release_slot
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "scan_jobs"
+DEAD_LETTER_KEY = "scan_jobs:dead"
+GROUP = "scan-runners"
+# Approximate cap on the job stream; acknowledged jobs are the first to go
+STREAM_MAXLEN = 100_000
+READ_BLOCK_MS = 5000
+
+
+async def submit(scan_ids: list[str]) -> None:
+    """Append scans to the job stream (used by the dispatcher in streams mode)."""
+    if not scan_ids:
+        return
+    client = await get_redis()
+    pipe = client.pipeline(transaction=False)
+    for scan_id in scan_ids:
+        pipe.xadd(STREAM_KEY, {"scan_id": scan_id}, maxlen=STREAM_MAXLEN, approximate=True)
+    await pipe.execute()
+
+
+class StreamRunner:
+    """Consume scan jobs from the stream and run many of them concurrently."""
+
+    def __init__(self, concurrency: int | None = None, consumer: str | None = None) -> None:
+        self.concurrency = concurrency or settings.STREAM_RUNNER_CONCURRENCY
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_idle_ms = settings.STREAM_RUNNER_CLAIM_IDLE_SECONDS * 1000
+        self.max_deliveries = settings.STREAM_RUNNER_MAX_DELIVERIES
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._inflight: dict[str, asyncio.Task] = {}  # message id -> job
+        self._stopping = asyncio.Event()
+
+    async def _ensure_group(self) -> None:
+        client = await get_redis()
+        try:
+            await client.xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def stop(self) -> None:
+        """Stop taking new jobs; in-flight scans are allowed to finish."""
+        self._stopping.set()
+
+    # ── jobs ──
+
+    async def _run_scan(self, scan_id: str) -> None:
+        async with async_session_maker() as db:
+            scan = await db.get(Scan, UUID(scan_id))
+            # A redelivered job may find its scan already finished by the previous holder
+            if scan is None or scan.status in (ScanStatus.completed, ScanStatus.failed):
+                logger.info(f"Skipping stream job for scan {scan_id}: not runnable")
+                return
+            orchestrator = ScanOrchestrator(db, scan)
+            try:
+                await orchestrator.run()
+            finally:
+                await release_slot(scan_id)
+
+            if orchestrator.scan.status == ScanStatus.completed:
+                generate_report_task.delay(scan_id)
+                for follower in orchestrator.followers:
+                    generate_report_task.delay(str(follower.id))
+
+    async def _job(self, message_id: str, fields: dict[str, Any]) -> None:
+        client = await get_redis()
+        scan_id = fields.get("scan_id", "")
+        try:
+            await self._run_scan(scan_id)
+        except Exception as e:
+            # Left unacknowledged: another runner reclaims it after the idle timeout
+            logger.error(f"Stream job {message_id} for scan {scan_id} failed: {e}", exc_info=True)
+            await incr_counter("stream_runner.error")
+            return
+        finally:
+            self._inflight.pop(message_id, None)
+            self._slots.release()
+        await client.xack(STREAM_KEY, GROUP, message_id)
+        await incr_counter("stream_runner.done")
+
+    def _start(self, message_id: str, fields: dict[str, Any]) -> None:
+        self._inflight[message_id] = asyncio.create_task(self._job(message_id, fields))
+
+    async def _acquire_slots(self) -> int:
+        """Wait for at least one free slot and take every slot that is free."""
+        await self._slots.acquire()
+        taken = 1
+        while taken < self.concurrency and not self._slots.locked():
+            await self._slots.acquire()
+            taken += 1
+        return taken
+
+    # ── dead-lettering and reclaiming ──
+
+    async def _dead_letter(self, message_id: str, fields: dict[str, Any], deliveries: int) -> None:
+        client = await get_redis()
+        scan_id = fields.get("scan_id", "")
+        logger.error(f"Scan {scan_id} dead-lettered after {deliveries} deliveries")
+        await client.xadd(
+            DEAD_LETTER_KEY,
+            {"scan_id": scan_id, "message_id": message_id, "deliveries": deliveries, "consumer": self.consumer},
+            maxlen=STREAM_MAXLEN, approximate=True,
+        )
+        await client.xack(STREAM_KEY, GROUP, message_id)
+        await incr_counter("stream_runner.dead_letter")
+        try:
+            async with async_session_maker() as db:
+                scan = await db.get(Scan, UUID(scan_id))
+                if scan is not None and scan.status in (ScanStatus.pending, ScanStatus.running):
+                    await ScanOrchestrator(db, scan).fail()
+        finally:
+            await release_slot(scan_id)
+
+    async def _reclaim(self, free: int) -> int:
+        """Take over up to *free* jobs abandoned by dead runners; returns the number started."""
+        client = await get_redis()
+        _, claimed, *_ = await client.xautoclaim(
+            STREAM_KEY, GROUP, self.consumer, min_idle_time=self.claim_idle_ms, count=free,
+        )
+        if not claimed:
+            return 0
+        pending = await client.xpending_range(
+            STREAM_KEY, GROUP, min=claimed[0][0], max=claimed[-1][0], count=len(claimed) * 2,
+        )
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+        started = 0
+        for message_id, fields in claimed:
+            if fields is None:  # trimmed from the stream while pending
+                await client.xack(STREAM_KEY, GROUP, message_id)
+                continue
+            count = deliveries.get(message_id, 1)
+            if count > self.max_deliveries:
+                await self._dead_letter(message_id, fields, count)
+                continue
+            logger.warning(f"Reclaimed stream job {message_id} (delivery {count})")
+            self._start(message_id, fields)
+            started += 1
+        return started
+
+    async def _keep_alive(self) -> None:
+        """Reset the idle time of our in-flight jobs so long scans are not reclaimed."""
+        client = await get_redis()
+        while not self._stopping.is_set():
+            await asyncio.sleep(self.claim_idle_ms / 3000)
+            if self._inflight:
+                try:
+                    await client.xclaim(
+                        STREAM_KEY, GROUP, self.consumer, min_idle_time=0,
+                        message_ids=list(self._inflight), justid=True,
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to refresh in-flight stream jobs: {e}")
+
+    # ── main loop ──
+
+    async def run(self) -> None:
+        await self._ensure_group()
+        client = await get_redis()
+        keep_alive = asyncio.create_task(self._keep_alive())
+        logger.info(f"Stream runner {self.consumer} consuming {STREAM_KEY} with {self.concurrency} slots")
+        try:
+            while not self._stopping.is_set():
+                free = await self._acquire_slots()
+                started = await self._reclaim(free)
+                if started < free:
+                    response = await client.xreadgroup(
+                        GROUP, self.consumer, {STREAM_KEY: ">"}, count=free - started, block=READ_BLOCK_MS,
+                    )
+                    for _, messages in response or []:
+                        for message_id, fields in messages:
+                            self._start(message_id, fields)
+                            started += 1
+                for _ in range(free - started):
+                    self._slots.release()
+        finally:
+            keep_alive.cancel()
+            if self._inflight:
+                logger.info(f"Waiting for {len(self._inflight)} in-flight scan(s)")
+                await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    runner = StreamRunner()
+
+    async def _serve() -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, runner.stop)
+        await runner.run()
+
+    runtime.start()
+    try:
+        runtime.run(_serve())
+    finally:
+        runtime.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,175 @@
-import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from uuid import UUID
 
+from celery import chord
+
+from app.config import settings
+from app.workers import runtime
 from app.workers.celery_app import celery_app
 from app.core.database import async_session_maker
 from app.models.scan import Scan, ScanStatus
+from app.services import scan_scheduler
 from app.services.scan_orchestrator import ScanOrchestrator
+from app.services.scan_profiles import LIGHT_QUEUE, queue_for_module
+from app.services.schedule_service import start_due_schedules
 
 logger = logging.getLogger(__name__)
 
-async def run_scan_async(scan_id: str) -> None:
-    """Async wrapper to run the scan orchestrator."""
+
+@asynccontextmanager
+async def _orchestrator_for(scan_id: str) -> AsyncIterator[ScanOrchestrator | None]:
+    """Open a DB session from the worker's pool and build the orchestrator for a scan."""
     async with async_session_maker() as db:
+        scan = await db.get(Scan, UUID(scan_id))
+        if not scan:
+            logger.error(f"Scan {scan_id} not found in database.")
+            yield None
+        else:
+            yield ScanOrchestrator(db, scan)
+
+
+async def dispatch_pending() -> int:
+    """Start as many queued scans as the scheduler has free slots for."""
+    scan_ids = await scan_scheduler.dispatch_ready()
+    if settings.SCAN_EXECUTOR == "streams":
+        from app.workers.stream_runner import submit
+        await submit(scan_ids)
+    else:
+        for scan_id in scan_ids:
+            run_scan_task.delay(scan_id)
+    return len(scan_ids)
+
+
+async def release_slot(scan_id: str) -> None:
+    """Give the scan's scheduler slot back and start the next queued scan."""
+    try:
+        await scan_scheduler.release(scan_id)
+        await dispatch_pending()
+    except Exception as e:
+        logger.warning(f"Failed to release scheduler slot for scan {scan_id}: {e}")
+
+
+async def start_scan_async(scan_id: str) -> list[str]:
+    """Mark the scan as running and return the modules to fan out."""
+    async with _orchestrator_for(scan_id) as orchestrator:
+        if orchestrator is None:
+            await release_slot(scan_id)
+            return []
         try:
-            scan = await db.get(Scan, UUID(scan_id))
-            if not scan:
-                logger.error(f"Scan {scan_id} not found in database.")
-                return
-                
-            orchestrator = ScanOrchestrator(db, scan)
-            await orchestrator.run()
-            
-            # If scan completed successfully, trigger report generation
-            if scan.status == ScanStatus.COMPLETED:
-                logger.info(f"Scan {scan_id} completed. Triggering report generation task.")
-                generate_report_task.delay(str(scan.id))
-                
+            await orchestrator.start()
         except Exception as e:
-            logger.error(f"Failed to execute orchestrator for scan {scan_id}: {e}", exc_info=True)
+            logger.error(f"Failed to start scan {scan_id}: {e}", exc_info=True)
+            await orchestrator.fail()
+            await release_slot(scan_id)
+            return []
+        return [module for module, _ in orchestrator.scanners]
+
+
+async def dispatch_scans_async() -> None:
+    started = await dispatch_pending()
+    if started:
+        logger.info(f"Dispatched {started} queued scan(s)")
+
+
+@celery_app.task(name="tasks.dispatch_scans_task", ignore_result=True)
+def dispatch_scans_task() -> None:
+    """
+    Periodic task (celery beat) that moves queued scans to the workers in
+    fair-share order whenever slots are free.
+    """
+    runtime.run(dispatch_scans_async())
+
+
+async def start_due_schedules_async() -> None:
+    async with async_session_maker() as db:
+        queued = await start_due_schedules(db)
+    if queued:
+        logger.info(f"Queued {queued} scheduled scan(s)")
+        await dispatch_pending()
+
+
+@celery_app.task(name="tasks.start_due_schedules_task", ignore_result=True)
+def start_due_schedules_task() -> None:
+    """
+    Periodic task (celery beat) that starts recurring scans whose time has come.
+    """
+    runtime.run(start_due_schedules_async())
 
 
 @celery_app.task(name="tasks.run_scan_task")
 def run_scan_task(scan_id: str) -> None:
     """
-    Celery task to run the full scan sequence.
-    Triggers the async ScanOrchestrator inside a synchronous Celery task.
+    Celery task that starts a scan and fans it out into one task per module.
+    Each module runs on the queue matching its weight (light probes vs heavy
+    load tests); a chord callback finalises the scan once all of them are done.
     """
     logger.info(f"Received scan task for ID {scan_id}")
-    asyncio.run(run_scan_async(scan_id))
+    modules = runtime.run(start_scan_async(scan_id))
+    if not modules:
+        return
+
+    header = [
+        run_module_task.s(scan_id, module).set(queue=queue_for_module(module))
+        for module in modules
+    ]
+    chord(header)(finalize_scan_task.s(scan_id).set(queue=LIGHT_QUEUE))
+
+
+async def run_module_async(scan_id: str, module: str) -> int | None:
+    """Run a single module and commit its result."""
+    async with _orchestrator_for(scan_id) as orchestrator:
+        if orchestrator is None:
+            return None
+        score = await orchestrator.run_module(module)
+        await orchestrator.commit_module()
+        return score
+
+
+@celery_app.task(name="tasks.run_module_task")
+def run_module_task(scan_id: str, module: str) -> int | None:
+    """
+    Celery task to run one scan module. Never raises, so that a failing
+    module cannot prevent the chord callback from finalising the scan.
+    """
+    logger.info(f"Received {module} module task for scan ID {scan_id}")
+    try:
+        return runtime.run(run_module_async(scan_id, module))
+    except Exception as e:
+        logger.error(f"Module {module} failed for scan {scan_id}: {e}", exc_info=True)
+        return None
+
+
+async def finalize_scan_async(scan_id: str) -> None:
+    """Close the scan and trigger report generation for it and any attached scans."""
+    async with _orchestrator_for(scan_id) as orchestrator:
+        if orchestrator is None:
+            return
+        try:
+            await orchestrator.finalize()
+        except Exception as e:
+            logger.error(f"Failed to finalize scan {scan_id}: {e}", exc_info=True)
+            await orchestrator.fail()
+            return
+        finally:
+            await release_slot(scan_id)
+
+        # If scan completed successfully, trigger report generation
+        if orchestrator.scan.status == ScanStatus.completed:
+            logger.info(f"Scan {scan_id} completed. Triggering report generation task.")
+            generate_report_task.delay(scan_id)
+            for follower in orchestrator.followers:
+                generate_report_task.delay(str(follower.id))
+
+
+@celery_app.task(name="tasks.finalize_scan_task")
+def finalize_scan_task(module_scores: list[int | None], scan_id: str) -> None:
+    """
+    Chord callback: finalise the scan once every module task has finished.
+    """
+    logger.info(f"Finalizing scan {scan_id} ({sum(s is not None for s in module_scores)}/{len(module_scores)} modules succeeded)")
+    runtime.run(finalize_scan_async(scan_id))
 
 
 async def generate_report_async(scan_id: str) -> None:
@@ -57,4 +189,4 @@ def generate_report_task(scan_id: str) -> None:
     Celery task to generate AI report, PDF, and send email.
     """
     logger.info(f"Received report generation task for scan ID {scan_id}")
-    asyncio.run(generate_report_async(scan_id))
+    runtime.run(generate_report_async(scan_id))
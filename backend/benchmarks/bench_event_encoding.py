@@ -0,0 +1,119 @@
+"""Bytes and CPU per 1000 live scan events for each wire encoding.
+
+Encodes a stream shaped like a load-test tier (live metric snapshots, log
+lines and the odd log batch) as JSON and as schema-keyed msgpack, each with
+and without permessage-deflate.  Deflate is simulated as the server does it:
+one raw deflate stream per connection (context takeover), sync-flushed per
+message with the trailing empty block stripped.  No server is needed:
+
+    cd backend && python -m benchmarks.bench_event_encoding
+"""
+from __future__ import annotations
+
+import random
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.websocket.codec import JSON, MSGPACK, decode_msgpack, encode
+
+EVENTS = 1000
+ROUNDS = 20
+
+
+def _events() -> list[dict[str, Any]]:
+    rng = random.Random(7)
+    start = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    events = []
+    for i in range(EVENTS):
+        timestamp = (start + timedelta(milliseconds=250 * i)).isoformat()
+        event_id = f"{1760875200000 + 250 * i}-0"
+        kind = i % 10
+        if kind < 6:
+            total = 200 * i + rng.randint(0, 200)
+            events.append({
+                "event_id": event_id,
+                "type": "progress",
+                "phase": "performance",
+                "progress_percent": i * 100 // EVENTS,
+                "message": f"Testing 1000 users — {i // 4}s elapsed",
+                "live_metrics": {
+                    "active_users": 1000,
+                    "total_requests": total,
+                    "avg_response_time": rng.uniform(80, 400),
+                    "p50": rng.uniform(60, 300),
+                    "p95": rng.uniform(300, 1500),
+                    "throughput": rng.uniform(150, 900),
+                    "error_rate": rng.uniform(0, 5),
+                },
+                "timestamp": timestamp,
+            })
+        elif kind < 9:
+            events.append({
+                "event_id": event_id,
+                "type": "log",
+                "phase": "performance",
+                "level": "info",
+                "message": f"Tier 4/5 — {rng.randint(0, 40)} slow responses in the last window",
+                "timestamp": timestamp,
+            })
+        else:
+            events.append({
+                "event_id": event_id,
+                "type": "log_batch",
+                "phase": "security",
+                "entries": [
+                    {
+                        "type": "log",
+                        "phase": "security",
+                        "level": "warning",
+                        "message": f"Missing header X-Check-{n}",
+                        "timestamp": timestamp,
+                    }
+                    for n in range(5)
+                ],
+            })
+    return events
+
+
+def _deflater() -> Any:
+    return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+
+def _measure(events: list[dict[str, Any]], encoding: str, deflate: bool) -> tuple[int, float]:
+    """Return (bytes on the wire, CPU seconds) for one pass over *events*."""
+    deflater = _deflater() if deflate else None
+    size = 0
+    start = time.process_time()
+    for event in events:
+        payload = encode(event, encoding)
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if deflater is not None:
+            payload = (deflater.compress(payload) + deflater.flush(zlib.Z_SYNC_FLUSH))[:-4]
+        size += len(payload)
+    return size, time.process_time() - start
+
+
+def main() -> None:
+    events = _events()
+    # The layout has to round-trip before its size means anything
+    for event in events[:10]:
+        restored = decode_msgpack(encode(event, MSGPACK))
+        assert restored["type"] == event["type"] and restored.get("event_id") == event.get("event_id")
+
+    print(f"{EVENTS} events, CPU is the best of {ROUNDS} rounds")
+    baseline = None
+    for encoding in (JSON, MSGPACK):
+        for deflate in (False, True):
+            runs = [_measure(events, encoding, deflate) for _ in range(ROUNDS)]
+            size = runs[0][0]
+            cpu = min(cpu for _, cpu in runs)
+            baseline = baseline or size
+            label = encoding + (" + deflate" if deflate else "")
+            print(f"{label:18s} {size:9d} bytes ({size / baseline:5.0%})   {cpu * 1000:7.2f} ms CPU   {size / EVENTS:6.1f} bytes/event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Local stub DNS servers that stand in for public resolvers.
+
+Each stub listens on its own UDP port on 127.0.0.1 and answers A queries
+with a fixed address set (NXDOMAIN when that set is empty), or per name from
+a zone dict (NXDOMAIN for names outside it), optionally after a delay; a
+stub given ``None`` never answers, like a resolver that times out.  Point
+the scanner at them with ``"127.0.0.1#<port>"`` entries, e.g.
+``DNSScanner(propagation_servers=...)``.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from typing import Any
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+
+TTL = 60
+
+
+class StubDNS(asyncio.DatagramProtocol):
+    """Answers every A query with *ips* (or ``ips[name]``) after *delay* seconds."""
+
+    def __init__(self, ips: list[str] | dict[str, list[str]] | None, delay: float = 0.0) -> None:
+        self.ips = ips
+        self.delay = delay
+        self.queries = 0
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport: Any) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        self.queries += 1
+        if self.ips is None:
+            return
+        query = dns.message.from_wire(data)
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        ips = self.ips.get(question.name.to_text(omit_final_dot=True)) if isinstance(self.ips, dict) else self.ips
+        if not ips:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        elif question.rdtype == dns.rdatatype.A:
+            response.answer.append(dns.rrset.from_text_list(question.name, TTL, "IN", "A", ips))
+        wire = response.to_wire()
+        asyncio.get_running_loop().call_later(self.delay, self.transport.sendto, wire, addr)
+
+
+async def start_stubs(
+    answers: dict[str, list[str] | dict[str, list[str]] | None], delay: float = 0.0
+) -> tuple[dict[str, str], list[StubDNS]]:
+    """Start one stub per name.
+
+    Returns:
+        (name -> "127.0.0.1#port" resolver entries, the stub protocols; close their transports when done)
+    """
+    loop = asyncio.get_running_loop()
+    servers: dict[str, str] = {}
+    stubs: list[StubDNS] = []
+    for name, ips in answers.items():
+        transport, stub = await loop.create_datagram_endpoint(
+            lambda ips=ips: StubDNS(ips, delay), local_addr=("127.0.0.1", 0)
+        )
+        servers[name] = f"127.0.0.1#{transport.get_extra_info('sockname')[1]}"
+        stubs.append(stub)
+    return servers, stubs
+
+
+def _serve(answers: dict[str, Any], delay: float, conn: Any) -> None:
+    async def _main() -> None:
+        servers, _ = await start_stubs(answers, delay)
+        conn.send(servers)
+        await asyncio.Event().wait()
+
+    asyncio.run(_main())
+
+
+def start_stubs_process(
+    answers: dict[str, list[str] | dict[str, list[str]] | None], delay: float = 0.0
+) -> tuple[dict[str, str], multiprocessing.Process]:
+    """Like ``start_stubs``, but serving from a child process so the stubs do not compete for the caller's CPU.
+
+    Returns:
+        (name -> resolver entries, the process; terminate it when done)
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(answers, delay, child), daemon=True)
+    process.start()
+    return parent.recv(), process
@@ -0,0 +1,88 @@
+"""Live event wire encodings: msgpack layout round trips and negotiation."""
+import json
+
+import msgpack
+
+from app.websocket.codec import (
+    JSON,
+    MSGPACK,
+    MSGPACK_SUBPROTOCOL,
+    SCHEMAS,
+    decode_client_frame,
+    decode_msgpack,
+    encode,
+    negotiate,
+    schema_frame,
+)
+
+TIMESTAMP = "2026-10-19T10:00:00.250000+00:00"
+TIMESTAMP_MS = 1792404000250
+
+
+def test_log_round_trips_with_millisecond_timestamp():
+    event = {"type": "log", "event_id": "17-0", "phase": "dns", "level": "info", "message": "ok", "timestamp": TIMESTAMP}
+
+    assert decode_msgpack(encode(event, MSGPACK)) == {**event, "timestamp": TIMESTAMP_MS}
+
+
+def test_progress_round_trips_live_metrics_as_an_array():
+    metrics = {
+        "active_users": 50, "total_requests": 1200, "avg_response_time": 212.5,
+        "p50": 180.0, "p95": 420.0, "throughput": 19.8, "error_rate": 0.5,
+    }
+    event = {"type": "progress", "event_id": "18-0", "phase": "performance", "progress_percent": 40, "live_metrics": metrics}
+
+    packed = msgpack.unpackb(encode(event, MSGPACK))
+
+    assert packed[-1] == list(metrics.values())
+    assert decode_msgpack(encode(event, MSGPACK)) == event
+
+
+def test_fields_outside_the_schema_survive():
+    event = {"type": "module_complete", "event_id": "19-0", "phase": "ssl", "score": 88, "scan_id": "abc"}
+
+    assert decode_msgpack(encode(event, MSGPACK)) == event
+
+
+def test_log_batch_entries_round_trip():
+    entries = [{"phase": "dns", "level": "info", "message": f"line {n}", "timestamp": TIMESTAMP} for n in range(3)]
+    event = {"type": "log_batch", "event_id": "20-0", "phase": "dns", "entries": entries}
+
+    decoded = decode_msgpack(encode(event, MSGPACK))
+
+    assert decoded["entries"] == [{**entry, "timestamp": TIMESTAMP_MS} for entry in entries]
+
+
+def test_unknown_types_stay_maps():
+    event = {"type": "something_new", "value": 1}
+
+    assert msgpack.unpackb(encode(event, MSGPACK)) == event
+    assert decode_msgpack(encode(event, MSGPACK)) == event
+
+
+def test_json_is_the_default():
+    event = {"type": "ping", "t": 5}
+
+    assert json.loads(encode(event)) == event
+    assert negotiate([]) == (JSON, None)
+
+
+def test_negotiation_prefers_the_subprotocol():
+    assert negotiate([MSGPACK_SUBPROTOCOL]) == (MSGPACK, MSGPACK_SUBPROTOCOL)
+    assert negotiate([], MSGPACK) == (MSGPACK, None)
+
+
+def test_schema_frame_lists_every_type_with_its_code():
+    frame = msgpack.unpackb(schema_frame())
+
+    assert frame["type"] == "schema"
+    assert [frame["types"][event_type][0] for event_type in SCHEMAS] == list(range(len(SCHEMAS)))
+
+
+def test_client_frames_decode_from_either_encoding():
+    subscribe = {"type": "subscribe", "last_event_id": "17-0"}
+
+    assert decode_client_frame({"text": json.dumps(subscribe)}) == subscribe
+    assert decode_client_frame({"bytes": msgpack.packb(subscribe)}) == subscribe
+    assert decode_client_frame({"text": "not json"}) is None
+    assert decode_client_frame({"text": "[1, 2]"}) is None
@@ -0,0 +1,208 @@
+"""CachingResolver: answers, negative caching and in-flight lookup sharing; the HTTP transport and pools on top (no Redis needed)."""
+import asyncio
+
+import dns.message
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core import dns_cache
+from app.core.dns_cache import CachingResolver
+
+
+def _answer(qname: str, ips: list[str], ttl: int = 60) -> dns.resolver.Answer:
+    name = dns.name.from_text(qname)
+    response = dns.message.make_response(dns.message.make_query(name, "A"))
+    response.answer.append(dns.rrset.from_text_list(name, ttl, "IN", "A", ips))
+    # Parse it back, like a response off the network (that also indexes its sections)
+    response = dns.message.from_wire(response.to_wire())
+    return dns.resolver.Answer(name, dns.rdatatype.A, dns.rdataclass.IN, response)
+
+
+class FakeResolver:
+    """Answers every A query with *ips* after waiting on *gate* (if any), counting queries."""
+
+    nameservers = ["192.0.2.53"]
+    port = 53
+
+    def __init__(self, ips: list[str], gate: asyncio.Event | None = None) -> None:
+        self.ips = ips
+        self.gate = gate
+        self.queries = 0
+
+    async def resolve(self, qname, rdtype):
+        self.queries += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        return _answer(qname.to_text(), self.ips)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    dns_cache._local.clear()
+    dns_cache._inflight.clear()
+    yield
+    dns_cache._local.clear()
+
+
+@pytest.mark.asyncio
+async def test_second_lookup_is_served_locally():
+    resolver = FakeResolver(["192.0.2.1"])
+    cache = CachingResolver(resolver)
+
+    _, first = await cache.resolve_with_source("example.test", "A")
+    answer, second = await cache.resolve_with_source("example.test", "A")
+
+    assert (first, second) == ("network", "local")
+    assert [str(rdata) for rdata in answer] == ["192.0.2.1"]
+    assert resolver.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_lookups_share_one_query():
+    gate = asyncio.Event()
+    resolver = FakeResolver(["192.0.2.1"], gate)
+    cache = CachingResolver(resolver)
+
+    lookups = [asyncio.create_task(cache.resolve_with_source("example.test", "A")) for _ in range(5)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*lookups)
+
+    assert resolver.queries == 1
+    assert sorted(source for _, source in results) == ["network", "shared", "shared", "shared", "shared"]
+
+
+@pytest.mark.asyncio
+async def test_owner_cancellation_does_not_fail_waiters():
+    gate = asyncio.Event()
+    resolver = FakeResolver(["192.0.2.1"], gate)
+    cache = CachingResolver(resolver)
+
+    owner = asyncio.create_task(cache.resolve("example.test", "A"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.resolve("example.test", "A"))
+    await asyncio.sleep(0)
+    owner.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+
+    answer = await waiter
+    assert [str(rdata) for rdata in answer] == ["192.0.2.1"]
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    # The waiter asked again itself
+    assert resolver.queries == 2
+    assert not dns_cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_waiter_cancellation_still_propagates():
+    gate = asyncio.Event()
+    cache = CachingResolver(FakeResolver(["192.0.2.1"], gate))
+
+    owner = asyncio.create_task(cache.resolve("example.test", "A"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.resolve("example.test", "A"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    gate.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert [str(rdata) for rdata in await owner] == ["192.0.2.1"]
+
+
+@pytest.mark.asyncio
+async def test_resolver_errors_reach_waiters():
+    gate = asyncio.Event()
+
+    class Failing(FakeResolver):
+        async def resolve(self, qname, rdtype):
+            self.queries += 1
+            await gate.wait()
+            raise dns.resolver.LifetimeTimeout(timeout=1.0, errors=[])
+
+    resolver = Failing([])
+    cache = CachingResolver(resolver)
+    lookups = [asyncio.create_task(cache.resolve("example.test", "A")) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*lookups, return_exceptions=True)
+
+    assert all(isinstance(result, dns.resolver.LifetimeTimeout) for result in results)
+    assert resolver.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_ip_literals_skip_resolution():
+    resolver = FakeResolver(["192.0.2.1"])
+    assert await CachingResolver(resolver).addresses("2001:db8::1") == ["2001:db8::1"]
+    assert resolver.queries == 0
+
+
+def test_ttl_is_clamped():
+    assert dns_cache._ttl(dns_cache.POSITIVE, _answer("example.test", ["192.0.2.1"], ttl=10**6).response) == 3600
+    assert dns_cache._ttl(dns_cache.POSITIVE, _answer("example.test", ["192.0.2.1"], ttl=30).response) == 30
+
+
+@pytest_asyncio.fixture
+async def local_server():
+    """A local HTTP/1.1 keep-alive server; yields its port and the number of connections it accepted."""
+    connections = []
+
+    async def serve(reader, writer):
+        connections.append(writer)
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: 2\r\n\r\nok")
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    yield server.sockets[0].getsockname()[1], connections
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_transport_connects_to_the_cached_address(local_server, monkeypatch):
+    port, connections = local_server
+
+    class Resolver:
+        def __init__(self) -> None:
+            self.hosts: list[str] = []
+
+        async def addresses(self, host):
+            self.hosts.append(host)
+            return ["127.0.0.1"]
+
+    resolver = Resolver()
+    monkeypatch.setattr(dns_cache, "dns_resolver", resolver)
+    transport = dns_cache.CachedDNSTransport()
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert (await client.get(f"http://site.test:{port}/")).text == "ok"
+
+    assert resolver.hosts == ["site.test"]
+    assert len(connections) == 1
+
+
+@pytest.mark.asyncio
+async def test_clients_share_the_open_pools(local_server):
+    port, connections = local_server
+    url = f"http://127.0.0.1:{port}/"
+    dns_cache.open_http_pools()
+    try:
+        for _ in range(3):
+            async with dns_cache.http_client() as client:
+                assert (await client.get(url)).text == "ok"
+    finally:
+        await dns_cache.close_http_pools()
+
+    assert len(connections) == 1
+    assert dns_cache._shared_transports == {}
@@ -0,0 +1,40 @@
+"""Scan event logs: compaction of superseded progress updates and event ID ordering."""
+from app.services.event_log import _collapse
+from app.utils.event_ids import is_after, parse_event_id
+
+
+def test_collapse_keeps_the_latest_progress_per_phase():
+    events = [
+        {"event_id": "1-0", "type": "progress", "phase": "dns", "progress_percent": 10},
+        {"event_id": "2-0", "type": "log", "phase": "dns", "message": "A records found"},
+        {"event_id": "3-0", "type": "progress", "phase": "ssl", "progress_percent": 5},
+        {"event_id": "4-0", "type": "progress", "phase": "dns", "progress_percent": 90},
+        {"event_id": "5-0", "type": "module_complete", "phase": "dns"},
+    ]
+
+    assert [event["event_id"] for event in _collapse(events)] == ["2-0", "3-0", "4-0", "5-0"]
+
+
+def test_collapse_keeps_every_other_event():
+    events = [
+        {"event_id": "1-0", "type": "log", "phase": "dns"},
+        {"event_id": "1-1", "type": "log", "phase": "dns"},
+        {"event_id": "2-0", "type": "phase_change", "phase": "ssl"},
+    ]
+
+    assert _collapse(events) == events
+
+
+def test_event_ids_compare_numerically():
+    assert parse_event_id("1700000000000-12") == (1700000000000, 12)
+    assert parse_event_id("1700000000000") == (1700000000000, 0)
+    assert is_after("10-0", "9-5")
+    assert is_after("9-10", "9-9")
+    assert not is_after("9-5", "9-5")
+    assert not is_after("9-4", "10-0")
+
+
+def test_missing_or_malformed_ids_pass():
+    assert is_after(None, "9-5")
+    assert is_after("9-5", None)
+    assert is_after("garbage", "9-5")
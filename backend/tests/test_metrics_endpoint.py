@@ -0,0 +1,36 @@
+"""GET /metrics is internal: off without METRICS_TOKEN, and only served to that bearer token."""
+import httpx
+import pytest
+
+from app import main
+from app.config import settings
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def _counters():
+        return {"scans.started": 3}
+
+    monkeypatch.setattr(main, "get_counters", _counters)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://api.test")
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+    async with client:
+        assert (await client.get("/metrics", headers={"Authorization": "Bearer anything"})).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scraper-secret")
+
+    async with client:
+        assert (await client.get("/metrics")).status_code == 401
+        assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+        response = await client.get("/metrics", headers={"Authorization": "Bearer scraper-secret"})
+
+    assert response.status_code == 200
+    assert response.json()["counters"] == {"scans.started": 3}
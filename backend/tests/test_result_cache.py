@@ -0,0 +1,43 @@
+"""result_cache.ttl_for: TTLs derived from the result, with the module fallback and clamps."""
+from datetime import datetime, timedelta, timezone
+
+from app.services.result_cache import MAX_TTL_SECONDS, TTL_POLICIES, ttl_for
+
+
+def _expiring_in(delta: timedelta) -> dict:
+    return {"certificate": {"not_after": (datetime.now(timezone.utc) + delta).isoformat()}}
+
+
+def test_dns_ttl_is_the_shortest_record_ttl():
+    assert ttl_for("dns", {"checks": {"record_ttls": {"A": 300, "MX": 120, "TXT": 3600}}}) == 120
+
+
+def test_dns_without_record_ttls_uses_the_fallback():
+    assert ttl_for("dns", {"checks": {}}) == TTL_POLICIES["dns"][1]
+
+
+def test_ttl_is_clamped_to_the_maximum():
+    assert ttl_for("dns", {"checks": {"record_ttls": {"A": 86400}}}) == MAX_TTL_SECONDS
+    assert ttl_for("ssl", _expiring_in(timedelta(days=60))) == MAX_TTL_SECONDS
+
+
+def test_short_ttls_are_not_cached():
+    assert ttl_for("dns", {"checks": {"record_ttls": {"A": 30}}}) is None
+    assert ttl_for("ssl", _expiring_in(timedelta(seconds=10))) is None
+    assert ttl_for("ssl", _expiring_in(timedelta(days=-1))) is None
+
+
+def test_ssl_ttl_runs_until_certificate_expiry():
+    ttl = ttl_for("ssl", _expiring_in(timedelta(hours=1)))
+
+    assert 3590 <= ttl <= 3600
+
+
+def test_unparseable_data_falls_back():
+    assert ttl_for("ssl", {"certificate": {"not_after": "not a date"}}) == TTL_POLICIES["ssl"][1]
+
+
+def test_errors_and_uncached_modules_are_not_cached():
+    assert ttl_for("security", {"error": "timed out"}) is None
+    assert ttl_for("performance", {"levels": []}) is None
+    assert ttl_for("security", {}) == TTL_POLICIES["security"][1]
@@ -0,0 +1,105 @@
+"""Scan coalescing: concurrent submissions of one URL share a single run."""
+import asyncio
+import uuid
+
+import pytest
+
+from app.models.scan import Scan, ScanStatus
+from app.services import scan_coalescer
+from app.services.scan_coalescer import claim_or_attach
+
+MODULES = ["dns", "ssl"]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+class Database:
+    """Committed scan rows, shared by every session."""
+
+    def __init__(self) -> None:
+        self.committed: dict[uuid.UUID, Scan] = {}
+
+
+class FakeSession:
+    """Sees committed rows plus its own flushed one, like a READ COMMITTED transaction."""
+
+    def __init__(self, database: Database, own: Scan) -> None:
+        self.database = database
+        self.own = own
+
+    async def get(self, model, scan_id):
+        if scan_id == self.own.id:
+            return self.own
+        return self.database.committed.get(scan_id)
+
+    def commit(self) -> None:
+        self.database.committed[self.own.id] = self.own
+
+
+def _submission(database: Database) -> FakeSession:
+    scan = Scan(
+        id=uuid.uuid4(), normalized_url="https://example.com/", modules=MODULES, status=ScanStatus.pending
+    )
+    return FakeSession(database, scan)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+
+    async def _get_redis():
+        return client
+
+    monkeypatch.setattr(scan_coalescer, "get_redis", _get_redis)
+    monkeypatch.setattr(scan_coalescer, "UNCOMMITTED_CLAIM_WAIT_SECONDS", 0.5)
+    monkeypatch.setattr(scan_coalescer, "UNCOMMITTED_CLAIM_POLL_SECONDS", 0.01)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_second_submission_waits_for_the_first_to_commit(redis):
+    database = Database()
+    first, second = _submission(database), _submission(database)
+
+    # The first submission claims, then commits a little later (admission, etc.)
+    assert await claim_or_attach(first, first.own) is None
+    attach = asyncio.create_task(claim_or_attach(second, second.own))
+    await asyncio.sleep(0.05)
+    assert not attach.done()
+    first.commit()
+
+    assert await attach is first.own
+    assert list(redis.values.values()) == [str(first.own.id)]
+
+
+@pytest.mark.asyncio
+async def test_claim_is_taken_over_when_its_row_never_appears(redis):
+    database = Database()
+    first, second = _submission(database), _submission(database)
+
+    assert await claim_or_attach(first, first.own) is None
+    # The first submission never commits (e.g. its request died)
+    assert await claim_or_attach(second, second.own) is None
+    assert list(redis.values.values()) == [str(second.own.id)]
+
+
+@pytest.mark.asyncio
+async def test_committed_primary_is_shared_immediately(redis):
+    database = Database()
+    first, second = _submission(database), _submission(database)
+    await claim_or_attach(first, first.own)
+    first.commit()
+
+    assert await asyncio.wait_for(claim_or_attach(second, second.own), timeout=0.1) is first.own
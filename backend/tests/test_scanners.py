@@ -0,0 +1,182 @@
+"""Scanner fingerprints: stable across identical responses, sensitive to what the checks read."""
+import asyncio
+
+import dns.message
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.scanners import dns_scanner, security_scanner
+from app.scanners.base import BaseScanner
+from app.scanners.dns_scanner import DNSScanner
+from app.scanners.security_scanner import CORS_PROBE_ORIGIN, SecurityScanner, _is_directory_listing
+
+URL = "https://site.test/"
+
+
+class FakeSite:
+    """Serves a landing page, a CORS preflight and optional directory indexes."""
+
+    def __init__(self) -> None:
+        self.body = "<html><body>hello</body></html>"
+        self.date = "Mon, 19 Oct 2026 10:00:00 GMT"
+        self.allow_origin: str | None = None
+        self.listings: set[str] = set()
+        self.cookie_flags = "Path=/; Secure; HttpOnly"
+        self.session = "abc123"
+        self.down = False
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.method == "OPTIONS":
+            headers = {"access-control-allow-origin": self.allow_origin} if self.allow_origin else {}
+            return httpx.Response(204, headers=headers)
+        if request.url.path in self.listings:
+            return httpx.Response(200, text=f"<title>Index of {request.url.path}</title>")
+        if request.url.path == "/":
+            headers = {"date": self.date, "etag": '"v1"', "set-cookie": f"session={self.session}; {self.cookie_flags}"}
+            return httpx.Response(200, text=self.body, headers=headers)
+        return httpx.Response(404, text="not found")
+
+
+@pytest.fixture
+def site(monkeypatch):
+    fake = FakeSite()
+
+    def _client(verify=True, limits=None, **kwargs):
+        return httpx.AsyncClient(transport=httpx.MockTransport(fake.handle), **kwargs)
+
+    monkeypatch.setattr(security_scanner, "http_client", _client)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_security_fingerprint_is_stable(site):
+    first = await SecurityScanner().fingerprint(URL)
+    site.date = "Mon, 19 Oct 2026 10:05:00 GMT"
+    site.session = "def456"
+    second = await SecurityScanner().fingerprint(URL)
+
+    assert first is not None
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_security_fingerprint_covers_cors(site):
+    before = await SecurityScanner().fingerprint(URL)
+    site.allow_origin = CORS_PROBE_ORIGIN
+
+    assert await SecurityScanner().fingerprint(URL) != before
+
+
+@pytest.mark.asyncio
+async def test_security_fingerprint_covers_directory_listing(site):
+    before = await SecurityScanner().fingerprint(URL)
+    site.listings.add("/uploads/")
+
+    assert await SecurityScanner().fingerprint(URL) != before
+
+
+@pytest.mark.asyncio
+async def test_security_fingerprint_covers_landing_body(site):
+    before = await SecurityScanner().fingerprint(URL)
+    site.body = "<html><body>changed</body></html>"
+
+    assert await SecurityScanner().fingerprint(URL) != before
+
+
+@pytest.mark.asyncio
+async def test_security_fingerprint_covers_cookie_flags(site):
+    before = await SecurityScanner().fingerprint(URL)
+    site.cookie_flags = "Path=/; Secure"
+
+    after = await SecurityScanner().fingerprint(URL)
+    site.cookie_flags = "Path=/; Secure; HttpOnly; SameSite=Lax"
+
+    assert len({before, after, await SecurityScanner().fingerprint(URL)}) == 3
+
+
+@pytest.mark.asyncio
+async def test_security_fingerprint_is_none_when_unreachable(site):
+    site.down = True
+
+    assert await SecurityScanner().fingerprint(URL) is None
+
+
+def test_directory_listing_detection():
+    assert _is_directory_listing("<h1>Index of /static/</h1>")
+    assert _is_directory_listing("Directory Listing For /")
+    assert not _is_directory_listing("<h1>Welcome</h1>")
+
+
+def test_digest_ignores_key_order():
+    assert BaseScanner._digest({"a": 1, "b": 2}) == BaseScanner._digest({"b": 2, "a": 1})
+    assert BaseScanner._digest({"a": 1}) != BaseScanner._digest({"a": 2})
+
+
+class LocalhostResolver:
+    """Answers A queries with 127.0.0.1 and nothing else."""
+
+    async def resolve_with_source(self, hostname, rdtype):
+        if rdtype != "A":
+            raise dns.resolver.NoAnswer()
+        name = dns.name.from_text(hostname)
+        response = dns.message.make_response(dns.message.make_query(name, "A"))
+        response.answer.append(dns.rrset.from_text_list(name, 60, "IN", "A", ["127.0.0.1"]))
+        response = dns.message.from_wire(response.to_wire())
+        return dns.resolver.Answer(name, dns.rdatatype.A, dns.rdataclass.IN, response), "network"
+
+
+@pytest_asyncio.fixture
+async def local_host(monkeypatch):
+    """A DNSScanner pointed at a listening local port, with a switchable HTTP redirect."""
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+    state = {"location": "https://host.test/"}
+
+    def _handle(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(301, headers={"location": state["location"]})
+
+    def _client(verify=True, limits=None, **kwargs):
+        return httpx.AsyncClient(transport=httpx.MockTransport(_handle), **kwargs)
+
+    monkeypatch.setattr(dns_scanner, "http_client", _client)
+    scanner = DNSScanner()
+    scanner.resolver = LocalhostResolver()
+    scanner.ports = [server.sockets[0].getsockname()[1]]
+    yield scanner, server, state
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_dns_fingerprint_covers_ports_and_redirect(local_host):
+    scanner, server, state = local_host
+    first = await scanner.fingerprint("https://host.test/")
+    assert first is not None
+    assert await scanner.fingerprint("https://host.test/") == first
+
+    state["location"] = "http://host.test/landing"
+    no_redirect = await scanner.fingerprint("https://host.test/")
+    server.close()
+    await server.wait_closed()
+    port_closed = await scanner.fingerprint("https://host.test/")
+
+    assert len({first, no_redirect, port_closed}) == 3
+
+
+def test_bulk_pacer_forgets_users_whose_slots_have_passed(monkeypatch):
+    monkeypatch.setattr(dns_scanner, "_bulk_next_query_at", {})
+    monkeypatch.setattr(dns_scanner, "_bulk_pruned_at", 0.0)
+    for n in range(100):
+        dns_scanner._reserve_slot(f"user-{n}", 1000.0, rate=10)
+    assert dns_scanner._reserve_slot("user-0", 1000.0, rate=10) == 1000.1
+
+    later = 1000.0 + dns_scanner.BULK_PACER_PRUNE_SECONDS
+    assert dns_scanner._reserve_slot("user-new", later, rate=10) == later
+    assert list(dns_scanner._bulk_next_query_at) == ["user-new"]
@@ -0,0 +1,128 @@
+"""Recurring scans: change detection between runs and stable slot timing."""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.scan import ScanProfile
+from app.models.scan_result import ScanResult
+from app.models.scan_schedule import ScanSchedule
+from app.services import scan_scheduler
+from app.services.schedule_service import advance, compute_diff, first_run_at, start_due_schedules
+
+
+def _result(score: int, critical: int = 0, high: int = 0, medium: int = 0, low: int = 0) -> ScanResult:
+    return ScanResult(
+        score=score, issues_critical=critical, issues_high=high, issues_medium=medium, issues_low=low
+    )
+
+
+def _schedule(interval_seconds: int = 3600, jitter_seconds: int = 600) -> ScanSchedule:
+    return ScanSchedule(id=uuid.uuid4(), interval_seconds=interval_seconds, jitter_seconds=jitter_seconds)
+
+
+def test_identical_runs_have_no_diff():
+    results = {"dns": _result(90, low=2), "ssl": _result(80, medium=1)}
+    same = {"dns": _result(90, low=2), "ssl": _result(80, medium=1)}
+
+    assert compute_diff(85, 85, results, same) == {}
+
+
+def test_diff_keeps_only_what_moved():
+    previous = {"dns": _result(90, low=2), "ssl": _result(80, medium=1)}
+    current = {"dns": _result(90, low=2), "ssl": _result(70, high=1, medium=1)}
+
+    assert compute_diff(85, 80, previous, current) == {
+        "overall_score": [85, 80],
+        "modules": {"ssl": {"score": [80, 70], "issues": {"high": [0, 1]}}},
+    }
+
+
+def test_issue_changes_without_score_change_are_reported():
+    diff = compute_diff(85, 85, {"seo": _result(75, low=3)}, {"seo": _result(75, low=1)})
+
+    assert diff == {"modules": {"seo": {"issues": {"low": [3, 1]}}}}
+
+
+def test_added_and_removed_modules_score_none():
+    diff = compute_diff(80, 80, {"dns": _result(90)}, {"ssl": _result(70)})
+
+    assert diff == {"modules": {"dns": {"score": [90, None]}, "ssl": {"score": [None, 70]}}}
+
+
+def test_offset_is_stable_and_inside_the_jitter_window():
+    schedule = _schedule()
+    start = datetime(2026, 10, 19, 2, 0, tzinfo=timezone.utc)
+
+    first = first_run_at(schedule, start)
+
+    assert first == first_run_at(schedule, start)
+    assert start <= first < start + timedelta(seconds=schedule.jitter_seconds)
+
+
+def test_advance_skips_missed_slots_and_keeps_the_offset():
+    schedule = _schedule()
+    start = datetime(2026, 10, 19, 2, 0, tzinfo=timezone.utc)
+    schedule.next_run_at = first_run_at(schedule, start)
+    offset = schedule.next_run_at - start
+
+    advance(schedule, start + timedelta(hours=3, minutes=30))
+
+    assert schedule.next_run_at == start + timedelta(hours=4) + offset
+
+
+class _Rows:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def scalars(self) -> "_Rows":
+        return self
+
+    def all(self) -> list:
+        return self.rows
+
+
+class FakeSession:
+    """Returns the given schedules as due; records added scans."""
+
+    def __init__(self, schedules: list[ScanSchedule]) -> None:
+        self.schedules = schedules
+        self.added: list = []
+
+    async def execute(self, statement) -> _Rows:
+        return _Rows(self.schedules)
+
+    def add(self, obj) -> None:
+        self.added.append(obj)
+
+    async def commit(self) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_quota_retry_keeps_the_slot_grid(monkeypatch):
+    refusals = [scan_scheduler.QuotaExceeded(retry_after=90)]
+
+    async def _admit(user_id, modules):
+        if refusals:
+            raise refusals.pop()
+
+    async def _enqueue(user_id, scan_id, modules):
+        return None
+
+    monkeypatch.setattr(scan_scheduler, "admit", _admit)
+    monkeypatch.setattr(scan_scheduler, "enqueue", _enqueue)
+    schedule = _schedule()
+    schedule.user_id, schedule.url, schedule.normalized_url = uuid.uuid4(), "https://a.test", "a.test"
+    schedule.profile, schedule.modules, schedule.enabled = ScanProfile.quick, ["dns"], True
+    slot = datetime.now(timezone.utc) - timedelta(minutes=1)
+    schedule.next_run_at = slot
+    db = FakeSession([schedule])
+
+    assert await start_due_schedules(db) == 0
+    assert schedule.next_run_at == slot
+    assert schedule.retry_at > slot + timedelta(seconds=90)
+
+    assert await start_due_schedules(db) == 1
+    assert schedule.next_run_at == slot + timedelta(hours=1)
+    assert schedule.retry_at is None
@@ -0,0 +1,35 @@
+"""SSE transport: Last-Event-ID cursors and eviction of a full subscriber queue."""
+import asyncio
+
+import pytest
+
+from app.websocket.sse import _CLOSED, QueueSubscriber, _format_cursor, parse_cursor
+
+
+def test_bare_event_id_resumes_a_single_scan():
+    assert parse_cursor("17-3", ["scan-a"]) == {"scan-a": "17-3"}
+    assert parse_cursor("17-3", ["scan-a", "scan-b"]) == {}
+    assert parse_cursor(None, ["scan-a"]) == {}
+
+
+def test_multiplexed_cursor_round_trips():
+    cursor = {"scan-a": "17-3", "scan-b": "20-0"}
+
+    assert parse_cursor(_format_cursor(cursor), ["scan-a", "scan-b"]) == cursor
+
+
+def test_cursor_ignores_scans_not_requested_and_junk():
+    assert parse_cursor("scan-a=17-3,scan-x=9-0,junk", ["scan-a", "scan-b"]) == {"scan-a": "17-3"}
+
+
+@pytest.mark.asyncio
+async def test_close_ends_a_full_queue():
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+    subscriber = QueueSubscriber("scan-a", queue)
+    await subscriber.send_text("one")
+    await subscriber.send_text("two")
+
+    await subscriber.close()
+
+    assert queue.get_nowait() == ("scan-a", "two")
+    assert queue.get_nowait() == ("scan-a", _CLOSED)
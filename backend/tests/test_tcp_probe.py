@@ -0,0 +1,81 @@
+"""TCP probes: latency statistics, address family choice and probes against local ports."""
+import asyncio
+
+import pytest
+
+from app.scanners.tcp_probe import (
+    CLOSED,
+    CONNECTION_ATTEMPT_DELAY_MS,
+    OPEN,
+    happy_eyeballs,
+    latency_stats,
+    probe_ports,
+    sample_latency,
+)
+
+
+def test_latency_stats_loss_and_jitter():
+    stats = latency_stats([10.0, None, 14.0, 12.0, None])
+
+    assert stats["attempts"] == 5
+    assert stats["samples"] == 3
+    assert stats["loss"] == 0.4
+    # Mean of |14 - 10| and |12 - 14|
+    assert stats["jitter"] == 3.0
+    assert (stats["min"], stats["median"], stats["max"]) == (10.0, 12.0, 14.0)
+
+
+def test_steady_path_has_no_jitter():
+    assert latency_stats([40.0, 40.0, 40.0])["jitter"] == 0.0
+    assert latency_stats([40.0])["jitter"] is None
+
+
+def test_every_attempt_lost():
+    stats = latency_stats([None, None])
+
+    assert stats["loss"] == 1.0
+    assert stats["samples"] == 0 and stats["median"] is None and stats["jitter"] is None
+
+
+def test_no_attempts():
+    assert latency_stats([])["loss"] is None
+
+
+def test_happy_eyeballs_prefers_ipv6_within_the_attempt_delay():
+    result = happy_eyeballs({"ipv4": {"median": 20.0}, "ipv6": {"median": 20.0 + CONNECTION_ATTEMPT_DELAY_MS}})
+
+    assert result["winner"] == "ipv6"
+    assert result["ipv6_penalty_ms"] == CONNECTION_ATTEMPT_DELAY_MS
+
+
+def test_happy_eyeballs_falls_back_to_ipv4_when_ipv6_is_much_slower():
+    result = happy_eyeballs({"ipv4": {"median": 20.0}, "ipv6": {"median": 21.0 + CONNECTION_ATTEMPT_DELAY_MS}})
+
+    assert result["winner"] == "ipv4"
+
+
+def test_happy_eyeballs_with_one_family_or_none():
+    assert happy_eyeballs({"ipv4": {"median": 30.0}})["winner"] == "ipv4"
+    assert happy_eyeballs({"ipv4": {"median": None}, "ipv6": {"median": 50.0}})["winner"] == "ipv6"
+    assert happy_eyeballs({}) == {"winner": None, "ipv4_ms": None, "ipv6_ms": None, "ipv6_penalty_ms": None}
+
+
+@pytest.mark.asyncio
+async def test_probe_and_sample_local_ports():
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+    open_port = server.sockets[0].getsockname()[1]
+    # A port that was just released, so connects to it are refused
+    closed = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+    closed_port = closed.sockets[0].getsockname()[1]
+    closed.close()
+    await closed.wait_closed()
+
+    ports = await probe_ports("127.0.0.1", [open_port, closed_port], samples=3, timeout=1.0)
+    latency = await sample_latency(["127.0.0.1"], open_port, samples=4, spacing=0.01, timeout=1.0)
+    server.close()
+    await server.wait_closed()
+
+    assert ports[open_port]["state"] == OPEN and ports[open_port]["connect_ms"]["samples"] == 3
+    assert ports[closed_port] == {"state": CLOSED, "connect_ms": None}
+    assert latency["addresses"]["127.0.0.1"]["loss"] == 0.0
+    assert latency["families"]["ipv4"]["attempts"] == 4
@@ -0,0 +1,119 @@
+"""Per-client outboxes: merging of progress snapshots, dropping under backpressure, eviction."""
+import asyncio
+import json
+
+import pytest
+
+from app.websocket import manager as manager_module
+from app.websocket.manager import SLOW_CONSUMER_CLOSE_CODE, ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics(monkeypatch):
+    async def _incr(name, amount=1):
+        return None
+
+    monkeypatch.setattr(manager_module, "incr_counter", _incr)
+
+
+def _types(outbox) -> list:
+    return [(cell[0]["type"], cell[0].get("phase"), cell[0].get("n")) for cell in outbox.frames]
+
+
+@pytest.mark.asyncio
+async def test_progress_supersedes_unsent_progress_of_the_same_phase():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    await manager.connect("scan", websocket, hold=True)
+
+    await manager.send_to_scan("scan", {"type": "progress", "phase": "dns", "n": 1})
+    await manager.send_to_scan("scan", {"type": "progress", "phase": "ssl", "n": 2})
+    await manager.send_to_scan("scan", {"type": "log", "phase": "dns", "n": 3})
+    await manager.send_to_scan("scan", {"type": "progress", "phase": "dns", "n": 4})
+
+    outbox = manager._outbox("scan", websocket)
+    # The newer dns snapshot moves to the tail so event order is kept
+    assert _types(outbox) == [("progress", "ssl", 2), ("log", "dns", 3), ("progress", "dns", 4)]
+    assert outbox.merged == 1
+    manager.disconnect("scan", websocket)
+
+
+@pytest.mark.asyncio
+async def test_full_outbox_drops_the_oldest_droppable_frame_and_reports_it():
+    manager = ConnectionManager(outbox_size=3)
+    websocket = FakeWebSocket()
+    await manager.connect("scan", websocket, hold=True)
+
+    await manager.send_to_scan("scan", {"type": "phase_change", "phase": "dns", "n": 1})
+    await manager.send_to_scan("scan", {"type": "log", "phase": "dns", "n": 2})
+    await manager.send_to_scan("scan", {"type": "log", "phase": "dns", "n": 3})
+    await manager.send_to_scan("scan", {"type": "module_complete", "phase": "dns", "n": 4})
+
+    outbox = manager._outbox("scan", websocket)
+    assert _types(outbox) == [("phase_change", "dns", 1), ("log", "dns", 3), ("module_complete", "dns", 4)]
+    assert outbox.dropped == 1
+
+    await manager.release("scan", websocket, None)
+    await manager.drain()
+    assert json.loads(websocket.sent[0]) == {"type": "frames_dropped", "count": 1}
+    assert [json.loads(text)["n"] for text in websocket.sent[1:]] == [1, 3, 4]
+    manager.disconnect("scan", websocket)
+
+
+@pytest.mark.asyncio
+async def test_outbox_full_of_undroppable_frames_evicts_the_client():
+    manager = ConnectionManager(outbox_size=2)
+    websocket = FakeWebSocket()
+    await manager.connect("scan", websocket, hold=True)
+
+    for n in range(3):
+        await manager.send_to_scan("scan", {"type": "module_complete", "phase": f"m{n}"})
+    await asyncio.sleep(0.01)  # eviction closes the socket in a task of its own
+
+    assert manager.subscribers("scan") == 0
+    assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+
+
+@pytest.mark.asyncio
+async def test_release_skips_frames_the_replay_covered():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    await manager.connect("scan", websocket, hold=True)
+
+    for n, event_id in enumerate(["5-0", "6-0", "7-0"]):
+        await manager.send_to_scan("scan", {"type": "log", "phase": "dns", "n": n, "event_id": event_id})
+    await manager.release("scan", websocket, "6-0")
+    await manager.drain()
+
+    assert [json.loads(text)["event_id"] for text in websocket.sent] == ["7-0"]
+    manager.disconnect("scan", websocket)
+
+
+@pytest.mark.asyncio
+async def test_close_all_waits_for_writers_and_evictions():
+    manager = ConnectionManager(outbox_size=1)
+    watching, evicted = FakeWebSocket(), FakeWebSocket()
+    await manager.connect("scan", watching)
+    await manager.connect("other", evicted, hold=True)
+    outboxes = [manager._outbox("scan", watching), manager._outbox("other", evicted)]
+
+    for n in range(2):
+        await manager.send_to_scan("other", {"type": "module_complete", "phase": f"m{n}"})
+    await manager.close_all()
+
+    assert manager.active_connections == 0
+    assert all(outbox.task.done() for outbox in outboxes)
+    assert not manager._tasks
+    assert evicted.closed_with == SLOW_CONSUMER_CLOSE_CODE
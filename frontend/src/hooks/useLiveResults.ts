@@ -50,7 +50,11 @@ export function useLiveResults(scanId: string | undefined) {
                         if (msg.phase) setPhase(msg.phase);
                         break;
                     case 'log':
-                        if (msg.entry) addLog(msg.entry);
+                        // Log events carry the entry's fields at the top level
+                        addLog(msg.entry ?? msg);
+                        break;
+                    case 'log_batch':
+                        msg.entries?.forEach((entry) => addLog(entry));
                         break;
                     case 'progress':
                         if (msg.metrics) updateMetrics(msg.metrics);
@@ -1,5 +1,17 @@
 import { WSMessage } from '@/types/scan';
 
+// Event IDs are Redis stream IDs: "<millis>-<seq>"
+function parseEventId(id: string): [number, number] {
+    const [millis, seq = '0'] = id.split('-');
+    return [Number(millis), Number(seq)];
+}
+
+function isAfter(id: string, other: string): boolean {
+    const [millis, seq] = parseEventId(id);
+    const [otherMillis, otherSeq] = parseEventId(other);
+    return millis > otherMillis || (millis === otherMillis && seq > otherSeq);
+}
+
 export function connectToScan(
     scanId: string,
     onMessage: (msg: WSMessage) => void,
@@ -10,13 +22,29 @@ export function connectToScan(
     let reconnectAttempts = 0;
     const MAX_RECONNECT = 3;
     let isIntentionallyClosed = false;
+    // Highest event seen, so a reconnect only replays what was missed
+    let lastEventId: string | null = null;
 
     const connect = () => {
         ws = new WebSocket(`${wsURL}/ws/scan/${scanId}`);
 
+        ws.onopen = () => {
+            const tokens = localStorage.getItem('auth_tokens');
+            const token = tokens ? JSON.parse(tokens).access_token : null;
+            ws?.send(JSON.stringify({ type: 'subscribe', token, last_event_id: lastEventId }));
+        };
+
         ws.onmessage = (event) => {
             try {
                 const msg = JSON.parse(event.data);
+                if (msg.type === 'ping') {
+                    ws?.send(JSON.stringify({ type: 'pong', t: msg.t }));
+                    return;
+                }
+                if (msg.event_id) {
+                    if (lastEventId && !isAfter(msg.event_id, lastEventId)) return;
+                    lastEventId = msg.event_id;
+                }
                 onMessage(msg);
             } catch (e) {
                 console.error('Failed to parse WS message', e, event.data);
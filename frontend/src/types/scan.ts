@@ -5,6 +5,7 @@ export interface Scan {
     url: string;
     status: ScanStatus;
     current_phase?: string;
+    module_phases?: Record<string, string>;
     overall_score?: number;
     started_at?: string;
     completed_at?: string;
@@ -39,6 +40,9 @@ export interface LiveMetrics {
 }
 
 export type WSMessage = {
-    type: 'phase_change' | 'log' | 'progress' | 'module_complete' | 'scan_complete' | 'report_ready' | 'error';
+    type: 'phase_change' | 'log' | 'log_batch' | 'progress' | 'module_complete' | 'scan_complete' | 'report_ready' | 'error';
+    event_id?: string;
+    // log_batch: the log lines published within one frame window, oldest first
+    entries?: LogEntry[];
     [key: string]: any;
 };